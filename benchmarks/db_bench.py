@@ -0,0 +1,230 @@
+"""Timed scenarios for every Database method, with baseline comparison
+
+    python -m benchmarks.db_bench --size small --output results.json
+    python -m benchmarks.db_bench --size small --baseline benchmarks/baseline-small.json
+
+Exits with status 1 when a scenario's median is slower than the baseline
+by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import platform
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+from database import Database
+from benchmarks.league import generate, SIZES
+
+class Scenario:
+    """A named operation timed `repeat` times; `setup` runs untimed before each call"""
+
+    def __init__(self, name, func, repeat=20, setup=None, writes=False):
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+        self.setup = setup
+        self.writes = writes
+
+def read_scenarios(db, league):
+    """Scenarios that leave the database unchanged"""
+    guild_id = league.guild_id
+    club_id = league.club_ids[len(league.club_ids) // 2]
+    club_name = league.club_names[len(league.club_names) // 2]
+    player_name = league.player_names[len(league.player_names) // 2]
+    heavy = 3 if len(league.player_ids) > 100_000 else 10
+    return [
+        Scenario('ping', db.ping, repeat=100),
+        Scenario('get_club_by_name', lambda: db.get_club_by_name(club_name, guild_id), repeat=100),
+        Scenario('get_club_by_id', lambda: db.get_club_by_id(club_id), repeat=100),
+        Scenario('get_all_clubs', lambda: db.get_all_clubs(guild_id), repeat=heavy * 2),
+        Scenario('get_player_by_name', lambda: db.get_player_by_name(player_name, guild_id), repeat=heavy * 2),
+        Scenario('get_players_by_club', lambda: db.get_players_by_club(club_id), repeat=heavy * 2),
+        Scenario('get_all_players', lambda: db.get_all_players(guild_id), repeat=heavy),
+        Scenario('get_matches', lambda: db.get_matches(guild_id), repeat=heavy * 2),
+        Scenario('get_recent_transfers', lambda: db.get_recent_transfers(guild_id, 10), repeat=heavy * 2),
+        Scenario('get_top_players_by_value', lambda: db.get_top_players_by_value(guild_id, 10), repeat=heavy * 2),
+        Scenario('get_richest_clubs', lambda: db.get_richest_clubs(guild_id, 10), repeat=heavy * 2),
+        Scenario('get_club_stats', lambda: db.get_club_stats(club_id), repeat=heavy * 2),
+        Scenario('get_club_rankings', lambda: db.get_club_rankings(guild_id), repeat=heavy * 2),
+        Scenario('get_position_counts', lambda: db.get_position_counts(guild_id), repeat=heavy * 2),
+        Scenario('search_players', lambda: db.search_players(guild_id, position='Mid', min_value=1e5, club=club_name), repeat=heavy * 2),
+        Scenario('get_age_stats', lambda: db.get_age_stats(guild_id), repeat=heavy * 2),
+        Scenario('get_all_live_boards', db.get_all_live_boards, repeat=100),
+        Scenario('get_lease', lambda: db.get_lease('background-tasks'), repeat=100),
+        Scenario('get_meta', lambda: db.get_meta('command_tree:bench:global'), repeat=100),
+        Scenario('backup_data', lambda: db.backup_data(guild_id), repeat=max(heavy // 3, 1)),
+    ]
+
+def write_scenarios(db, league):
+    """Scenarios that modify the database; they run against a copy"""
+    guild_id = league.guild_id
+    club_ids = league.club_ids
+    player_ids = league.player_ids
+    counter = iter(range(10 ** 9))
+    state = {}
+
+    def new_club():
+        state['club'] = db.create_club(f"Bench Club {next(counter)}", 1e6, guild_id)
+
+    def new_player():
+        state['player'] = db.create_player(f"Bench Player {next(counter)}", 1e5, guild_id, club_ids[0])
+
+    def reset_matches():
+        with db.get_connection() as conn:
+            conn.execute("UPDATE matches SET reminded = FALSE WHERE match_date > datetime('now')")
+
+    kickoff = datetime.now() + timedelta(days=7)
+    return [
+        Scenario('create_club', new_club, repeat=50, writes=True),
+        Scenario('delete_club', lambda: db.delete_club(state['club']), setup=new_club, repeat=50, writes=True),
+        Scenario('update_club_budget', lambda: db.update_club_budget(club_ids[1], 2e6), repeat=50, writes=True),
+        Scenario('set_club_crest', lambda: db.set_club_crest(club_ids[1], 'ab' * 32), repeat=50, writes=True),
+        Scenario('create_player', new_player, repeat=50, writes=True),
+        Scenario('delete_player', lambda: db.delete_player(state['player']), setup=new_player, repeat=50, writes=True),
+        Scenario('update_player_value', lambda: db.update_player_value(player_ids[1], 2e5), repeat=50, writes=True),
+        Scenario('transfer_player',
+                 lambda: db.transfer_player(player_ids[next(counter) % len(player_ids)],
+                                            club_ids[next(counter) % len(club_ids)], 1000, guild_id),
+                 repeat=50, writes=True),
+        Scenario('create_match', lambda: db.create_match(club_ids[0], club_ids[1], kickoff, guild_id, 1), repeat=50, writes=True),
+        Scenario('get_upcoming_matches', lambda: db.get_upcoming_matches(minutes=5), setup=reset_matches, repeat=20, writes=True),
+        Scenario('get_upcoming_matches.sharded',
+                 lambda: db.get_upcoming_matches(minutes=5, shard_ids=[0, 1], shard_count=4),
+                 setup=reset_matches, repeat=20, writes=True),
+        Scenario('set_live_board', lambda: db.set_live_board(guild_id, 'club_rankings', 1, next(counter)), repeat=50, writes=True),
+        Scenario('delete_live_board', lambda: db.delete_live_board(guild_id, 'club_rankings'),
+                 setup=lambda: db.set_live_board(guild_id, 'club_rankings', 1, 1), repeat=50, writes=True),
+        Scenario('acquire_lease', lambda: db.acquire_lease('bench', 'bench-holder', 15), repeat=50, writes=True),
+        Scenario('release_lease', lambda: db.release_lease('bench', 'bench-holder'),
+                 setup=lambda: db.acquire_lease('bench', 'bench-holder', 15), repeat=50, writes=True),
+        Scenario('set_meta', lambda: db.set_meta('bench', str(next(counter))), repeat=50, writes=True),
+        Scenario('delete_meta', lambda: db.delete_meta('bench'), setup=lambda: db.set_meta('bench', '1'), repeat=50, writes=True),
+        Scenario('initialize', db.initialize, repeat=10, writes=True),
+        # Destructive, so it runs last and only once
+        Scenario('reset_all_data', lambda: db.reset_all_data(guild_id), repeat=1, writes=True),
+    ]
+
+def run_scenario(scenario):
+    timings = []
+    for _ in range(scenario.repeat):
+        if scenario.setup:
+            scenario.setup()
+        start = time.perf_counter()
+        scenario.func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'runs': len(timings),
+        'min_ms': round(timings[0], 4),
+        'median_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+    }
+
+def run(size='small', seed=42, only=None, workdir=None):
+    """Generate a league, run every scenario, and return the results document"""
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix='football-bench-') as workdir:
+            return run(size, seed, only, workdir)
+
+    base_path = os.path.join(workdir, f'league-{size}-{seed}.db')
+
+    start = time.perf_counter()
+    league = generate(base_path, size, seed)
+    generated_in = time.perf_counter() - start
+
+    results = {}
+    read_db = Database(base_path)
+    write_path = os.path.join(workdir, 'writes.db')
+    # The backup API copies committed data still sitting in the WAL file, which a file copy would miss
+    with sqlite3.connect(base_path) as source, sqlite3.connect(write_path) as target:
+        source.backup(target)
+    write_db = Database(write_path)
+
+    scenarios = read_scenarios(read_db, league) + write_scenarios(write_db, league)
+    for scenario in scenarios:
+        if only and not any(pattern in scenario.name for pattern in only):
+            continue
+        results[scenario.name] = run_scenario(scenario)
+        print(f"{scenario.name:32} median {results[scenario.name]['median_ms']:10.3f}ms", file=sys.stderr)
+
+    return {
+        'meta': {
+            'size': size,
+            'seed': seed,
+            'clubs': len(league.club_ids),
+            'players': len(league.player_ids),
+            'transfers': SIZES[size][2],
+            'generated_seconds': round(generated_in, 2),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'timestamp': datetime.utcnow().isoformat(),
+        },
+        'results': results,
+    }
+
+def compare(current, baseline, tolerance, min_delta_ms=0.05):
+    """Median ratio per scenario against a baseline; returns (rows, regressions)
+
+    Sub-millisecond scenarios are noisy, so a slowdown also has to exceed
+    `min_delta_ms` in absolute terms to count as a regression.
+    """
+    rows = []
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous['median_ms']:
+            rows.append((name, result['median_ms'], None, None))
+            continue
+        ratio = result['median_ms'] / previous['median_ms']
+        rows.append((name, result['median_ms'], previous['median_ms'], ratio))
+        if ratio > 1 + tolerance and result['median_ms'] - previous['median_ms'] > min_delta_ms:
+            regressions.append(name)
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Database layer on a synthetic league")
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='*', help="Run scenarios whose name contains any of these")
+    parser.add_argument('--output', help="Write results JSON here (default: stdout)")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--save-baseline', help="Also write the results to this baseline path")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed median slowdown before failing (0.2 = 20%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    current = run(args.size, args.seed, args.only)
+    document = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document)
+    else:
+        print(document)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(document)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('size') != args.size:
+            print(f"Warning: baseline was recorded for size {baseline.get('meta', {}).get('size')!r}", file=sys.stderr)
+        rows, regressions = compare(current, baseline, args.tolerance, args.min_delta_ms)
+        print(f"\n{'scenario':32} {'median':>10} {'baseline':>10} {'change':>8}", file=sys.stderr)
+        for name, median, previous, ratio in rows:
+            change = f"{(ratio - 1) * 100:+.0f}%" if ratio is not None else 'new'
+            flag = '  <-- regression' if name in regressions else ''
+            previous_text = f"{previous:10.3f}" if previous is not None else f"{'-':>10}"
+            print(f"{name:32} {median:10.3f} {previous_text} {change:>8}{flag}", file=sys.stderr)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
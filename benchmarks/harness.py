@@ -0,0 +1,614 @@
+"""Offline load harness: drive the real slash command callbacks with fake Discord objects
+
+    python -m benchmarks.harness --size small --workload evening --rate 40 --duration 30
+    python -m benchmarks.harness --size medium --workload transfer_window --rate 80 --output load.json
+
+A FootballBot is built without logging in. Commands run through the same
+checks, `interaction_check` and completion hooks as under a real tree. The
+Discord side is simulated: every response, role edit, member fetch and DM
+goes to a recording REST stand-in that sleeps for a configurable latency
+instead of touching the network. Interactions arrive as a Poisson process
+at `--rate` per second.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+from collections import Counter
+from types import SimpleNamespace
+import discord
+from discord import app_commands
+from capture import recorder
+from tracing import spans
+from benchmarks.league import generate, SIZES
+
+# Discord drops interactions that aren't acknowledged within this many seconds
+RESPONSE_DEADLINE = 3.0
+# Members delivered per guild member chunk over the gateway
+CHUNK_SIZE = 1000
+
+def _fake_response(status, reason):
+    return SimpleNamespace(status=status, reason=reason)
+
+def _payload_size(kwargs):
+    """Approximate request body size, serialising embeds the way the HTTP client would"""
+    size = len(kwargs.get('content') or '')
+    embeds = list(kwargs.get('embeds') or ())
+    if kwargs.get('embed') is not None:
+        embeds.append(kwargs['embed'])
+    for embed in embeds:
+        size += len(json.dumps(embed.to_dict(), default=str))
+    files = list(kwargs.get('files') or ())
+    if kwargs.get('file') is not None:
+        files.append(kwargs['file'])
+    for file in files:
+        size += len(file.fp.getbuffer()) if hasattr(file.fp, 'getbuffer') else 0
+    return size
+
+class RecordingRest:
+    """Stand-in for Discord's REST API that records each call and simulates its latency"""
+
+    def __init__(self, latency_ms=80.0, jitter=0.25, seed=0):
+        from perf import timed_rest
+
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.calls = Counter()
+        self.bytes = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Charged to the running command exactly like the real HTTP client
+        self.request = timed_rest(self.request)
+
+    def _delay(self, scale=1.0):
+        return max(self.rng.gauss(self.latency, self.latency * self.jitter), 0.0) * scale
+
+    async def request(self, route, payload=None, scale=1.0):
+        self.calls[route] += 1
+        self.bytes[route] += _payload_size(payload or {})
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delay(scale))
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {
+            'calls': sum(self.calls.values()),
+            'peak_in_flight': self.peak_in_flight,
+            'routes': {
+                route: {'calls': count, 'bytes': self.bytes[route]}
+                for route, count in self.calls.most_common()
+            },
+        }
+
+class FakeMessage:
+    def __init__(self, rest, channel_id):
+        self.rest = rest
+        self.id = random.getrandbits(63)
+        self.channel_id = channel_id
+
+    async def edit(self, **kwargs):
+        await self.rest.request('PATCH /channels/{channel}/messages/{message}', kwargs)
+        return self
+
+    async def delete(self):
+        await self.rest.request('DELETE /channels/{channel}/messages/{message}')
+
+class FakeChannel:
+    def __init__(self, rest, channel_id, name):
+        self.rest = rest
+        self.id = channel_id
+        self.name = name
+        self.mention = f"<#{channel_id}>"
+
+    async def send(self, **kwargs):
+        await self.rest.request('POST /channels/{channel}/messages', kwargs)
+        return FakeMessage(self.rest, self.id)
+
+class FakeRole:
+    def __init__(self, guild, role_id, name):
+        self.guild = guild
+        self.id = role_id
+        self.name = name
+        self.mention = f"<@&{role_id}>"
+
+    @property
+    def members(self):
+        return [member for member in self.guild.members if self.id in member.role_ids]
+
+    async def edit(self, **kwargs):
+        await self.guild.rest.request('PATCH /guilds/{guild}/roles/{role}', kwargs)
+        self.name = kwargs.get('name', self.name)
+        return self
+
+    async def delete(self, reason=None):
+        await self.guild.rest.request('DELETE /guilds/{guild}/roles/{role}')
+        self.guild.roles.remove(self)
+
+class FakeUser:
+    """The parts of discord.User that Member forwards to"""
+
+    def __init__(self, user_id, name):
+        self.id = user_id
+        self.name = name
+        self.global_name = None
+        self.bot = False
+
+    def __str__(self):
+        return self.name
+
+class FakeMember(discord.Member):
+    """A Member that passes isinstance checks but keeps its state locally"""
+
+    def __init__(self, guild, user_id, name, role_ids=(), admin=False, dm_open=True):
+        self._user = FakeUser(user_id, name)
+        self.guild = guild
+        self.nick = None
+        self.role_ids = set(role_ids)
+        self.admin = admin
+        self.dm_open = dm_open
+
+    def __repr__(self):
+        return f"<FakeMember id={self.id} name={self.name!r}>"
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    @property
+    def roles(self):
+        return [role for role in (self.guild.get_role(role_id) for role_id in self.role_ids) if role]
+
+    @property
+    def guild_permissions(self):
+        return discord.Permissions.all() if self.admin else discord.Permissions.none()
+
+    def get_role(self, role_id):
+        return self.guild.get_role(role_id) if role_id in self.role_ids else None
+
+    async def add_roles(self, *roles, reason=None, atomic=True):
+        for role in roles:
+            await self.guild.rest.request('PUT /guilds/{guild}/members/{member}/roles/{role}')
+            self.role_ids.add(role.id)
+
+    async def remove_roles(self, *roles, reason=None, atomic=True):
+        for role in roles:
+            await self.guild.rest.request('DELETE /guilds/{guild}/members/{member}/roles/{role}')
+            self.role_ids.discard(role.id)
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.rest.request('POST /users/@me/channels')
+        if not self.dm_open:
+            raise discord.Forbidden(_fake_response(403, 'Forbidden'), 'Cannot send messages to this user')
+        kwargs['content'] = content
+        await self.guild.rest.request('POST /channels/{channel}/messages', kwargs)
+
+class FakeGuild:
+    """A guild whose member cache behaves like the configured MEMBER_CACHE policy"""
+
+    def __init__(self, rest, guild_id, name, policy):
+        self.rest = rest
+        self.id = guild_id
+        self.name = name
+        self.policy = policy
+        self.roles = []
+        self.all_members = {}
+        self.text_channels = [FakeChannel(rest, guild_id + 1, 'general'), FakeChannel(rest, guild_id + 2, 'matches')]
+        self.chunk_requests = 0
+
+    @property
+    def chunked(self):
+        return self.policy == 'all'
+
+    @property
+    def members(self):
+        # Only the 'all' policy keeps members in the client cache
+        return list(self.all_members.values()) if self.policy == 'all' else []
+
+    def get_role(self, role_id):
+        for role in self.roles:
+            if role.id == role_id:
+                return role
+        return None
+
+    def get_member(self, user_id):
+        return self.all_members.get(user_id) if self.policy == 'all' else None
+
+    async def fetch_member(self, user_id):
+        await self.rest.request('GET /guilds/{guild}/members/{member}')
+        member = self.all_members.get(user_id)
+        if member is None:
+            raise discord.NotFound(_fake_response(404, 'Not Found'), 'Unknown Member')
+        return member
+
+    async def chunk(self, *, cache=True):
+        self.chunk_requests += 1
+        members = list(self.all_members.values())
+        # One gateway round trip, then the chunks stream in
+        await self.rest.request('GATEWAY request_guild_members', scale=1 + len(members) / CHUNK_SIZE * 0.05)
+        return members
+
+    async def create_role(self, name, color=None, reason=None, **kwargs):
+        await self.rest.request('POST /guilds/{guild}/roles', kwargs)
+        role = FakeRole(self, random.getrandbits(62), name)
+        self.roles.append(role)
+        return role
+
+class FakeResponse:
+    """InteractionResponse with Discord's one-response rule and 3 second deadline"""
+
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def _respond(self, kind, kwargs):
+        if self.done:
+            raise discord.InteractionResponded(self.interaction)
+        if time.perf_counter() - self.interaction.created > RESPONSE_DEADLINE:
+            self.interaction.expired = True
+            raise discord.NotFound(_fake_response(404, 'Not Found'), 'Unknown interaction')
+        await self.interaction.rest.request(f'POST /interactions/{{id}}/callback ({kind})', kwargs)
+        self.done = True
+        self.interaction.responded_after = time.perf_counter() - self.interaction.created
+
+    async def send_message(self, content=None, **kwargs):
+        kwargs['content'] = content
+        await self._respond('message', kwargs)
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        await self._respond('defer', {})
+
+    async def edit_message(self, **kwargs):
+        await self._respond('update', kwargs)
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        if not self.interaction.response.is_done():
+            raise discord.NotFound(_fake_response(404, 'Not Found'), 'Unknown Webhook')
+        kwargs['content'] = content
+        await self.interaction.rest.request('POST /webhooks/{application}/{token}', kwargs)
+        return FakeMessage(self.interaction.rest, self.interaction.channel_id)
+
+class FakeNamespace:
+    """Resolved options, iterable as (name, value) pairs like app_commands.Namespace"""
+
+    def __init__(self, options):
+        self.__dict__.update(options)
+
+    def __iter__(self):
+        return iter(self.__dict__.items())
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for the command callbacks and the tree hooks"""
+
+    def __init__(self, client, guild, user, command, rest, options=None):
+        self.id = random.getrandbits(63)
+        self.client = client
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = guild.text_channels[0]
+        self.channel_id = self.channel.id
+        self.command = command
+        self.namespace = FakeNamespace(options or {})
+        self.extras = {}
+        self.rest = rest
+        self.created = time.perf_counter()
+        self.expired = False
+        self.responded_after = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+class Picker:
+    """Random but realistic command arguments drawn from the generated league"""
+
+    def __init__(self, league, rng):
+        self.league = league
+        self.rng = rng
+
+    def club(self):
+        # A few big clubs get most of the attention
+        names = self.league.club_names
+        return names[min(int(self.rng.paretovariate(1.2)) - 1, len(names) - 1)] if self.rng.random() < 0.5 else self.rng.choice(names)
+
+    def player(self):
+        return self.rng.choice(self.league.player_names)
+
+    def fee(self):
+        return round(self.rng.uniform(1e5, 5e6), 2)
+
+    def kickoff(self):
+        when = time.localtime(time.time() + self.rng.randint(1, 60) * 86400)
+        return {'date': f"{when.tm_mday:02d}", 'time': f"{self.rng.randint(12, 21)}:00",
+                'year': when.tm_year, 'month': when.tm_mon}
+
+# command -> (weight, needs admin, argument factory)
+WORKLOADS = {
+    # A busy evening: mostly lookups, a steady trickle of transfers and fixtures
+    'evening': {
+        'club_info': (20, False, lambda p: {'name': p.club()}),
+        'player_info': (18, False, lambda p: {'name': p.player()}),
+        'list_clubs': (6, False, lambda p: {}),
+        'list_players': (6, False, lambda p: {'club': p.club()}),
+        'top_players': (8, False, lambda p: {'limit': 10}),
+        'richest_clubs': (5, False, lambda p: {'limit': 10}),
+        'club_rankings': (5, False, lambda p: {}),
+        'league_overview': (3, False, lambda p: {}),
+        'transfer_activity': (4, False, lambda p: {'limit': 10}),
+        'list_matches': (6, False, lambda p: {}),
+        'compare_clubs': (3, False, lambda p: {'club1': p.club(), 'club2': p.club()}),
+        'player_search': (3, False, lambda p: {'position': p.rng.choice(['Forward', 'Defender', 'Midfielder'])}),
+        'free_agents': (2, False, lambda p: {}),
+        'transfer_player': (5, True, lambda p: {'player_name': p.player(), 'to_club': p.club(), 'transfer_fee': p.fee()}),
+        'update_player_value': (3, True, lambda p: {'name': p.player(), 'value': p.fee()}),
+        'update_budget': (2, True, lambda p: {'name': p.club(), 'amount': p.fee() * 100}),
+        'create_match': (1, True, lambda p: {'team1': p.club(), 'team2': p.club(), **p.kickoff()}),
+    },
+    # Deadline day: transfers and valuations dominate
+    'transfer_window': {
+        'transfer_player': (30, True, lambda p: {'player_name': p.player(), 'to_club': p.club(), 'transfer_fee': p.fee()}),
+        'update_player_value': (15, True, lambda p: {'name': p.player(), 'value': p.fee()}),
+        'update_budget': (5, True, lambda p: {'name': p.club(), 'amount': p.fee() * 100}),
+        'transfer_activity': (15, False, lambda p: {'limit': 10}),
+        'club_info': (15, False, lambda p: {'name': p.club()}),
+        'player_info': (10, False, lambda p: {'name': p.player()}),
+        'richest_clubs': (5, False, lambda p: {'limit': 10}),
+        'club_rankings': (5, False, lambda p: {}),
+    },
+    # Rendered cards, to see how image work competes with everything else
+    'cards': {
+        'club_info': (40, False, lambda p: {'name': p.club(), 'card': p.rng.random() < 0.5}),
+        'top_players': (20, False, lambda p: {'limit': 10, 'card': True}),
+        'club_rankings': (20, False, lambda p: {'card': True}),
+        'player_info': (20, False, lambda p: {'name': p.player()}),
+    },
+}
+
+def build_guild(db, guild_id, rest, policy, seed=0):
+    """Guild with a role per club and a member for every player linked to a Discord user"""
+    rng = random.Random(seed)
+    guild = FakeGuild(rest, guild_id, 'Benchmark League', policy)
+    with db.get_connection() as conn:
+        clubs = conn.execute('SELECT role_id, name FROM clubs WHERE guild_id = ?', (guild_id,)).fetchall()
+        players = conn.execute(
+            '''SELECT p.discord_user_id, c.role_id FROM players p LEFT JOIN clubs c ON p.club_id = c.id
+               WHERE p.guild_id = ? AND p.discord_user_id IS NOT NULL''',
+            (guild_id,)
+        ).fetchall()
+    guild.roles = [FakeRole(guild, club['role_id'], club['name']) for club in clubs if club['role_id']]
+    for player in players:
+        user_id = player['discord_user_id']
+        guild.all_members[user_id] = FakeMember(
+            guild, user_id, f"user{user_id % 100000}",
+            role_ids=[player['role_id']] if player['role_id'] else [],
+            dm_open=rng.random() < 0.8
+        )
+    return guild
+
+def build_bot(db_path, data_dir, policy):
+    """A FootballBot wired to the benchmark database that never logs in"""
+    os.environ['DATABASE_PATH'] = db_path
+    os.environ['DATA_DIR'] = data_dir
+    os.environ['MEMBER_CACHE'] = policy
+    from bot import FootballBot
+
+    # The tracer is created at import, possibly before DATA_DIR pointed here
+    spans.path = os.path.join(data_dir, 'traces', 'traces.jsonl')
+    bot = FootballBot()
+    bot.db.initialize()
+    return bot
+
+async def dispatch(bot, guild, rest, command, kwargs, user):
+    """Run one interaction the way CommandTree._call does once arguments are parsed"""
+    interaction = FakeInteraction(bot, guild, user, command, rest, kwargs)
+    try:
+        if not await bot.tree.interaction_check(interaction):
+            return interaction
+        if not await command._check_can_run(interaction):
+            raise app_commands.CheckFailure(f"The check functions for command {command.name!r} failed.")
+        await command._do_call(interaction, kwargs)
+    except app_commands.AppCommandError as e:
+        await bot.tree.on_error(interaction, e)
+    else:
+        await bot.on_app_command_completion(interaction, command)
+    return interaction
+
+async def run_load(bot, guild, rest, league, workload='evening', rate=20.0, duration=30.0,
+                   max_in_flight=None, seed=0):
+    """Fire interactions at `rate` per second for `duration` seconds and wait for them to finish"""
+    rng = random.Random(seed)
+    picker = Picker(league, rng)
+    mix = WORKLOADS[workload]
+    names = list(mix)
+    weights = [mix[name][0] for name in names]
+    commands = {name: bot.tree.get_command(name) for name in names}
+    missing = [name for name, command in commands.items() if command is None]
+    if missing:
+        raise ValueError(f"Workload {workload!r} uses unknown commands: {', '.join(missing)}")
+
+    admin = FakeMember(guild, 1, 'league-admin', admin=True)
+    fans = list(guild.all_members.values())[:500] or [FakeMember(guild, 2, 'fan')]
+    limiter = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+    tasks = set()
+    interactions = []
+    dropped = 0
+
+    async def one(name, kwargs, user):
+        try:
+            interactions.append(await dispatch(bot, guild, rest, commands[name], kwargs, user))
+        finally:
+            if limiter:
+                limiter.release()
+
+    started = time.perf_counter()
+    deadline = started + duration
+    next_at = started
+    while True:
+        next_at += rng.expovariate(rate)
+        if next_at >= deadline:
+            break
+        await asyncio.sleep(max(next_at - time.perf_counter(), 0))
+        if limiter and limiter.locked():
+            dropped += 1
+            continue
+        if limiter:
+            await limiter.acquire()
+        name = rng.choices(names, weights)[0]
+        _, needs_admin, arguments = mix[name]
+        user = admin if needs_admin else rng.choice(fans)
+        task = asyncio.create_task(one(name, arguments(picker), user), name=f"harness:{name}")
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return summarize(interactions, time.perf_counter() - started, dropped)
+
+def summarize(interactions, elapsed, dropped=0):
+    """Totals over finished FakeInteractions"""
+    responded = sorted(i.responded_after for i in interactions if i.responded_after is not None)
+    return {
+        'interactions': len(interactions),
+        'dropped': dropped,
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_per_second': round(len(interactions) / elapsed, 2) if elapsed else None,
+        'expired': sum(1 for i in interactions if i.expired),
+        'unanswered': sum(1 for i in interactions if i.responded_after is None),
+        'first_response_p99_ms': round(responded[min(len(responded) - 1, int(len(responded) * 0.99))] * 1000, 1) if responded else None,
+    }
+
+async def run(size='small', seed=42, workload='evening', rate=20.0, duration=30.0, max_in_flight=None,
+              rest_latency_ms=80.0, rest_jitter=0.25, policy='lazy', workdir=None, capture_dir=None):
+    """Generate a league, load it with a workload, and return the results document"""
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix='football-load-') as workdir:
+            return await run(size, seed, workload, rate, duration, max_in_flight,
+                             rest_latency_ms, rest_jitter, policy, workdir, capture_dir)
+
+    db_path = os.path.join(workdir, 'league.db')
+    league = generate(db_path, size, seed)
+    bot = build_bot(db_path, os.path.join(workdir, 'data'), policy)
+    rest = RecordingRest(rest_latency_ms, rest_jitter, seed)
+    guild = build_guild(bot.db, league.guild_id, rest, policy, seed)
+
+    if capture_dir:
+        recorder.root = capture_dir
+        await recorder.start(bot.db)
+
+    bot.loop_monitor.start()
+    try:
+        summary = await run_load(bot, guild, rest, league, workload, rate, duration, max_in_flight, seed)
+    finally:
+        await close_bot(bot)
+
+    return {
+        'meta': {
+            'size': size,
+            'seed': seed,
+            'workload': workload,
+            'rate': rate,
+            'duration': duration,
+            'max_in_flight': max_in_flight,
+            'member_cache': policy,
+            'rest_latency_ms': rest_latency_ms,
+            'rest_jitter': rest_jitter,
+            'clubs': len(league.club_ids),
+            'players': len(league.player_ids),
+            'members': len(guild.all_members),
+        },
+        'summary': summary,
+        'commands': command_results(bot, summary),
+        'rest': rest.stats(),
+        'event_loop': loop_results(bot),
+        'member_cache': {'chunk_requests': guild.chunk_requests, **bot.members.stats()},
+    }
+
+async def close_bot(bot):
+    """Stop what build_bot's FootballBot started without going through a gateway close"""
+    recorder.stop()
+    spans.stop()
+    bot.profiler.stop()
+    bot.loop_monitor.stop()
+    bot.live_boards.close()
+    bot.card_renderer.close()
+    await bot.crests.close()
+    await bot.http.close()
+
+def command_results(bot, summary):
+    """The bot's per-command latency histograms plus throughput"""
+    elapsed = summary['elapsed_seconds'] or math.inf
+    commands = bot.perf.snapshot()
+    for stats in commands.values():
+        stats['throughput_per_second'] = round(stats['total']['count'] / elapsed, 2)
+    return commands
+
+def loop_results(bot):
+    loop = bot.loop_monitor.stats()
+    for stall in loop['recent_stalls']:
+        stall.pop('stack', None)
+    return loop
+
+def print_report(result, file=sys.stderr):
+    summary = result['summary']
+    print(
+        f"\n{summary['interactions']} interactions in {summary['elapsed_seconds']}s "
+        f"({summary['throughput_per_second']}/s), {summary['expired']} expired, "
+        f"{summary['unanswered']} unanswered, {summary['dropped']} dropped",
+        file=file
+    )
+    print(f"\n{'command':22} {'count':>6} {'/s':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} "
+          f"{'db':>7} {'rest':>7} {'errors':>6}", file=file)
+    for name, stats in result['commands'].items():
+        total = stats['total']
+        print(
+            f"{name:22} {total['count']:6} {stats['throughput_per_second']:6.1f} "
+            f"{total['p50_ms']:8.1f} {total['p90_ms']:8.1f} {total['p99_ms']:8.1f} {total['max_ms']:8.1f} "
+            f"{stats['db']['mean_ms']:7.1f} {stats['rest']['mean_ms']:7.1f} {stats['errors']:6}",
+            file=file
+        )
+    loop = result['event_loop']
+    print(f"\nEvent loop lag p50 {loop['p50_ms']}ms, p99 {loop['p99_ms']}ms, max {loop['max_ms']}ms, "
+          f"{loop['stalls']} stall(s) over {loop['threshold_ms']}ms", file=file)
+    print(f"REST calls {result['rest']['calls']}, peak in flight {result['rest']['peak_in_flight']}", file=file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the slash commands with a synthetic offline workload")
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workload', choices=WORKLOADS, default='evening')
+    parser.add_argument('--rate', type=float, default=20.0, help="Interactions per second")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument('--max-in-flight', type=int, help="Drop arrivals beyond this many concurrent interactions")
+    parser.add_argument('--rest-latency-ms', type=float, default=80.0)
+    parser.add_argument('--rest-jitter', type=float, default=0.25, help="Latency standard deviation as a fraction of the mean")
+    parser.add_argument('--member-cache', choices=('all', 'lazy', 'none'), default='lazy')
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--capture', metavar='DIR', help="Also record the run as a traffic capture under DIR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    result = asyncio.run(run(
+        args.size, args.seed, args.workload, args.rate, args.duration, args.max_in_flight,
+        args.rest_latency_ms, args.rest_jitter, args.member_cache, capture_dir=args.capture
+    ))
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Deterministic synthetic league generator for benchmarks
+
+    python -m benchmarks.league --size medium --output /tmp/league.db
+"""
+import os
+import random
+import argparse
+from datetime import datetime, timedelta
+from database import Database
+
+# clubs, players and transfers in the benchmarked guild
+SIZES = {
+    'tiny': (10, 200, 500),
+    'small': (50, 2_000, 10_000),
+    'medium': (500, 50_000, 200_000),
+    'large': (2_000, 250_000, 1_000_000),
+    'huge': (5_000, 1_000_000, 5_000_000),
+}
+
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward', 'Winger', 'Striker', 'Unknown']
+FIRST_NAMES = ['Luca', 'Mateo', 'Noah', 'Leo', 'Hugo', 'Jonas', 'Marco', 'Diego', 'Kai', 'Ivan', 'Omar', 'Tomas']
+LAST_NAMES = ['Silva', 'Costa', 'Muller', 'Rossi', 'Kane', 'Novak', 'Garcia', 'Berg', 'Dubois', 'Sato', 'Okafor', 'Lind']
+
+# The benchmarked guild, plus background guilds so per-guild filters have something to filter out
+GUILD_ID = 1_100_000_000_000_000_001
+BACKGROUND_GUILDS = 3
+BATCH = 50_000
+
+class League:
+    """What was generated, so scenarios can pick realistic arguments"""
+
+    def __init__(self, path, guild_id, size, club_ids, player_ids, club_names, player_names):
+        self.path = path
+        self.guild_id = guild_id
+        self.size = size
+        self.club_ids = club_ids
+        self.player_ids = player_ids
+        self.club_names = club_names
+        self.player_names = player_names
+
+def generate(path, size='small', seed=42, clubs=None, players=None, transfers=None):
+    """Create a league database at `path`; the same seed always produces the same data"""
+    if os.path.exists(path):
+        os.remove(path)
+    club_count, player_count, transfer_count = SIZES[size]
+    club_count = clubs or club_count
+    player_count = players or player_count
+    transfer_count = transfers if transfers is not None else transfer_count
+
+    rng = random.Random(seed)
+    db = Database(path)
+    db.initialize()
+
+    guilds = [GUILD_ID] + [GUILD_ID + (n << 22) for n in range(1, BACKGROUND_GUILDS + 1)]
+    league = None
+    with db.get_connection() as conn:
+        conn.execute('PRAGMA synchronous=OFF')
+        for guild_index, guild_id in enumerate(guilds):
+            # Background guilds are a tenth of the size
+            scale = 1 if guild_index == 0 else 10
+            ids = _populate_guild(
+                conn, rng, guild_id, guild_index,
+                max(club_count // scale, 2), max(player_count // scale, 1), transfer_count // scale
+            )
+            if guild_index == 0:
+                league = League(path, guild_id, size, *ids)
+        conn.commit()
+        conn.execute('ANALYZE')
+    return league
+
+def _populate_guild(conn, rng, guild_id, guild_index, club_count, player_count, transfer_count):
+    first_club = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM clubs').fetchone()[0]
+    first_player = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM players').fetchone()[0]
+
+    # Club names are unique across all guilds
+    club_names = [f"G{guild_index} FC {n:05d}" for n in range(club_count)]
+    conn.executemany(
+        'INSERT INTO clubs (id, name, budget, guild_id, role_id) VALUES (?, ?, ?, ?, ?)',
+        (
+            (first_club + n, name, round(rng.uniform(1e6, 5e8), 2), guild_id, 900_000_000_000_000_000 + first_club + n)
+            for n, name in enumerate(club_names)
+        )
+    )
+    club_ids = list(range(first_club, first_club + club_count))
+
+    player_names = []
+    for start in range(0, player_count, BATCH):
+        rows = []
+        for n in range(start, min(start + BATCH, player_count)):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}"
+            player_names.append(name)
+            club_id = rng.choice(club_ids) if rng.random() < 0.85 else None  # ~15% free agents
+            discord_user_id = 800_000_000_000_000_000 + first_player + n if rng.random() < 0.3 else None
+            rows.append((
+                first_player + n, name, round(rng.lognormvariate(14, 1.2), 2), club_id,
+                rng.choice(POSITIONS), rng.randint(16, 38), discord_user_id, guild_id
+            ))
+        conn.executemany(
+            '''INSERT INTO players (id, name, value, club_id, position, age, discord_user_id, guild_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            rows
+        )
+    player_ids = list(range(first_player, first_player + player_count))
+
+    start_date = datetime(2024, 1, 1)
+    for start in range(0, transfer_count, BATCH):
+        rows = []
+        for n in range(start, min(start + BATCH, transfer_count)):
+            from_club, to_club = rng.sample(club_ids, 2)
+            when = start_date + timedelta(minutes=n * 7)
+            rows.append((rng.choice(player_ids), from_club, to_club, round(rng.uniform(0, 5e7), 2),
+                         when.strftime('%Y-%m-%d %H:%M:%S'), guild_id))
+        conn.executemany(
+            '''INSERT INTO transfers (player_id, from_club_id, to_club_id, transfer_fee, transfer_date, guild_id)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            rows
+        )
+
+    # A season of fixtures, with a few kicking off within the reminder window
+    now = datetime.now()
+    matches = []
+    for n in range(max(club_count, 2)):
+        team1, team2 = rng.sample(club_ids, 2)
+        when = now + timedelta(minutes=2) if n < 3 else now + timedelta(days=rng.randint(-120, 120))
+        matches.append((team1, team2, when.strftime('%Y-%m-%d %H:%M:%S'), guild_id, 1))
+    conn.executemany(
+        'INSERT INTO matches (team1_id, team2_id, match_date, guild_id, created_by) VALUES (?, ?, ?, ?, ?)',
+        matches
+    )
+    return club_ids, player_ids, club_names, player_names
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic league database")
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='league.db')
+    args = parser.parse_args()
+
+    league = generate(args.output, args.size, args.seed)
+    print(f"Generated {args.size} league at {league.path}: {len(league.club_ids)} clubs, {len(league.player_ids)} players")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""Replay a traffic capture through the bot against its anonymised snapshot
+
+    python -m benchmarks.replay data/captures/20261017-180000-4242
+    python -m benchmarks.replay data/captures/20261017-180000-4242 --speed 4 --output replay.json
+
+Interactions start at their captured offsets divided by `--speed` (0 sends
+them as fast as the loop allows). Each run works on a fresh copy of the
+snapshot, so replays are repeatable. The report compares the latency and
+query count of each command with what was captured.
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+from collections import Counter, defaultdict
+from contextlib import closing
+from perf import current_timing
+from query_trace import tracer
+from benchmarks.harness import (
+    RecordingRest, FakeMember, build_bot, build_guild, dispatch, summarize,
+    close_bot, command_results, loop_results, print_report,
+)
+
+def load_capture(path):
+    """Interactions from a capture, in arrival order, with their captured outcome and query count"""
+    header = None
+    interactions = {}
+    finished = {}
+    queries = Counter()
+    with gzip.open(os.path.join(path, 'events.jsonl.gz'), 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                break  # A capture cut off mid-write; keep what was complete
+            kind = event.get('type')
+            if kind == 'header':
+                header = event
+            elif kind == 'interaction':
+                interactions[event['id']] = event
+            elif kind == 'finish':
+                finished[event['id']] = event
+            elif kind == 'query' and event.get('id') is not None:
+                queries[event['id']] += 1
+
+    ordered = sorted(interactions.values(), key=lambda event: event['t'])
+    for event in ordered:
+        event['captured'] = finished.get(event['id'])
+        event['queries'] = queries[event['id']]
+    return header, ordered
+
+def captured_stats(interactions):
+    """Per-command latency and queries per interaction as captured"""
+    latencies = defaultdict(list)
+    queries = defaultdict(list)
+    for event in interactions:
+        captured = event['captured']
+        if captured and 'ms' in captured:
+            latencies[event['command']].append(captured['ms'])
+            queries[event['command']].append(event['queries'])
+    return {
+        command: {
+            'count': len(samples),
+            'p50_ms': round(_percentile(samples, 50), 2),
+            'p99_ms': round(_percentile(samples, 99), 2),
+            'queries': round(statistics.fmean(queries[command]), 2),
+        }
+        for command, samples in latencies.items()
+    }
+
+def _percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+class Replayer:
+    """Turns captured events back into interactions against fake guilds and members"""
+
+    def __init__(self, bot, rest, policy):
+        self.bot = bot
+        self.rest = rest
+        self.policy = policy
+        self.guilds = {}
+        self.skipped = Counter()
+        self.queries = Counter()  # command -> statements run during the replay
+
+    def guild(self, guild_id):
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = build_guild(self.bot.db, guild_id, self.rest, self.policy)
+        return guild
+
+    def member(self, guild, user_id, admin=False):
+        member = guild.all_members.get(user_id)
+        if member is None:
+            member = guild.all_members[user_id] = FakeMember(guild, user_id, f"user{user_id % 100000}")
+        member.admin = member.admin or admin
+        return member
+
+    def options(self, guild, options):
+        """Captured options as command arguments, or None if they can't be replayed"""
+        kwargs = {}
+        for name, value in options.items():
+            if isinstance(value, dict):
+                if 'attachment' in value:
+                    return None  # Uploaded files aren't captured
+                if 'user' in value:
+                    value = self.member(guild, value['user'])
+                else:
+                    value = None
+            kwargs[name] = value
+        return kwargs
+
+    def count_query(self, connection, sql, params, elapsed_ms, rows):
+        timing = current_timing.get()
+        if timing is not None:
+            self.queries[timing.command] += 1
+
+    async def replay(self, interactions, speed=1.0):
+        tasks = []
+        results = []
+        origin = interactions[0]['t'] if interactions else 0
+        started = time.perf_counter()
+
+        async def one(guild, command, kwargs, user):
+            results.append(await dispatch(self.bot, guild, self.rest, command, kwargs, user))
+
+        for event in interactions:
+            command = self.bot.tree.get_command(event['command'] or '')
+            if command is None:
+                self.skipped['unknown command'] += 1
+                continue
+            guild = self.guild(event['guild'])
+            kwargs = self.options(guild, event['options'])
+            if kwargs is None:
+                self.skipped['attachment'] += 1
+                continue
+            user = self.member(guild, event['user'], event.get('admin', False))
+
+            if speed:
+                delay = started + (event['t'] - origin) / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(guild, command, kwargs, user), name=f"replay:{event['command']}"))
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        return summarize(results, time.perf_counter() - started)
+
+async def run(path, speed=1.0, limit=None, rest_latency_ms=80.0, rest_jitter=0.25, policy='lazy', workdir=None):
+    """Replay a capture on a copy of its snapshot and return the results document"""
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix='football-replay-') as workdir:
+            return await run(path, speed, limit, rest_latency_ms, rest_jitter, policy, workdir)
+
+    header, interactions = load_capture(path)
+    if limit:
+        interactions = interactions[:limit]
+
+    db_path = os.path.join(workdir, 'replay.db')
+    with closing(sqlite3.connect(os.path.join(path, 'snapshot.db'))) as source, closing(sqlite3.connect(db_path)) as target:
+        source.backup(target)
+
+    bot = build_bot(db_path, os.path.join(workdir, 'data'), policy)
+    rest = RecordingRest(rest_latency_ms, rest_jitter)
+    replayer = Replayer(bot, rest, policy)
+    tracer.listeners.append(replayer.count_query)
+
+    bot.loop_monitor.start()
+    try:
+        summary = await replayer.replay(interactions, speed)
+    finally:
+        tracer.listeners.remove(replayer.count_query)
+        await close_bot(bot)
+
+    commands = command_results(bot, summary)
+    for name, stats in commands.items():
+        stats['queries'] = round(replayer.queries[name] / stats['total']['count'], 2) if stats['total']['count'] else None
+    summary['skipped'] = dict(replayer.skipped)
+    return {
+        'meta': {
+            'capture': os.path.abspath(path),
+            'captured_at': header.get('started_at') if header else None,
+            'speed': speed,
+            'member_cache': policy,
+            'rest_latency_ms': rest_latency_ms,
+            'rest_jitter': rest_jitter,
+            'guilds': len(replayer.guilds),
+        },
+        'summary': summary,
+        'commands': commands,
+        'captured': captured_stats(interactions),
+        'rest': rest.stats(),
+        'event_loop': loop_results(bot),
+        'member_cache': {
+            'chunk_requests': sum(guild.chunk_requests for guild in replayer.guilds.values()),
+            **bot.members.stats(),
+        },
+    }
+
+def print_comparison(result, file=sys.stderr):
+    print(f"\n{'command':22} {'captured p50':>12} {'replay p50':>11} {'captured p99':>12} {'replay p99':>11} "
+          f"{'queries':>8} {'replay':>7}", file=file)
+    for name, stats in result['commands'].items():
+        captured = result['captured'].get(name)
+        if not captured:
+            continue
+        print(
+            f"{name:22} {captured['p50_ms']:12.1f} {stats['total']['p50_ms']:11.1f} "
+            f"{captured['p99_ms']:12.1f} {stats['total']['p99_ms']:11.1f} "
+            f"{captured['queries']:8.1f} {stats['queries']:7.1f}",
+            file=file
+        )
+    if result['summary']['skipped']:
+        skipped = ', '.join(f"{count} {reason}" for reason, count in result['summary']['skipped'].items())
+        print(f"\nSkipped: {skipped}", file=file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a traffic capture against its database snapshot")
+    parser.add_argument('capture', help="Capture directory holding events.jsonl.gz and snapshot.db")
+    parser.add_argument('--speed', type=float, default=1.0, help="Time acceleration; 0 replays without waiting")
+    parser.add_argument('--limit', type=int, help="Only replay the first N interactions")
+    parser.add_argument('--rest-latency-ms', type=float, default=80.0)
+    parser.add_argument('--rest-jitter', type=float, default=0.25)
+    parser.add_argument('--member-cache', choices=('all', 'lazy', 'none'), default='lazy')
+    parser.add_argument('--output', help="Write results JSON here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    result = asyncio.run(run(
+        args.capture, args.speed, args.limit, args.rest_latency_ms, args.rest_jitter, args.member_cache
+    ))
+    print_report(result)
+    print_comparison(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == '__main__':
+    main()
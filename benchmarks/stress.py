@@ -0,0 +1,247 @@
+"""Concurrency stress suite for transfers, budgets and club deletion
+
+    python -m benchmarks.stress --scenario transfers --ops 5000 --workers 16
+    python -m benchmarks.stress --scenario mixed --ops 5000 --workers 8 --mode process
+
+Fires a seeded stream of Database operations from many threads or processes
+at once against a generated league. It then checks that league finances
+survived, reports throughput and latency per operation, and exits with
+status 1 on any violation.
+
+Invariants:
+  - no club has a negative budget
+  - every player's club exists in the same guild (or the player is a free agent)
+  - each player's transfers form an unbroken chain from their starting club
+    to their current one; a chain may only break where a club was deleted
+  - one transfer row per successful transfer call
+  - with transfers only, total money is conserved except for fees paid for
+    free agents, which leave the league
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from database import Database
+from benchmarks.league import generate, SIZES
+
+SCENARIOS = {
+    # operation -> weight
+    'transfers': {'transfer': 1},
+    'mixed': {'transfer': 85, 'update_budget': 8, 'set_budgets_bulk': 1, 'delete_club': 1, 'create_club': 5},
+}
+
+# Most transfers fight over a few stars so the same rows are contended
+HOT_PLAYERS = 20
+
+def plan(league, scenario, ops, seed):
+    """A deterministic list of (operation, args) for a scenario"""
+    rng = random.Random(seed)
+    mix = SCENARIOS[scenario]
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    hot = rng.sample(league.player_ids, min(HOT_PLAYERS, len(league.player_ids)))
+    counter = 0
+
+    operations = []
+    for _ in range(ops):
+        name = rng.choices(names, weights)[0]
+        if name == 'transfer':
+            player = rng.choice(hot) if rng.random() < 0.5 else rng.choice(league.player_ids)
+            # Some fees are far beyond any budget and must be refused
+            fee = rng.uniform(1e9, 1e10) if rng.random() < 0.1 else round(rng.uniform(0, 5e7), 2)
+            args = (player, rng.choice(league.club_ids), fee, league.guild_id)
+        elif name == 'update_budget':
+            args = (rng.choice(league.club_ids), round(rng.uniform(0, 5e8), 2))
+        elif name == 'set_budgets_bulk':
+            args = (league.guild_id, round(rng.uniform(1e7, 5e8), 2))
+        elif name == 'delete_club':
+            args = (rng.choice(league.club_ids),)
+        else:
+            counter += 1
+            args = (f"Stress Club {seed}-{counter}", round(rng.uniform(1e6, 5e8), 2), league.guild_id)
+        operations.append((name, args))
+    return operations
+
+def _call(db, name, args):
+    if name == 'transfer':
+        return db.transfer_player(*args)
+    if name == 'update_budget':
+        return db.update_club_budget(*args)
+    if name == 'set_budgets_bulk':
+        return db.set_all_club_budgets(*args) >= 0
+    if name == 'delete_club':
+        return db.delete_club(*args)
+    return db.create_club(*args) is not None
+
+def run_batch(path, operations):
+    """Run operations in order on one worker; returns (name, outcome, ms) for each"""
+    db = Database(path)
+    results = []
+    for name, args in operations:
+        start = time.perf_counter()
+        try:
+            outcome = 'ok' if _call(db, name, args) else 'refused'
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}: {e}"
+        results.append((name, outcome, (time.perf_counter() - start) * 1000))
+    return results
+
+def snapshot(db, guild_id):
+    with db.get_connection() as conn:
+        return {
+            'budget': conn.execute('SELECT COALESCE(SUM(budget), 0) FROM clubs WHERE guild_id = ?', (guild_id,)).fetchone()[0],
+            'players': {row['id']: row['club_id'] for row in conn.execute(
+                'SELECT id, club_id FROM players WHERE guild_id = ?', (guild_id,))},
+            'last_transfer': conn.execute('SELECT COALESCE(MAX(id), 0) FROM transfers').fetchone()[0],
+        }
+
+def check_invariants(db, guild_id, before, scenario, succeeded):
+    """List of human-readable violations; empty when the league is consistent"""
+    violations = []
+    with db.get_connection() as conn:
+        negative = conn.execute('SELECT id, budget FROM clubs WHERE budget < 0').fetchall()
+        for club in negative[:10]:
+            violations.append(f"club {club['id']} has a negative budget ({club['budget']:.2f})")
+
+        clubs = {row['id']: row['guild_id'] for row in conn.execute('SELECT id, guild_id FROM clubs')}
+        players = {row['id']: row['club_id'] for row in conn.execute(
+            'SELECT id, club_id FROM players WHERE guild_id = ?', (guild_id,))}
+        dangling = [(player, club) for player, club in players.items()
+                    if club is not None and clubs.get(club) != guild_id]
+        for player, club in dangling[:10]:
+            violations.append(f"player {player} belongs to missing or foreign club {club}")
+        if len(dangling) > 10:
+            violations.append(f"... and {len(dangling) - 10} more players with a missing club")
+
+        transfers = conn.execute(
+            'SELECT id, player_id, from_club_id, to_club_id, transfer_fee FROM transfers WHERE id > ? ORDER BY id',
+            (before['last_transfer'],)
+        ).fetchall()
+        budget_after = conn.execute(
+            'SELECT COALESCE(SUM(budget), 0) FROM clubs WHERE guild_id = ?', (guild_id,)).fetchone()[0]
+
+    if len(transfers) != succeeded.get('transfer', 0):
+        violations.append(f"{succeeded.get('transfer', 0)} transfers succeeded but {len(transfers)} were recorded")
+
+    # Walk each player's transfers in commit order
+    holder = dict(before['players'])
+    broken = []
+    for transfer in transfers:
+        player = transfer['player_id']
+        expected = holder.get(player)
+        if transfer['from_club_id'] != expected:
+            # Only legitimate if the club the player was at has since been deleted
+            if not (transfer['from_club_id'] is None and expected not in clubs):
+                broken.append(f"transfer {transfer['id']}: player {player} left club {transfer['from_club_id']} "
+                              f"but was at {expected}")
+        holder[player] = transfer['to_club_id']
+    for player, club in players.items():
+        expected = holder.get(player)
+        if club != expected and not (club is None and expected not in clubs):
+            broken.append(f"player {player} is at club {club} but their last transfer was to {expected}")
+    violations.extend(broken[:10])
+    if len(broken) > 10:
+        violations.append(f"... and {len(broken) - 10} more transfer chain breaks")
+
+    if scenario == 'transfers':
+        leaked = sum(transfer['transfer_fee'] for transfer in transfers if transfer['from_club_id'] is None)
+        expected_budget = before['budget'] - leaked
+        if abs(budget_after - expected_budget) > max(1e-6 * abs(expected_budget), 0.01):
+            violations.append(f"money not conserved: expected {expected_budget:,.2f} in club budgets, "
+                              f"found {budget_after:,.2f}")
+    return violations
+
+def _percentile(samples, p):
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] if samples else None
+
+def run(size='small', seed=42, scenario='transfers', ops=5000, workers=16, mode='thread', workdir=None):
+    """Generate a league, hammer it, and return the results document"""
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix='football-stress-') as workdir:
+            return run(size, seed, scenario, ops, workers, mode, workdir)
+
+    path = os.path.join(workdir, 'stress.db')
+    league = generate(path, size, seed)
+    db = Database(path)
+    before = snapshot(db, league.guild_id)
+
+    operations = plan(league, scenario, ops, seed)
+    batches = [operations[n::workers] for n in range(workers)]
+    executor_class = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+
+    start = time.perf_counter()
+    with executor_class(max_workers=workers) as executor:
+        results = [result for batch in executor.map(run_batch, [path] * workers, batches) for result in batch]
+    elapsed = time.perf_counter() - start
+
+    outcomes = defaultdict(Counter)
+    latencies = defaultdict(list)
+    errors = Counter()
+    for name, outcome, ms in results:
+        outcomes[name]['error' if outcome.startswith('error') else outcome] += 1
+        latencies[name].append(ms)
+        if outcome.startswith('error'):
+            errors[outcome] += 1
+    succeeded = {name: counts['ok'] for name, counts in outcomes.items()}
+
+    violations = check_invariants(db, league.guild_id, before, scenario, succeeded)
+
+    operations_report = {}
+    for name, samples in latencies.items():
+        samples.sort()
+        operations_report[name] = {
+            **outcomes[name],
+            'per_second': round(len(samples) / elapsed, 1),
+            'p50_ms': round(_percentile(samples, 50), 2),
+            'p99_ms': round(_percentile(samples, 99), 2),
+            'max_ms': round(samples[-1], 2),
+        }
+    return {
+        'meta': {'size': size, 'seed': seed, 'scenario': scenario, 'ops': ops, 'workers': workers, 'mode': mode},
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_per_second': round(len(results) / elapsed, 1),
+        'operations': operations_report,
+        'errors': dict(errors.most_common(10)),
+        'violations': violations,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check league finances under concurrent transfers and budget changes")
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenario', choices=SCENARIOS, default='transfers')
+    parser.add_argument('--ops', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--mode', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--output', help="Write results JSON here")
+    args = parser.parse_args()
+
+    result = run(args.size, args.seed, args.scenario, args.ops, args.workers, args.mode)
+    print(f"{args.ops} operations in {result['elapsed_seconds']}s ({result['throughput_per_second']}/s) "
+          f"with {args.workers} {args.mode} workers", file=sys.stderr)
+    print(f"\n{'operation':18} {'ok':>6} {'refused':>8} {'error':>6} {'/s':>8} {'p50':>8} {'p99':>8} {'max':>8}", file=sys.stderr)
+    for name, stats in result['operations'].items():
+        print(f"{name:18} {stats.get('ok', 0):6} {stats.get('refused', 0):8} {stats.get('error', 0):6} "
+              f"{stats['per_second']:8.1f} {stats['p50_ms']:8.2f} {stats['p99_ms']:8.2f} {stats['max_ms']:8.2f}",
+              file=sys.stderr)
+    for error, count in result['errors'].items():
+        print(f"  {count} x {error}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if result['violations']:
+        print(f"\n{len(result['violations'])} invariant violation(s):", file=sys.stderr)
+        for violation in result['violations']:
+            print(f"  - {violation}", file=sys.stderr)
+        sys.exit(1)
+    print("\nAll invariants hold", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
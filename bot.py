@@ -2,10 +2,28 @@ import discord
 from discord.ext import commands, tasks
 import logging
 import asyncio
+import time
 from datetime import datetime, timedelta
 import os
 from database import Database
 from utils import create_embed, is_admin, RateLimitHandler
+from live_boards import LiveBoardManager
+from cards import CardRenderer
+from crests import CrestStore
+from leader import LeaderElector
+from startup import timeline
+from command_sync import CommandSync
+from command_tree import FootballCommandTree
+from loop_monitor import LoopMonitor
+from capture import recorder
+from memory import diagnostics, cache_stats
+from profiler import SamplingProfiler
+from query_trace import tracer
+from tracing import spans
+from metrics import Family, registry, log_histogram, reminder_lag_seconds, reminder_run_seconds, reminders_sent, LATENCY_BUCKETS
+from logging_config import pipeline_stats
+from perf import PerfRegistry, instrument_rest, install_error_marker
+from member_cache import MemberDirectory, member_cache_policy, client_options
 
 # Import command modules
 from commands.admin import AdminCommands
@@ -16,44 +34,176 @@ from commands.stats import StatsCommands
 
 logger = logging.getLogger(__name__)
 
-class FootballBot(commands.Bot):
-    def __init__(self):
-        # Configure bot intents with enhanced rate limiting protection
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.guilds = True
-        intents.members = True
+class FootballBot(commands.AutoShardedBot):
+    def __init__(self, shard_ids=None, shard_count=None, cluster_id=None):
+        # Only slash commands are used, so no message content; members are cached per MEMBER_CACHE
+        member_policy = member_cache_policy()
         
         super().__init__(
             command_prefix='!',
-            intents=intents,
             help_command=None,
-            case_insensitive=True
+            case_insensitive=True,
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+            tree_cls=FootballCommandTree,
+            **client_options(member_policy)
         )
         
+        # In cluster mode this process only owns some shards (and their guilds)
+        self.cluster_id = cluster_id
+        self.owned_shard_ids = shard_ids
+        
         self.db = Database()
         self.rate_limiter = RateLimitHandler()
+        self.live_boards = LiveBoardManager(self)
+        self.card_renderer = CardRenderer()
+        self.crests = CrestStore()
+        self.members = MemberDirectory(self, member_policy)
+        self.command_sync = CommandSync(self)
+        self.perf = PerfRegistry()
+        self.loop_monitor = LoopMonitor()
+        # One per process, so the RSS trend and tracemalloc baseline survive reconnects
+        self.memory = diagnostics
+        self.profiler = SamplingProfiler()
+        # Per-statement spans need every connection traced, so they ride on the opt-in SQL tracer;
+        # database method spans come from TimedConnection either way
+        if spans.enabled and tracer.enabled and spans.record_query not in tracer.listeners:
+            tracer.listeners.append(spans.record_query)
+        instrument_rest(self.http)
+        install_error_marker()
+        lease_name = 'background-tasks' if cluster_id is None else f'background-tasks:cluster-{cluster_id}'
+        self.leader = LeaderElector(self.db, name=lease_name)
+        self.started_at = datetime.utcnow()
+        self.last_reminder_run = None
+        self.reminder_ticked_at = None
         
         # Initialize command modules
-        self.admin_commands = AdminCommands(self)
-        self.club_commands = ClubCommands(self)
-        self.player_commands = PlayerCommands(self)
-        self.match_commands = MatchCommands(self)
-        self.stats_commands = StatsCommands(self)
+        with timeline.phase('register_commands'):
+            self.admin_commands = AdminCommands(self)
+            self.club_commands = ClubCommands(self)
+            self.player_commands = PlayerCommands(self)
+            self.match_commands = MatchCommands(self)
+            self.stats_commands = StatsCommands(self)
+        
+        self.register_memory_structures()
+        registry.collector('bot', self.collect_metrics)
+        
+    def register_memory_structures(self):
+        """Describe the bot's long-lived structures for /memory and the status endpoint"""
+        memory = self.memory
+        memory.register('member_cache', self.members.stats)
+        memory.register('discord_state', lambda: {
+            'guilds': len(self.guilds),
+            'users': len(self.users),
+            'cached_messages': len(self.cached_messages),
+            'emojis': len(self.emojis),
+        })
+        memory.register('command_tree', lambda: {
+            'commands': len(self.tree.get_commands()),
+            'parameters': sum(len(command.parameters) for command in self.tree.walk_commands()
+                              if hasattr(command, 'parameters')),
+        })
+        memory.register('card_cache', lambda: {**cache_stats(self.card_renderer.cache), 'in_flight': len(self.card_renderer.in_flight)})
+        memory.register('crest_thumbnails', lambda: cache_stats(self.crests.thumbnails))
+        memory.register('crest_strips', lambda: cache_stats(self.crests.strips))
+        memory.register('live_boards', lambda: {
+            'boards': sum(len(boards) for boards in self.live_boards.boards.values()),
+            'pending_edits': len(self.live_boards.pending),
+            'edit_times': len(self.live_boards.last_edit),
+        })
+        memory.register('perf_histograms', lambda: {
+            'commands': len(self.perf.commands),
+            'buckets': sum(len(histogram.buckets) for stats in self.perf.commands.values()
+                           for histogram in stats.histograms.values()),
+        })
+        memory.register('loop_monitor', lambda: {'lag_samples': len(self.loop_monitor.lags), 'stalls': len(self.loop_monitor.stalls)})
+        memory.register('sql_statements', lambda: {'statements': len(tracer.statements)})
+        memory.register('rate_limiter', lambda: {'functions': len(self.rate_limiter.last_request)})
+        memory.register('logging', pipeline_stats)
+        memory.register('asyncio', lambda: {'tasks': len(asyncio.all_tasks())})
+        memory.register('traces', lambda: {'buffered': len(spans.traces), 'spans': sum(len(trace.spans) for trace in spans.traces)})
+        memory.register('profiler', lambda: {'stacks': len(self.profiler.stacks), 'samples': self.profiler.samples})
+
+    def collect_metrics(self):
+        """Scrape-time metrics read from the structures the bot already keeps"""
+        durations = Family('football_command_duration_seconds', 'histogram',
+                           'Slash command latency, split into database, REST and local compute time')
+        errors = Family('football_command_errors', 'counter', 'Slash commands that raised or logged an error')
+        for name, stats in list(self.perf.commands.items()):
+            for part, histogram in stats.histograms.items():
+                durations.histogram({'command': name, 'part': part}, LATENCY_BUCKETS, *log_histogram(histogram))
+            errors.add({'command': name}, stats.errors)
+
+        statements = Family('football_sql_statement_seconds', 'counter', 'Time spent in each normalized SQL statement (SQL_TRACE only)')
+        executions = Family('football_sql_statement_executions', 'counter', 'Runs of each normalized SQL statement (SQL_TRACE only)')
+        for sql, stats in tracer.snapshot().items():
+            statements.add({'statement': sql[:200]}, stats['total_ms'] / 1000)
+            executions.add({'statement': sql[:200]}, stats['count'])
+
+        latency = Family('football_gateway_latency_seconds', 'gauge', 'Heartbeat latency of each gateway shard')
+        for shard_id, shard in self.shard_status().items():
+            if shard['latency_ms'] is not None:
+                latency.add({'shard': shard_id}, shard['latency_ms'] / 1000)
+
+        hit_ratio = Family('football_cache_hit_ratio', 'gauge', 'Fraction of lookups served from each cache')
+        lookups = Family('football_cache_lookups', 'counter', 'Cache lookups by outcome')
+        entries = Family('football_cache_entries', 'gauge', 'Entries held by each cache')
+        for name, cache in (('cards', self.card_renderer.cache), ('crest_thumbnails', self.crests.thumbnails),
+                            ('crest_strips', self.crests.strips)):
+            hit_ratio.add({'cache': name}, cache.hit_ratio())
+            lookups.add({'cache': name, 'result': 'hit'}, cache.hits)
+            lookups.add({'cache': name, 'result': 'miss'}, cache.misses)
+            entries.add({'cache': name}, len(cache))
+        members = self.members.stats()
+        entries.add({'cache': 'members'}, members['cached_members'])
+        entries.add({'cache': 'users'}, members['cached_users'])
+
+        lags = sorted(self.loop_monitor.lags)
+        loop_lag = Family('football_event_loop_lag_seconds', 'gauge', 'Event loop scheduling lag percentiles over recent samples')
+        for quantile in (0.5, 0.9, 0.99):
+            if lags:
+                loop_lag.add({'quantile': str(quantile)}, lags[min(len(lags) - 1, int(quantile * len(lags)))])
+
+        queues = Family('football_queue_depth', 'gauge', 'Items waiting in internal work queues')
+        for name, depth in self.queue_depths().items():
+            queues.add({'queue': name}, depth)
+
+        last_run = Family('football_reminder_last_run_timestamp_seconds', 'gauge', 'When the match reminder pass last completed')
+        if self.last_reminder_run:
+            last_run.add({}, (self.last_reminder_run - datetime(1970, 1, 1)).total_seconds())
+
+        return [
+            durations, errors, statements, executions, latency, hit_ratio, lookups, entries, loop_lag, queues, last_run,
+            Family('football_event_loop_stalls', 'counter', 'Event loop stalls over the lag threshold').add({}, self.loop_monitor.stall_count),
+            Family('football_guilds', 'gauge', 'Guilds the bot is in').add({}, len(self.guilds)),
+            Family('football_leader', 'gauge', 'Whether this process holds the background task lease').add({}, int(self.leader.is_leader)),
+        ]
         
     async def setup_hook(self):
         """Setup hook called when bot is starting"""
         try:
+            timeline.mark('logged_in')
+            self.loop_monitor.start()
+            self.memory.start_sampling()
+            
             # Initialize database
-            self.db.initialize()
-            logger.info("Database initialized")
+            with timeline.phase('database'):
+                self.db.initialize()
+                logger.info("Database initialized")
+                self.live_boards.load()
+            
+            # Opt-in traffic capture (TRAFFIC_CAPTURE=1), snapshotting the database first
+            if recorder.autostart:
+                await recorder.start(self.db)
             
-            # Start background tasks
+            # Start background tasks; only the lease holder does their work
+            self.leader.start()
             self.match_reminder_task.start()
             
-            # Sync slash commands
-            await self.tree.sync()
-            logger.info("Slash commands synced")
+            # Sync slash commands if they changed (global commands only need syncing by one cluster)
+            if not self.cluster_id:
+                with timeline.phase('command_sync'):
+                    await self.command_sync.sync()
             
         except Exception as e:
             logger.error(f"Setup error: {e}")
@@ -62,6 +212,7 @@ class FootballBot(commands.Bot):
         """Called when bot is ready"""
         logger.info(f'{self.user} has connected to Discord!')
         logger.info(f'Bot is in {len(self.guilds)} guilds')
+        timeline.complete('gateway_ready')
         
         # Set bot status
         activity = discord.Activity(
@@ -70,6 +221,12 @@ class FootballBot(commands.Bot):
         )
         await self.change_presence(activity=activity)
 
+    async def on_app_command_completion(self, interaction, command):
+        """Record latency for every slash command that finished without raising"""
+        recorder.finish(interaction)
+        spans.finish(interaction)
+        self.perf.finish(interaction)
+
     async def on_guild_join(self, guild):
         """Called when bot joins a new guild"""
         logger.info(f"Joined guild: {guild.name} ({guild.id})")
@@ -87,8 +244,23 @@ class FootballBot(commands.Bot):
     @tasks.loop(minutes=1)
     async def match_reminder_task(self):
         """Background task to send match reminders"""
+        if not self.leader.is_leader:
+            # Another instance holds the lease and sends the reminders
+            self.reminder_ticked_at = None
+            return
+        
+        started = time.monotonic()
+        if self.reminder_ticked_at is not None:
+            reminder_lag_seconds.set(max(started - self.reminder_ticked_at - self.match_reminder_task.minutes * 60, 0.0))
+        self.reminder_ticked_at = started
         try:
-            upcoming_matches = self.db.get_upcoming_matches(minutes=5)
+            # Only claim reminders for guilds on our shards; other clusters handle the rest
+            if self.owned_shard_ids is not None:
+                upcoming_matches = self.db.get_upcoming_matches(
+                    minutes=5, shard_ids=self.owned_shard_ids, shard_count=self.shard_count
+                )
+            else:
+                upcoming_matches = self.db.get_upcoming_matches(minutes=5)
             
             for match in upcoming_matches:
                 guild = self.get_guild(match['guild_id'])
@@ -112,20 +284,62 @@ class FootballBot(commands.Bot):
                     if channel:
                         try:
                             await self.rate_limiter.execute(channel.send, embed=embed)
+                            reminders_sent.inc()
                         except Exception as e:
                             logger.error(f"Failed to send match reminder: {e}")
+            
+            self.last_reminder_run = datetime.utcnow()
                             
         except Exception as e:
             logger.error(f"Match reminder task error: {e}")
+        finally:
+            reminder_run_seconds.observe(time.monotonic() - started)
 
     @match_reminder_task.before_loop
     async def before_match_reminder_task(self):
         """Wait for bot to be ready before starting the task"""
         await self.wait_until_ready()
 
+    def shard_status(self):
+        """Latency and connection state for each gateway shard"""
+        shards = getattr(self, 'shards', None)
+        if shards:
+            return {
+                str(shard_id): {
+                    'latency_ms': round(shard.latency * 1000, 1) if shard.latency == shard.latency else None,
+                    'closed': shard.is_closed()
+                }
+                for shard_id, shard in shards.items()
+            }
+        
+        latency = self.latency
+        return {
+            str(self.shard_id or 0): {
+                'latency_ms': round(latency * 1000, 1) if latency == latency else None,  # NaN before first heartbeat
+                'closed': self.is_closed() or self.ws is None
+            }
+        }
+
+    def queue_depths(self):
+        """Sizes of the bot's internal work queues"""
+        return {
+            'live_board_edits': len(self.live_boards.pending),
+            'card_renders': self.card_renderer.pending(),
+            'event_loop_tasks': len(asyncio.all_tasks()),
+        }
+
     async def close(self):
         """Cleanup when bot is closing"""
         logger.info("Bot shutting down...")
         if hasattr(self, 'match_reminder_task'):
             self.match_reminder_task.cancel()
+        self.live_boards.close()
+        self.loop_monitor.stop()
+        self.memory.stop()
+        self.profiler.stop()
+        recorder.stop()
+        spans.stop()
+        await self.leader.stop()
+        self.card_renderer.close()
+        await self.crests.close()
         await super().close()
@@ -1,82 +1,293 @@
 import asyncio
 import logging
 import os
+import random
+import time
 from datetime import datetime, timedelta
-from bot import FootballBot
+from startup import timeline
+from query_trace import tracer
+from capture import recorder
+from tracing import spans
+from metrics import Family, registry
 
 logger = logging.getLogger(__name__)
 
+# Backoff tuning for reconnects (seconds)
+TRANSIENT_BASE_DELAY = 1
+TRANSIENT_MAX_DELAY = 60
+UNKNOWN_MAX_DELAY = 300
+HEALTHY_UPTIME = 300  # A session that stayed ready this long resets the failure count
+
+def classify_error(error):
+    """Sort a startup/connection error into fatal, rate_limited, transient or unknown
+
+    Returns (kind, retry_after) where retry_after is the server-provided
+    wait for rate limits and None otherwise.
+    """
+    import aiohttp
+    import discord
+
+    if isinstance(error, (discord.LoginFailure, discord.PrivilegedIntentsRequired)):
+        return 'fatal', None
+    if isinstance(error, discord.RateLimited):
+        return 'rate_limited', error.retry_after
+    if isinstance(error, discord.HTTPException):
+        if error.status == 429:
+            return 'rate_limited', _retry_after(error.response)
+        if error.status == 401:
+            return 'fatal', None
+        if error.status >= 500:
+            return 'transient', None
+        return 'unknown', None
+    if isinstance(error, (discord.GatewayNotFound, discord.ConnectionClosed, aiohttp.ClientError,
+                          asyncio.TimeoutError, OSError)):
+        return 'transient', None
+    return 'unknown', None
+
+def _retry_after(response):
+    """Seconds to wait according to a 429 response's headers"""
+    headers = getattr(response, 'headers', None) or {}
+    for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+        try:
+            return float(headers[header])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
 class BotManager:
     """Manages Discord bot with enhanced rate limiting and error recovery"""
     
-    def __init__(self):
+    def __init__(self, shard_ids=None, shard_count=None, cluster_id=None):
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.cluster_id = cluster_id
         self.bot = None
         self.is_running = False
+        self.stopping = False
         self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 5
-        self.base_delay = 60  # Start with 1 minute delay
+        self.max_reconnect_attempts = int(os.getenv('MAX_RECONNECT_ATTEMPTS', 10))
+        self.ready_at = None  # Monotonic time the current session became ready
+        self.outage_started = None  # Monotonic time the last healthy session was lost
+        self.reconnect_pending = False  # Waiting out the backoff before the next session
+        self.connection = {
+            'restarts': 0,
+            'last_error': None,
+            'last_error_kind': None,
+            'last_backoff_seconds': None,
+            'recoveries': 0,
+            'last_recovery_seconds': None,
+            'max_recovery_seconds': None,
+            'total_recovery_seconds': 0.0,
+        }
+        registry.collector('connection', self.collect_metrics)
         
     async def start_bot(self):
-        """Start the bot with comprehensive error handling"""
+        """Run the bot, reconnecting with classified, jittered backoff until stopped"""
         token = os.getenv('DISCORD_TOKEN')
         if not token:
             logger.error("DISCORD_TOKEN not found in environment variables")
             return False
+        
+        self.stopping = False
+        while not self.stopping:
+            if self.reconnect_attempts == 0:
+                logger.info("Starting Discord bot...")
+            else:
+                logger.info(f"Reconnecting (attempt {self.reconnect_attempts + 1}/{self.max_reconnect_attempts})...")
             
-        while self.reconnect_attempts < self.max_reconnect_attempts:
+            error = None
             try:
-                if self.bot:
-                    await self.bot.close()
-                    
-                # Create new bot instance
-                self.bot = FootballBot()
-                
-                # Calculate delay based on reconnect attempts (exponential backoff)
-                delay = self.base_delay * (2 ** self.reconnect_attempts)
-                
-                if self.reconnect_attempts > 0:
-                    logger.info(f"Attempting to reconnect (attempt {self.reconnect_attempts + 1}/{self.max_reconnect_attempts}) after {delay} seconds...")
-                    await asyncio.sleep(delay)
-                else:
-                    logger.info("Starting Discord bot...")
-                    await asyncio.sleep(5)  # Initial delay
-                
-                await self.bot.start(token)
-                
-                # If we reach here, bot started successfully
+                # Create new bot instance (discord.py and the command modules load on first use)
+                with timeline.phase('create_bot'):
+                    from bot import FootballBot
+                    self.bot = FootballBot(self.shard_ids, self.shard_count, self.cluster_id)
+                self.bot.add_listener(self._on_connected, 'on_ready')
+                self.bot.add_listener(self._on_connected, 'on_resumed')
+                self.bot.add_listener(self._on_disconnect, 'on_disconnect')
                 self.is_running = True
-                self.reconnect_attempts = 0
-                logger.info("Bot started successfully!")
-                return True
-                
+                await self.bot.start(token)
             except Exception as e:
-                error_msg = str(e)
-                logger.error(f"Bot startup error (attempt {self.reconnect_attempts + 1}): {error_msg}")
-                
-                # Handle rate limiting specifically
-                if "429" in error_msg or "rate limit" in error_msg.lower():
-                    wait_time = 900 + (300 * self.reconnect_attempts)  # 15+ minutes
-                    logger.warning(f"Rate limited! Waiting {wait_time} seconds before retry...")
-                    await asyncio.sleep(wait_time)
-                elif "401" in error_msg:
-                    logger.error("Invalid token! Please check your DISCORD_TOKEN")
-                    return False
-                
-                self.reconnect_attempts += 1
-                
-                if self.reconnect_attempts >= self.max_reconnect_attempts:
-                    logger.error("Max reconnection attempts reached. Bot will not restart.")
-                    return False
-                    
-        return False
+                error = e
+            finally:
+                healthy = self._session_ended()
+                await self._dispose(self.bot)
+            
+            if self.stopping:
+                return True
+            
+            if healthy:
+                # Only count failures since the last session that stayed up
+                self.reconnect_attempts = 0
+            
+            if error is None:
+                logger.warning("Discord connection closed unexpectedly, reconnecting")
+                kind, retry_after = 'transient', None
+            else:
+                kind, retry_after = classify_error(error)
+                logger.error(f"Bot connection error ({kind}, attempt {self.reconnect_attempts + 1}): {error}")
+            self.connection['last_error'] = type(error).__name__ if error else 'ConnectionClosed'
+            self.connection['last_error_kind'] = kind
+            
+            if kind == 'fatal':
+                logger.error("Unrecoverable error (check DISCORD_TOKEN and privileged intents); not reconnecting")
+                return False
+            
+            self.reconnect_attempts += 1
+            if self.reconnect_attempts >= self.max_reconnect_attempts:
+                logger.error("Max reconnection attempts reached. Bot will not restart.")
+                return False
+            
+            delay = self._backoff(kind, retry_after)
+            self.connection['restarts'] += 1
+            self.connection['last_backoff_seconds'] = round(delay, 2)
+            logger.warning(f"Reconnecting in {delay:.1f}s")
+            self.reconnect_pending = True
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.reconnect_pending = False
+        
+        return True
+    
+    def _backoff(self, kind, retry_after):
+        """Delay before the next attempt: honour Retry-After, otherwise full-jitter exponential"""
+        if kind == 'rate_limited' and retry_after is not None:
+            # Spread instances out slightly so they don't all retry at the same instant
+            return retry_after + random.uniform(0, min(5, retry_after * 0.1) + 0.5)
+        cap = UNKNOWN_MAX_DELAY if kind == 'unknown' else TRANSIENT_MAX_DELAY
+        exponent = self.reconnect_attempts - 1
+        return random.uniform(0, min(cap, TRANSIENT_BASE_DELAY * 2 ** exponent)) + TRANSIENT_BASE_DELAY
+    
+    async def _on_disconnect(self):
+        """A gateway blip; discord.py reconnects by itself, but the outage still counts"""
+        if not self.stopping and self.outage_started is None:
+            self.outage_started = time.monotonic()
+    
+    async def _on_connected(self):
+        """Record recovery time when a session becomes ready or resumes"""
+        now = time.monotonic()
+        if self.ready_at is None:
+            self.ready_at = now
+        if self.outage_started is not None:
+            recovery = now - self.outage_started
+            self.outage_started = None
+            stats = self.connection
+            stats['recoveries'] += 1
+            stats['last_recovery_seconds'] = round(recovery, 2)
+            stats['max_recovery_seconds'] = round(max(stats['max_recovery_seconds'] or 0, recovery), 2)
+            stats['total_recovery_seconds'] += recovery
+            logger.warning(f"Recovered Discord connection in {recovery:.1f}s")
+    
+    def _session_ended(self):
+        """Close out the current session; returns True if it had been healthy"""
+        now = time.monotonic()
+        healthy = self.ready_at is not None and now - self.ready_at >= HEALTHY_UPTIME
+        if self.ready_at is not None and self.outage_started is None and not self.stopping:
+            self.outage_started = now
+        self.ready_at = None
+        self.is_running = False
+        return healthy
+    
+    async def _dispose(self, bot):
+        """Close a bot and its HTTP session so no connector outlives it"""
+        if bot is None:
+            return
+        try:
+            await bot.close()
+        except Exception as e:
+            logger.error(f"Error closing bot: {e}")
+        # close() returns early if the client already closed; the session must still go
+        try:
+            await bot.http.close()
+        except Exception as e:
+            logger.error(f"Error closing HTTP session: {e}")
     
     async def stop_bot(self):
         """Safely stop the bot"""
+        self.stopping = True
         if self.bot:
             logger.info("Stopping bot...")
-            await self.bot.close()
+            await self._dispose(self.bot)
             self.is_running = False
     
+    async def get_status(self):
+        """Collect a status snapshot for the health endpoint"""
+        bot = self.bot
+        reconnecting = not self.stopping and (self.reconnect_pending or self.outage_started is not None)
+        status = {
+            'status': 'reconnecting' if reconnecting else 'stopped',
+            'cluster_id': self.cluster_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'reconnect_attempts': self.reconnect_attempts,
+            'startup': timeline.as_dict(),
+        }
+        if not bot:
+            return status
+        
+        if bot.is_closed():
+            # Between sessions the old client is closed while the backoff runs
+            status['status'] = 'reconnecting' if reconnecting else 'stopped'
+        elif bot.is_ready() and self.outage_started is None:
+            status['status'] = 'ready'
+        else:
+            status['status'] = 'reconnecting' if reconnecting or self.reconnect_attempts else 'connecting'
+        
+        latency = bot.latency
+        status['uptime_seconds'] = int((datetime.utcnow() - bot.started_at).total_seconds())
+        status['gateway'] = {
+            'latency_ms': round(latency * 1000, 1) if latency == latency else None,
+            'guilds': len(bot.guilds),
+            'shard_count': bot.shard_count or 1,
+            'shards': bot.shard_status(),
+        }
+        status['last_reminder_run'] = bot.last_reminder_run.isoformat() if bot.last_reminder_run else None
+        
+        # Run the probe off-loop so a locked database can't stall the health check
+        try:
+            db_latency = await asyncio.get_running_loop().run_in_executor(None, bot.db.ping)
+            status['database'] = {'latency_ms': round(db_latency * 1000, 2)}
+        except Exception as e:
+            status['database'] = {'error': str(e)}
+        
+        status['queues'] = bot.queue_depths()
+        status['leader'] = bot.leader.status()
+        status['member_cache'] = bot.members.stats()
+        status['command_sync'] = bot.command_sync.status()
+        status['connection'] = self.connection_stats()
+        status['commands'] = bot.perf.snapshot()
+        status['event_loop'] = bot.loop_monitor.stats()
+        status['memory'] = bot.memory.summary()
+        if tracer.enabled:
+            status['sql'] = tracer.snapshot(limit=10)
+        if recorder.enabled:
+            status['capture'] = recorder.status()
+        if spans.enabled:
+            status['tracing'] = spans.stats()
+        if bot.profiler.samples:
+            status['profiler'] = bot.profiler.status()
+        return status
+
+    def connection_stats(self):
+        """Reconnect and recovery-time metrics"""
+        stats = dict(self.connection)
+        total = stats.pop('total_recovery_seconds')
+        stats['mean_recovery_seconds'] = round(total / stats['recoveries'], 2) if stats['recoveries'] else None
+        if self.outage_started is not None:
+            stats['current_outage_seconds'] = round(time.monotonic() - self.outage_started, 2)
+        return stats
+
+    def collect_metrics(self):
+        """Gateway readiness and reconnect counters for /metrics"""
+        bot = self.bot
+        ready = bool(bot and not bot.is_closed() and bot.is_ready())
+        return [
+            Family('football_bot_ready', 'gauge', 'Whether the gateway session is ready').add({}, int(ready)),
+            Family('football_reconnects', 'counter', 'Gateway sessions restarted after a failure').add({}, self.connection['restarts']),
+            Family('football_recoveries', 'counter', 'Outages that ended with a ready session').add({}, self.connection['recoveries']),
+            Family('football_recovery_seconds', 'counter', 'Total time spent recovering from outages')
+                .add({}, self.connection['total_recovery_seconds']),
+        ]
+
     def is_bot_running(self):
         """Check if bot is running"""
         return self.is_running and self.bot and not self.bot.is_closed()
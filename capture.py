@@ -0,0 +1,234 @@
+import os
+import gzip
+import hmac
+import json
+import time
+import queue
+import hashlib
+import secrets
+import sqlite3
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import closing
+from datetime import datetime
+from logging.handlers import QueueListener
+import discord
+from query_trace import tracer, normalize
+
+logger = logging.getLogger(__name__)
+
+# Capture id of the interaction handled by the current task
+current_capture = contextvars.ContextVar('capture_id', default=None)
+
+# String options that hold club or player names; everything else is kept verbatim
+NAME_OPTIONS = {'name', 'club', 'club1', 'club2', 'team1', 'team2', 'player_name', 'to_club', 'club_name', 'old_name', 'new_name'}
+
+def _digest(key, value):
+    return hmac.new(key, str(value).encode(), hashlib.sha256).digest()
+
+def anonymise_name(key, name):
+    return None if name is None else f"name_{_digest(key, name).hex()[:12]}"
+
+def anonymise_id(key, snowflake):
+    return None if snowflake is None else int.from_bytes(_digest(key, snowflake)[:8], 'big') >> 2
+
+class _EventWriter(logging.Handler):
+    """Writes queued capture events to the gzip file; runs on the listener thread"""
+
+    def __init__(self, file):
+        super().__init__()
+        self.file = file
+
+    def emit(self, record):
+        self.file.write(json.dumps(record.event, separators=(',', ':'), default=str) + '\n')
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+class TrafficRecorder:
+    """Opt-in recorder of anonymised interactions and the SQL they run
+
+    A capture is a directory holding `events.jsonl.gz` and `snapshot.db`.
+    The snapshot is a copy of the database taken when the capture started.
+    Club and player names and guild, user, role, channel and message ids
+    are replaced with keyed hashes in both files, so they stay consistent
+    for replay. The key is never written out, so a capture can't be mapped
+    back to real names.
+    Events are queued and compressed on a writer thread, so recording a
+    query never does file I/O on the event loop.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv('TRAFFIC_CAPTURE_DIR') or os.path.join(os.getenv('DATA_DIR', 'data'), 'captures')
+        self.autostart = os.getenv('TRAFFIC_CAPTURE', '').lower() in ('1', 'true', 'yes')
+        self.lock = threading.Lock()  # Queries are recorded from executor threads too
+        self.queue = None
+        self.listener = None
+        self.path = None
+        self.key = None
+        self.started = None
+        self.started_at = None
+        self.next_id = 0
+        self.events = 0
+
+    @property
+    def enabled(self):
+        return self.listener is not None
+
+    async def start(self, db):
+        """Snapshot the database and start recording; returns the capture directory"""
+        if self.enabled:
+            return self.path
+        key = secrets.token_bytes(16)
+        path = os.path.join(self.root, f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        os.makedirs(path, exist_ok=True)
+        await asyncio.to_thread(self._snapshot, db.db_path, os.path.join(path, 'snapshot.db'), key)
+
+        with self.lock:
+            self.key = key
+            self.path = path
+            self.started = time.perf_counter()
+            self.started_at = datetime.utcnow()
+            self.next_id = 0
+            self.events = 0
+            self.queue = queue.SimpleQueue()
+            self.listener = QueueListener(
+                self.queue, _EventWriter(gzip.open(os.path.join(path, 'events.jsonl.gz'), 'wt', encoding='utf-8'))
+            )
+            self.listener.start()
+        self._write({'type': 'header', 'version': 1, 'started_at': self.started_at.isoformat()})
+        tracer.listeners.append(self.record_query)
+        logger.info(f"Traffic capture started in {path}")
+        return path
+
+    def stop(self):
+        """Stop recording; returns (capture directory, events written)"""
+        if self.record_query in tracer.listeners:
+            tracer.listeners.remove(self.record_query)
+        with self.lock:
+            if self.listener is None:
+                return None, 0
+            listener = self.listener
+            self.listener = None
+            self.key = None
+            path, events = self.path, self.events
+        # Drains what is still queued, then the file is closed
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        logger.info(f"Traffic capture stopped: {events} events in {path}")
+        return path, events
+
+    @staticmethod
+    def _snapshot(source_path, target_path, key):
+        """Copy the database and anonymise the copy in place"""
+        with closing(sqlite3.connect(source_path)) as source, closing(sqlite3.connect(target_path)) as target:
+            source.backup(target)
+            target.create_function('anon_name', 1, lambda value: anonymise_name(key, value), deterministic=True)
+            target.create_function('anon_id', 1, lambda value: anonymise_id(key, value), deterministic=True)
+            # Crest images live outside the database and aren't captured
+            target.executescript('''
+                UPDATE clubs SET name = anon_name(name), guild_id = anon_id(guild_id),
+                                 role_id = anon_id(role_id), crest_hash = NULL;
+                UPDATE players SET name = anon_name(name), guild_id = anon_id(guild_id),
+                                   discord_user_id = anon_id(discord_user_id);
+                UPDATE transfers SET guild_id = anon_id(guild_id);
+                UPDATE matches SET guild_id = anon_id(guild_id), created_by = anon_id(created_by),
+                                   team1_role_id = anon_id(team1_role_id), team2_role_id = anon_id(team2_role_id);
+                UPDATE settings SET guild_id = anon_id(guild_id), admin_role_id = anon_id(admin_role_id),
+                                    match_channel_id = anon_id(match_channel_id);
+                UPDATE live_boards SET guild_id = anon_id(guild_id), channel_id = anon_id(channel_id),
+                                       message_id = anon_id(message_id);
+                DELETE FROM leases;
+            ''')
+            target.commit()
+            target.execute('VACUUM')
+
+    def _write(self, event):
+        with self.lock:
+            if self.listener is None:
+                return
+            self.queue.put_nowait(logging.makeLogRecord({'msg': 'capture', 'event': event}))
+            self.events += 1
+
+    def _elapsed(self):
+        return round(time.perf_counter() - self.started, 4)
+
+    def _option(self, name, value):
+        key = self.key
+        if isinstance(value, str):
+            return anonymise_name(key, value) if name in NAME_OPTIONS else value
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, discord.Attachment):
+            return {'attachment': value.content_type, 'size': value.size}
+        if isinstance(value, (discord.Member, discord.User)):
+            return {'user': anonymise_id(key, value.id)}
+        if hasattr(value, 'id'):
+            return {'object': type(value).__name__, 'id': anonymise_id(key, value.id)}
+        return str(value)
+
+    def begin(self, interaction):
+        """Record an interaction as it starts; runs in the interaction's own task"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.next_id += 1
+            capture_id = self.next_id
+        current_capture.set(capture_id)
+        interaction.extras['capture'] = capture_id
+
+        try:
+            options = {name: self._option(name, value) for name, value in interaction.namespace}
+        except Exception:
+            options = {}
+        user = interaction.user
+        self._write({
+            'type': 'interaction',
+            'id': capture_id,
+            't': self._elapsed(),
+            'command': interaction.command.qualified_name if interaction.command else None,
+            'options': options,
+            'guild': anonymise_id(self.key, interaction.guild_id),
+            'user': anonymise_id(self.key, user.id) if user else None,
+            'admin': isinstance(user, discord.Member) and user.guild_permissions.administrator,
+        })
+
+    def finish(self, interaction, error=False):
+        """Record how an interaction ended; call before the perf registry consumes its timing"""
+        capture_id = interaction.extras.pop('capture', None)
+        if capture_id is None or not self.enabled:
+            return
+        timing = interaction.extras.get('timing')
+        event = {'type': 'finish', 'id': capture_id, 't': self._elapsed(), 'error': error}
+        if timing is not None:
+            event['ms'] = round((time.perf_counter() - timing.started) * 1000, 2)
+            event['db_ms'] = round(timing.db * 1000, 2)
+            event['rest_ms'] = round(timing.rest * 1000, 2)
+            event['error'] = error or timing.error
+        self._write(event)
+
+    def record_query(self, connection, sql, params, elapsed_ms, rows):
+        """Query tracer listener; parameter values are never recorded"""
+        self._write({
+            'type': 'query',
+            'id': current_capture.get(),
+            't': self._elapsed(),
+            'sql': normalize(sql),
+            'ms': round(elapsed_ms, 3),
+            'rows': rows,
+        })
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'events': self.events,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+        }
+
+# Process-wide recorder; enable with TRAFFIC_CAPTURE=1 or /traffic_capture
+recorder = TrafficRecorder()
@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from utils import LRUCache, format_currency
+
+logger = logging.getLogger(__name__)
+
+# Card palette
+BACKGROUND = (30, 60, 114)
+HEADER = (42, 82, 152)
+ROW_EVEN = (36, 48, 72)
+ROW_ODD = (44, 58, 86)
+TEXT = (240, 240, 240)
+MUTED = (170, 180, 200)
+GOLD = (255, 200, 60)
+
+WIDTH = 900
+PADDING = 24
+ROW_HEIGHT = 34
+
+def _load_font(size):
+    """Load a TrueType font, falling back to Pillow's built-in font"""
+    from PIL import ImageFont
+    for name in ("DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def _fit(draw, text, font, max_width):
+    """Truncate text with an ellipsis so it fits max_width pixels"""
+    text = str(text)
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+def _to_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+def render_table_card(payload):
+    """Render a ranked table as PNG bytes (runs in a worker process)"""
+    from PIL import Image, ImageDraw
+
+    columns = payload['columns']  # [(header, relative width), ...]
+    rows = payload['rows']
+    title_font = _load_font(30)
+    header_font = _load_font(18)
+    body_font = _load_font(18)
+
+    top = PADDING + 48 + (28 if payload.get('subtitle') else 0)
+    height = top + ROW_HEIGHT * (len(rows) + 1) + PADDING
+    image = Image.new("RGB", (WIDTH, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    draw.text((PADDING, PADDING), payload['title'], font=title_font, fill=TEXT)
+    if payload.get('subtitle'):
+        draw.text((PADDING, PADDING + 44), payload['subtitle'], font=header_font, fill=MUTED)
+
+    total_weight = sum(weight for _, weight in columns)
+    usable = WIDTH - 2 * PADDING
+    x_positions = []
+    x = PADDING
+    for _, weight in columns:
+        x_positions.append(x)
+        x += usable * weight / total_weight
+
+    draw.rectangle((PADDING, top, WIDTH - PADDING, top + ROW_HEIGHT), fill=HEADER)
+    for (header, weight), x in zip(columns, x_positions):
+        draw.text((x + 8, top + 7), header, font=header_font, fill=TEXT)
+
+    for index, row in enumerate(rows):
+        y = top + ROW_HEIGHT * (index + 1)
+        draw.rectangle((PADDING, y, WIDTH - PADDING, y + ROW_HEIGHT), fill=ROW_EVEN if index % 2 else ROW_ODD)
+        color = GOLD if index < 3 else TEXT
+        for cell, (_, weight), x in zip(row, columns, x_positions):
+            cell_width = usable * weight / total_weight - 12
+            draw.text((x + 8, y + 7), _fit(draw, cell, body_font, cell_width), font=body_font, fill=color)
+
+    return _to_png(image)
+
+def render_club_card(payload):
+    """Render a club summary card as PNG bytes (runs in a worker process)"""
+    from PIL import Image, ImageDraw
+
+    title_font = _load_font(36)
+    label_font = _load_font(16)
+    value_font = _load_font(24)
+    body_font = _load_font(18)
+
+    players = payload['top_players']
+    height = PADDING * 2 + 60 + 90 + 40 + ROW_HEIGHT * max(len(players), 1)
+    image = Image.new("RGB", (WIDTH, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    draw.text((PADDING, PADDING), _fit(draw, payload['name'], title_font, WIDTH - 2 * PADDING), font=title_font, fill=TEXT)
+
+    tiles = [
+        ("Budget", payload['budget']),
+        ("Players", payload['player_count']),
+        ("Squad Value", payload['total_value']),
+        ("Transfers In / Out", f"{payload['transfers_in']} / {payload['transfers_out']}"),
+    ]
+    tile_width = (WIDTH - 2 * PADDING) / len(tiles)
+    y = PADDING + 60
+    for index, (label, value) in enumerate(tiles):
+        x = PADDING + index * tile_width
+        draw.rectangle((x + 4, y, x + tile_width - 4, y + 76), fill=HEADER)
+        draw.text((x + 14, y + 8), label, font=label_font, fill=MUTED)
+        draw.text((x + 14, y + 36), _fit(draw, value, value_font, tile_width - 28), font=value_font, fill=TEXT)
+
+    y += 90
+    draw.text((PADDING, y), "Squad", font=label_font, fill=MUTED)
+    y += 28
+    if not players:
+        draw.text((PADDING + 8, y + 7), "No players yet", font=body_font, fill=MUTED)
+    for index, (name, position, value) in enumerate(players):
+        row_y = y + ROW_HEIGHT * index
+        draw.rectangle((PADDING, row_y, WIDTH - PADDING, row_y + ROW_HEIGHT), fill=ROW_EVEN if index % 2 else ROW_ODD)
+        draw.text((PADDING + 8, row_y + 7), _fit(draw, name, body_font, 420), font=body_font, fill=TEXT)
+        draw.text((PADDING + 460, row_y + 7), _fit(draw, position, body_font, 160), font=body_font, fill=MUTED)
+        draw.text((PADDING + 640, row_y + 7), value, font=body_font, fill=GOLD)
+
+    return _to_png(image)
+
+RENDERERS = {
+    'table': render_table_card,
+    'club': render_club_card,
+}
+
+def club_rankings_payload(club_rankings):
+    """Card payload for the full club rankings table"""
+    return {
+        'title': "Club Rankings",
+        'subtitle': "Ranked by total value (budget + squad value)",
+        'columns': [("#", 1), ("Club", 6), ("Players", 2), ("Budget", 4), ("Squad", 4), ("Total", 4)],
+        'rows': [
+            [str(i), club['name'], str(club['players']), format_currency(club['budget']),
+             format_currency(club['squad_value']), format_currency(club['total_value'])]
+            for i, club in enumerate(club_rankings, 1)
+        ],
+    }
+
+def top_players_payload(players):
+    """Card payload for the top players table"""
+    return {
+        'title': "Top Players by Value",
+        'subtitle': f"Top {len(players)} most valuable players",
+        'columns': [("#", 1), ("Player", 6), ("Position", 3), ("Club", 5), ("Value", 4)],
+        'rows': [
+            [str(i), player['name'], player['position'] or "", player['club_name'] or "Free Agent",
+             format_currency(player['value'])]
+            for i, player in enumerate(players, 1)
+        ],
+    }
+
+def club_payload(club, stats, players):
+    """Card payload for a single club"""
+    return {
+        'name': club['name'],
+        'budget': format_currency(club['budget']),
+        'player_count': str(stats['player_count']) if stats else "0",
+        'total_value': format_currency(stats['total_value']) if stats else format_currency(0),
+        'transfers_in': stats['transfers_in'] if stats else 0,
+        'transfers_out': stats['transfers_out'] if stats else 0,
+        'top_players': [
+            (p['name'], p['position'] or "", format_currency(p['value'])) for p in players[:15]
+        ],
+    }
+
+class CardRenderer:
+    """Renders PNG cards off the event loop with a content-hash cache"""
+
+    def __init__(self, max_workers=2, cache_size=64):
+        self.max_workers = max_workers
+        self.executor = None
+        self.cache = LRUCache(cache_size)
+        self.in_flight = {}  # content hash -> future shared by identical requests
+
+    @staticmethod
+    def content_hash(kind, payload):
+        """Stable hash of the data a card is rendered from"""
+        encoded = json.dumps([kind, payload], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    async def render(self, kind, payload):
+        """Render a card, reusing bytes for identical data"""
+        key = self.content_hash(kind, payload)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        future = self.in_flight.get(key)
+        if future is None:
+            if self.executor is None:
+                # Spawn, not fork: this process already runs logging, watchdog and exporter threads
+                # whose locks a forked worker could inherit while held
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            loop = asyncio.get_running_loop()
+            # Submitting may start a worker, and spawning one blocks; do it off the loop
+            submitting = loop.run_in_executor(None, self.executor.submit, RENDERERS[kind], payload)
+            future = asyncio.ensure_future(self._result(submitting))
+            self.in_flight[key] = future
+            try:
+                data = await asyncio.shield(future)
+            finally:
+                self.in_flight.pop(key, None)
+            self.cache.put(key, data)
+            return data
+
+        # Shielded so a cancelled waiter doesn't cancel the shared render
+        return await asyncio.shield(future)
+
+    @staticmethod
+    async def _result(submitting):
+        return await asyncio.wrap_future(await submitting)
+
+    def pending(self):
+        """Number of renders currently in progress"""
+        return len(self.in_flight)
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
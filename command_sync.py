@@ -0,0 +1,71 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class CommandSync:
+    """Syncs the slash command tree only when it has changed
+
+    The payload Discord would receive is hashed and the fingerprint of the
+    last successful sync is stored in the database, so a restart with an
+    unchanged tree reaches ready without any command-sync round trips.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.last_result = None
+
+    async def payload(self, guild=None):
+        """The command payload `tree.sync` would upload for this scope"""
+        tree = self.bot.tree
+        commands = tree.get_commands(guild=guild)
+        if tree.translator:
+            return [await command.get_translated_payload(tree, tree.translator) for command in commands]
+        return [command.to_dict(tree) for command in commands]
+
+    async def fingerprint(self, guild=None):
+        """Stable hash of the command payload for this scope"""
+        payload = sorted(await self.payload(guild), key=lambda command: (command.get('type', 1), command['name']))
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _meta_key(self, guild=None):
+        scope = guild.id if guild else 'global'
+        return f"command_tree:{self.bot.application_id}:{scope}"
+
+    async def sync(self, guild=None, force=False):
+        """Sync the tree if its fingerprint changed (or if forced); returns True if it synced"""
+        loop = asyncio.get_running_loop()
+        force = force or os.getenv('FORCE_COMMAND_SYNC', '').lower() in ('1', 'true', 'yes')
+        key = self._meta_key(guild)
+        fingerprint = await self.fingerprint(guild)
+
+        if not force:
+            stored = await loop.run_in_executor(None, self.bot.db.get_meta, key)
+            if stored == fingerprint:
+                logger.info(f"Slash commands unchanged ({fingerprint[:12]}), skipping sync")
+                self._record(guild, fingerprint, synced=False)
+                return False
+
+        await self.bot.tree.sync(guild=guild)
+        # Only remember the fingerprint once Discord has accepted the tree
+        await loop.run_in_executor(None, self.bot.db.set_meta, key, fingerprint)
+        logger.info(f"Slash commands synced ({fingerprint[:12]})")
+        self._record(guild, fingerprint, synced=True)
+        return True
+
+    def _record(self, guild, fingerprint, synced):
+        self.last_result = {
+            'scope': guild.id if guild else 'global',
+            'fingerprint': fingerprint,
+            'synced': synced,
+            'at': datetime.utcnow().isoformat(),
+        }
+
+    def status(self):
+        """Outcome of the most recent sync check"""
+        return self.last_result
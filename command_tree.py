@@ -0,0 +1,26 @@
+import asyncio
+from discord import app_commands
+from logging_config import bind_interaction
+from capture import recorder
+from tracing import spans
+
+class FootballCommandTree(app_commands.CommandTree):
+    """Command tree that sets per-interaction context before any command runs"""
+
+    async def interaction_check(self, interaction):
+        # Runs in the interaction's own task, so context set here is seen by the command and everything it logs
+        bind_interaction(interaction)
+        self.client.perf.start(interaction)
+        recorder.begin(interaction)
+        spans.begin(interaction)
+        # Name the task so loop stalls and profiles point at the command
+        task = asyncio.current_task()
+        if task is not None and interaction.command:
+            task.set_name(f"command:{interaction.command.qualified_name}")
+        return True
+
+    async def on_error(self, interaction, error):
+        recorder.finish(interaction, error=True)
+        spans.finish(interaction, error=True)
+        self.client.perf.finish(interaction, error=True)
+        await super().on_error(interaction, error)
@@ -1,8 +1,13 @@
 import discord
 from discord.ext import commands
 from utils import create_embed, is_admin, format_currency
+from query_trace import tracer
+from capture import recorder
+from tracing import spans, waterfall
+import asyncio
 import logging
 import json
+import os
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -29,10 +34,11 @@ class AdminCommands:
                 )
                 
                 class ConfirmView(discord.ui.View):
-                    def __init__(self, db, guild):
+                    def __init__(self, db, guild, live_boards):
                         super().__init__(timeout=30)
                         self.db = db
                         self.guild = guild
+                        self.live_boards = live_boards
                     
                     @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.secondary)
                     async def cancel(self, button_interaction: discord.Interaction, button: discord.ui.Button):
@@ -64,8 +70,10 @@ class AdminCommands:
                             color=discord.Color.green()
                         )
                         await button_interaction.response.edit_message(embed=embed, view=None)
+                        # Answer first; the board edits go through the rate limiter
+                        await self.live_boards.clear_guild(self.guild)
                 
-                await interaction.response.send_message(embed=embed, view=ConfirmView(self.db, interaction.guild), ephemeral=True)
+                await interaction.response.send_message(embed=embed, view=ConfirmView(self.db, interaction.guild, self.bot.live_boards), ephemeral=True)
                 
             except Exception as e:
                 logger.error(f"Reset command error: {e}")
@@ -127,7 +135,7 @@ class AdminCommands:
                 
                 # Calculate total values
                 total_budget = sum(club['budget'] for club in clubs)
-                total_player_value = sum(player['value'] for player in players)
+                total_player_value = players.total_value()
                 
                 embed.add_field(
                     name="💰 Financial Overview",
@@ -141,6 +149,13 @@ class AdminCommands:
                     inline=True
                 )
                 
+                cache = self.bot.members.stats()
+                embed.add_field(
+                    name="🧠 Member Cache",
+                    value=f"Policy: {cache['policy']}\nMembers: {cache['cached_members']}\nUsers: {cache['cached_users']}\nChunked Guilds: {cache['chunked_guilds']}",
+                    inline=True
+                )
+                
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 
             except Exception as e:
@@ -223,12 +238,10 @@ class AdminCommands:
         async def set_budgets_bulk(interaction: discord.Interaction, amount: float):
             """Set the same budget for all clubs"""
             try:
-                clubs = self.db.get_all_clubs(interaction.guild_id)
-                updated = 0
+                # One statement, so transfers running at the same time never see a half-updated league
+                updated = self.db.set_all_club_budgets(interaction.guild_id, amount)
                 
-                for club in clubs:
-                    if self.db.update_club_budget(club['id'], amount):
-                        updated += 1
+                self.bot.live_boards.mark_dirty(interaction.guild_id)
                 
                 embed = create_embed(
                     title="💰 Bulk Budget Update",
@@ -241,3 +254,470 @@ class AdminCommands:
             except Exception as e:
                 logger.error(f"Bulk budget command error: {e}")
                 await interaction.response.send_message("❌ Error updating budgets.", ephemeral=True)
+
+        @self.bot.tree.command(name="live_board", description="📌 Pin a leaderboard that updates itself in this channel")
+        @is_admin()
+        async def live_board(interaction: discord.Interaction, action: str, board: str = "club_rankings"):
+            """Create or remove a live leaderboard message"""
+            try:
+                live_boards = self.bot.live_boards
+                board = board.lower()
+                if board not in live_boards.BOARDS:
+                    await interaction.response.send_message(
+                        f"❌ Unknown board! Available boards: {', '.join(live_boards.BOARDS)}", ephemeral=True
+                    )
+                    return
+                
+                if action.lower() == "create":
+                    embed = live_boards.render(interaction.guild, board)
+                    message = await interaction.channel.send(embed=embed)
+                    try:
+                        await message.pin(reason="Live leaderboard")
+                    except discord.HTTPException as e:
+                        logger.warning(f"Failed to pin live board: {e}")
+                    
+                    live_boards.register(interaction.guild_id, board, interaction.channel_id, message.id)
+                    embed = create_embed(
+                        title="📌 Live Board Created",
+                        description=f"`{board}` will be edited in place when data changes (at most every {live_boards.interval}s)",
+                        color=discord.Color.green()
+                    )
+                    
+                elif action.lower() == "remove":
+                    if live_boards.unregister(interaction.guild_id, board):
+                        embed = create_embed(
+                            title="📌 Live Board Removed",
+                            description=f"`{board}` will no longer be updated",
+                            color=discord.Color.green()
+                        )
+                    else:
+                        await interaction.response.send_message("❌ No live board registered for that board!", ephemeral=True)
+                        return
+                
+                else:
+                    embed = create_embed(
+                        title="❌ Invalid Action",
+                        description="Available actions:\n• `create` - Post a live board in this channel\n• `remove` - Stop updating a live board",
+                        color=discord.Color.red()
+                    )
+                
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                
+            except Exception as e:
+                logger.error(f"Live board command error: {e}")
+                await interaction.response.send_message("❌ Error managing live board.", ephemeral=True)
+
+        @self.bot.tree.command(name="sync_commands", description="🔁 Sync slash commands with Discord if they changed")
+        @is_admin()
+        async def sync_commands(interaction: discord.Interaction, scope: str = "global", force: bool = False):
+            """Sync the command tree, skipping the upload when nothing changed unless forced"""
+            try:
+                scope = scope.lower()
+                if scope not in ('global', 'guild'):
+                    embed = create_embed(
+                        title="❌ Invalid Scope",
+                        description="Available scopes:\n• `global` - Sync commands for every server (bot owner only)\n• `guild` - Sync only the commands registered for this server (removes stale server copies)",
+                        color=discord.Color.red()
+                    )
+                    await interaction.response.send_message(embed=embed, ephemeral=True)
+                    return
+
+                # Global syncs touch every server, so only the owner may run them or bypass the change check
+                if (scope == 'global' or force) and not await self.bot.is_owner(interaction.user):
+                    await interaction.response.send_message(
+                        "❌ Only the bot owner can sync globally or force a sync. Use `scope: guild` to sync this server.",
+                        ephemeral=True
+                    )
+                    return
+
+                await interaction.response.defer(ephemeral=True)
+                # Only commands the tree really scopes to this guild; copies of global ones would show twice
+                guild = interaction.guild if scope == 'guild' else None
+                synced = await self.bot.command_sync.sync(guild=guild, force=force)
+                result = self.bot.command_sync.status()
+
+                where = "this server" if guild else "every server"
+                embed = create_embed(
+                    title="🔁 Commands Synced" if synced else "🔁 Commands Up To Date",
+                    description=f"Slash commands were uploaded to Discord for {where}." if synced else f"No changes for {where} since the last sync; nothing was uploaded.",
+                    color=discord.Color.green()
+                )
+                embed.add_field(name="🌐 Scope", value=scope, inline=True)
+                embed.add_field(name="🔑 Fingerprint", value=f"`{result['fingerprint'][:12]}`", inline=True)
+
+                await interaction.followup.send(embed=embed, ephemeral=True)
+
+            except Exception as e:
+                logger.error(f"Sync commands error: {e}")
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error syncing commands.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error syncing commands.", ephemeral=True)
+
+        @self.bot.tree.command(name="perf_stats", description="⏱️ Show slash command latency percentiles")
+        @is_admin()
+        async def perf_stats(interaction: discord.Interaction, command: str = None):
+            """Show p50/p99 latency per command, split into database, Discord API and compute time"""
+            try:
+                snapshot = self.bot.perf.snapshot()
+                if command:
+                    snapshot = {name: stats for name, stats in snapshot.items() if name == command.lower().lstrip('/')}
+
+                if not snapshot:
+                    await interaction.response.send_message("📭 No command timings recorded yet!", ephemeral=True)
+                    return
+
+                embed = create_embed(
+                    title="⏱️ Command Latency",
+                    description="p50 / p99 in ms since restart, slowest p99 first",
+                    color=discord.Color.blue()
+                )
+
+                for name, stats in list(snapshot.items())[:10]:
+                    total = stats['total']
+                    embed.add_field(
+                        name=f"/{name} ({total['count']} runs, {stats['errors']} errors)",
+                        value=(
+                            f"Total: {total['p50_ms']} / {total['p99_ms']}\n"
+                            f"DB: {stats['db']['p50_ms']} / {stats['db']['p99_ms']}\n"
+                            f"Discord: {stats['rest']['p50_ms']} / {stats['rest']['p99_ms']}\n"
+                            f"Compute: {stats['compute']['p50_ms']} / {stats['compute']['p99_ms']}"
+                        ),
+                        inline=True
+                    )
+
+                if len(snapshot) > 10:
+                    embed.set_footer(text=f"Showing 10 of {len(snapshot)} commands")
+
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            except Exception as e:
+                logger.error(f"Perf stats command error: {e}")
+                await interaction.response.send_message("❌ Error retrieving command timings.", ephemeral=True)
+
+        @self.bot.tree.command(name="query_stats", description="🗄️ Show or control the SQL query profiler")
+        @is_admin()
+        async def query_stats(interaction: discord.Interaction, action: str = "show", slow_only: bool = False):
+            """Show the most expensive SQL statements, or enable/disable/reset the profiler"""
+            try:
+                action = action.lower()
+                if action == "enable":
+                    tracer.enabled = True
+                    message = f"🗄️ SQL profiler enabled (slow threshold {tracer.slow_ms:g}ms)"
+                elif action == "disable":
+                    tracer.enabled = False
+                    message = "🗄️ SQL profiler disabled"
+                elif action == "reset":
+                    tracer.reset()
+                    message = "🗄️ SQL profiler statistics cleared"
+                elif action == "show":
+                    message = None
+                else:
+                    await interaction.response.send_message(
+                        "❌ Invalid action! Available actions: `show`, `enable`, `disable`, `reset`", ephemeral=True
+                    )
+                    return
+
+                if message:
+                    await interaction.response.send_message(message, ephemeral=True)
+                    return
+
+                statements = tracer.snapshot(limit=8, slow_only=slow_only)
+                if not statements:
+                    hint = "" if tracer.enabled else " The profiler is off; use `/query_stats enable` or set `SQL_TRACE=1`."
+                    await interaction.response.send_message(f"📭 No queries recorded yet!{hint}", ephemeral=True)
+                    return
+
+                embed = create_embed(
+                    title="🗄️ SQL Query Profile",
+                    description=f"Most time spent first. Slow threshold: {tracer.slow_ms:g}ms",
+                    color=discord.Color.blue()
+                )
+
+                for sql, stats in statements.items():
+                    value = (
+                        f"```sql\n{sql[:300]}\n```"
+                        f"Runs: {stats['count']} | Mean: {stats['mean_ms']}ms | Max: {stats['max_ms']}ms\n"
+                        f"Rows: {stats['rows']} | Slow: {stats['slow']}"
+                    )
+                    if stats['plan']:
+                        value += f"\nPlan: {' | '.join(stats['plan'])[:200]}"
+                    embed.add_field(name=f"⏱️ {stats['total_ms']}ms total", value=value[:1024], inline=False)
+
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            except Exception as e:
+                logger.error(f"Query stats command error: {e}")
+                await interaction.response.send_message("❌ Error retrieving query statistics.", ephemeral=True)
+
+        @self.bot.tree.command(name="traffic_capture", description="🎙️ Record anonymised traffic for offline replay")
+        @is_admin()
+        async def traffic_capture(interaction: discord.Interaction, action: str = "status"):
+            """Start or stop recording interactions and their SQL, or show the current capture"""
+            try:
+                action = action.lower()
+                if action == "start":
+                    if recorder.enabled:
+                        await interaction.response.send_message(f"🎙️ Already capturing to `{recorder.path}`", ephemeral=True)
+                        return
+                    # Snapshotting the database can take a while on large leagues
+                    await interaction.response.defer(ephemeral=True)
+                    path = await recorder.start(self.bot.db)
+                    await interaction.followup.send(f"🎙️ Capture started in `{path}`", ephemeral=True)
+                elif action == "stop":
+                    path, events = recorder.stop()
+                    if path is None:
+                        await interaction.response.send_message("📭 No capture is running.", ephemeral=True)
+                        return
+                    await interaction.response.send_message(
+                        f"🎙️ Capture stopped: {events} events in `{path}`\n"
+                        f"Replay with `python -m benchmarks.replay {path}`",
+                        ephemeral=True
+                    )
+                elif action == "status":
+                    status = recorder.status()
+                    if not status['enabled']:
+                        await interaction.response.send_message("📭 No capture is running.", ephemeral=True)
+                        return
+                    await interaction.response.send_message(
+                        f"🎙️ Capturing since {status['started_at']} UTC: {status['events']} events in `{status['path']}`",
+                        ephemeral=True
+                    )
+                else:
+                    await interaction.response.send_message(
+                        "❌ Invalid action! Available actions: `start`, `stop`, `status`", ephemeral=True
+                    )
+
+            except Exception as e:
+                logger.error(f"Traffic capture command error: {e}")
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error controlling traffic capture.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error controlling traffic capture.", ephemeral=True)
+
+        @self.bot.tree.command(name="memory", description="🧠 Inspect memory usage and allocation growth")
+        @is_admin()
+        async def memory(interaction: discord.Interaction, action: str = "summary", limit: int = 10):
+            """Show RSS and cache sizes, or control tracemalloc and report top or growing allocation sites"""
+            diagnostics = self.bot.memory
+            try:
+                action = action.lower()
+                limit = max(1, min(limit, 20))
+                if action == "start":
+                    started = diagnostics.start_tracing()
+                    message = ("🧠 tracemalloc started and a baseline taken. Allocations are slower until `/memory stop`."
+                               if started else "🧠 tracemalloc is already running.")
+                    await interaction.response.send_message(message, ephemeral=True)
+                    return
+                if action == "stop":
+                    diagnostics.stop_tracing()
+                    await interaction.response.send_message("🧠 tracemalloc stopped.", ephemeral=True)
+                    return
+                if action in ("top", "diff", "baseline") and not diagnostics.tracing:
+                    await interaction.response.send_message(
+                        "📭 tracemalloc is off; use `/memory start` or set `MEMORY_TRACE=1`.", ephemeral=True
+                    )
+                    return
+                if action not in ("summary", "top", "diff", "baseline", "types"):
+                    await interaction.response.send_message(
+                        "❌ Invalid action! Available actions: `summary`, `start`, `stop`, `top`, `diff`, `baseline`, `types`",
+                        ephemeral=True
+                    )
+                    return
+
+                # Snapshots and object walks can take a while on a big heap; keep the loop responsive
+                await interaction.response.defer(ephemeral=True)
+                loop = asyncio.get_running_loop()
+
+                if action == "baseline":
+                    await loop.run_in_executor(None, diagnostics.reset_baseline)
+                    await interaction.followup.send("🧠 New baseline taken; `/memory diff` now compares against it.", ephemeral=True)
+                    return
+
+                summary = diagnostics.summary()
+                embed = create_embed(
+                    title="🧠 Memory",
+                    description=f"RSS {summary['rss_mb']} MB (peak {summary['peak_rss_mb']} MB)",
+                    color=discord.Color.blue()
+                )
+                trend = summary['trend']
+                if trend:
+                    embed.add_field(
+                        name="📈 RSS Trend",
+                        value=f"{trend['first_mb']} → {trend['last_mb']} MB over {trend['window_hours']}h "
+                              f"({trend['growth_mb_per_hour']:+} MB/h)",
+                        inline=False
+                    )
+                traced = summary['tracemalloc']
+                if traced:
+                    embed.add_field(
+                        name="🔬 tracemalloc",
+                        value=f"Traced {traced['traced_mb']} MB (peak {traced['traced_peak_mb']} MB), "
+                              f"overhead {traced['overhead_mb']} MB",
+                        inline=False
+                    )
+
+                if action == "summary":
+                    for name, sizes in summary['structures'].items():
+                        value = ", ".join(f"{key}: {value}" for key, value in sizes.items())
+                        embed.add_field(name=name, value=value[:1024] or "-", inline=True)
+                elif action == "types":
+                    types = await loop.run_in_executor(None, diagnostics.object_types, limit)
+                    embed.add_field(
+                        name="🧩 Live Objects by Type",
+                        value="\n".join(f"`{name}`: {count:,}" for name, count in types)[:1024],
+                        inline=False
+                    )
+                else:
+                    report = diagnostics.top if action == "top" else diagnostics.diff
+                    sites = await loop.run_in_executor(None, report, limit)
+                    if action == "top":
+                        lines = [f"`{site['site']}` {site['size_kb']} KB in {site['count']:,} blocks" for site in sites]
+                        title = "📍 Top Allocation Sites"
+                    else:
+                        lines = [f"`{site['site']}` +{site['growth_kb']} KB (+{site['count_growth']:,} blocks)" for site in sites]
+                        title = "📈 Growth Since Baseline"
+                    embed.add_field(name=title, value="\n".join(lines)[:1024] or "No growth recorded", inline=False)
+
+                await interaction.followup.send(embed=embed, ephemeral=True)
+
+            except Exception as e:
+                logger.error(f"Memory command error: {e}")
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error collecting memory diagnostics.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error collecting memory diagnostics.", ephemeral=True)
+
+        @self.bot.tree.command(name="profile", description="🔥 Sample the running bot's stacks for a flame graph")
+        @is_admin()
+        async def profile(interaction: discord.Interaction, action: str = "status", seconds: int = 60, hz: int = 100):
+            """Start or stop the sampling profiler, or show its progress"""
+            profiler = self.bot.profiler
+            try:
+                action = action.lower()
+                if action == "start":
+                    seconds = max(1, min(seconds, 900))
+                    hz = max(1, min(hz, 500))
+                    if not profiler.start(seconds, hz):
+                        await interaction.response.send_message("🔥 The profiler is already running.", ephemeral=True)
+                        return
+                    await interaction.response.send_message(
+                        f"🔥 Sampling every thread at {hz} Hz for {seconds}s. "
+                        f"Use `/profile stop` to finish early or `/profile status` to collect the result.",
+                        ephemeral=True
+                    )
+                    return
+                if action not in ("stop", "status"):
+                    await interaction.response.send_message(
+                        "❌ Invalid action! Available actions: `start`, `stop`, `status`", ephemeral=True
+                    )
+                    return
+
+                if action == "stop":
+                    if not profiler.running:
+                        await interaction.response.send_message("📭 The profiler is not running.", ephemeral=True)
+                        return
+                    await interaction.response.defer(ephemeral=True)
+                    await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+
+                status = profiler.status()
+                # `stop` already deferred, so its replies go through the followup
+                send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+                if status['samples'] == 0:
+                    await send("📭 No profile has been recorded yet.", ephemeral=True)
+                    return
+
+                state = "running" if status['running'] else "finished"
+                embed = create_embed(
+                    title="🔥 Sampling Profile",
+                    description=f"{status['samples']:,} samples at {status['hz']} Hz over {status['elapsed_seconds']}s "
+                                f"({state}, {status['overhead_pct']}% sampling overhead)",
+                    color=discord.Color.orange()
+                )
+                if status['remaining_seconds'] is not None:
+                    embed.add_field(name="⏳ Remaining", value=f"{status['remaining_seconds']}s", inline=False)
+                embed.add_field(
+                    name="🏷️ Samples by Command or Task",
+                    value="\n".join(f"`{label}`: {count:,}" for label, count in profiler.by_label(limit=10))[:1024],
+                    inline=False
+                )
+                embed.add_field(
+                    name="🔝 Hottest Functions (event loop)",
+                    value="\n".join(f"`{frame}`: {count:,}" for frame, count in profiler.hot_functions(limit=8))[:1024] or "-",
+                    inline=False
+                )
+
+                if status['running'] or not status['last_profile']:
+                    await send(embed=embed, ephemeral=True)
+                    return
+                embed.set_footer(text="Render with flamegraph.pl or open in speedscope.app")
+                path = status['last_profile']
+                await send(embed=embed, file=discord.File(path, filename=os.path.basename(path)), ephemeral=True)
+
+            except Exception as e:
+                logger.error(f"Profile command error: {e}")
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error controlling the profiler.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error controlling the profiler.", ephemeral=True)
+
+        @self.bot.tree.command(name="traces", description="🧵 Inspect per-interaction spans and waterfalls")
+        @is_admin()
+        async def traces(interaction: discord.Interaction, action: str = "slowest", command: str = None,
+                         trace_id: str = None, limit: int = 10):
+            """List recent or slowest traced interactions, or show one as a waterfall"""
+            try:
+                action = action.lower()
+                limit = max(1, min(limit, 20))
+                if not spans.enabled:
+                    await interaction.response.send_message("📭 Tracing is disabled by `TRACING=0`.", ephemeral=True)
+                    return
+                if action not in ("recent", "slowest", "show"):
+                    await interaction.response.send_message(
+                        "❌ Invalid action! Available actions: `recent`, `slowest`, `show`", ephemeral=True
+                    )
+                    return
+
+                if action == "show":
+                    trace = spans.get(trace_id) if trace_id else next(iter(spans.slowest(1, command)), None)
+                    if trace is None:
+                        await interaction.response.send_message("📭 No matching trace in the buffer.", ephemeral=True)
+                        return
+                    totals = trace.totals()
+                    header = (f"🧵 `{trace.command}` trace `{trace.id}`: {trace.duration_ms:.1f}ms "
+                              f"(DB {totals['db']}ms, REST {totals['rest']}ms, {len(trace.spans)} spans)"
+                              f"{' ⚠️ error' if trace.error else ''}\n")
+                    body = waterfall(trace)
+                    budget = 2000 - len(header) - 8
+                    if len(body) > budget:
+                        body = body[:budget - 4].rsplit('\n', 1)[0] + "\n..."
+                    await interaction.response.send_message(f"{header}```\n{body}\n```", ephemeral=True)
+                    return
+
+                found = spans.recent(limit, command) if action == "recent" else spans.slowest(limit, command)
+                if not found:
+                    await interaction.response.send_message("📭 No traced interactions yet!", ephemeral=True)
+                    return
+
+                stats = spans.stats()
+                embed = create_embed(
+                    title="🧵 Recent Traces" if action == "recent" else "🐢 Slowest Traces",
+                    description=f"{stats['buffered']} of the last {stats['buffer_size']} interactions buffered. "
+                                f"Use `/traces show trace_id:<id>` for a waterfall.",
+                    color=discord.Color.blue()
+                )
+                lines = []
+                for trace in found:
+                    totals = trace.totals()
+                    lines.append(
+                        f"`{trace.id[:8]}` **{trace.command}** {trace.duration_ms:.0f}ms "
+                        f"(DB {totals['db']:.0f}, REST {totals['rest']:.0f}){' ⚠️' if trace.error else ''}"
+                    )
+                embed.add_field(name="Interactions", value="\n".join(lines)[:1024], inline=False)
+                if stats['file']:
+                    embed.set_footer(text=f"Exported to {stats['file']}")
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            except Exception as e:
+                logger.error(f"Traces command error: {e}")
+                await interaction.response.send_message("❌ Error retrieving traces.", ephemeral=True)
@@ -2,7 +2,9 @@ import discord
 from discord.ext import commands
 from utils import create_embed, is_admin, format_currency, format_club_info, create_or_get_role
 import logging
+import io
 from typing import Optional
+from cards import club_payload
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,10 @@ class ClubCommands:
                     await interaction.response.send_message("❌ Club already exists!", ephemeral=True)
                     return
                 
+                if image:
+                    # Downloading and resizing the crest can take longer than the response window
+                    await interaction.response.defer()
+                
                 # Create Discord role for the club
                 if interaction.guild:
                     role = await create_or_get_role(interaction.guild, name, discord.Color.blue())
@@ -36,6 +42,7 @@ class ClubCommands:
                 
                 # Create club in database
                 club_id = self.db.create_club(name, budget, interaction.guild_id, role_id)
+                self.bot.live_boards.mark_dirty(interaction.guild_id)
                 
                 embed = create_embed(
                     title="⚽ Club Created!",
@@ -49,13 +56,54 @@ class ClubCommands:
                 embed.add_field(name="🆔 Club ID", value=str(club_id), inline=True)
                 
                 if image:
-                    embed.set_image(url=image.url)
+                    crest_file = await self.save_crest(club_id, image)
+                    if crest_file:
+                        embed.set_thumbnail(url="attachment://crest.png")
+                        await interaction.followup.send(embed=embed, file=crest_file)
+                    else:
+                        embed.set_image(url=image.url)
+                        await interaction.followup.send(embed=embed)
+                    return
                 
                 await interaction.response.send_message(embed=embed)
                 
             except Exception as e:
                 logger.error(f"Create club command error: {e}")
-                await interaction.response.send_message("❌ Error creating club.", ephemeral=True)
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error creating club.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error creating club.", ephemeral=True)
+
+        @self.bot.tree.command(name="set_crest", description="🛡️ Set or replace a club's crest image")
+        @is_admin()
+        async def set_crest(interaction: discord.Interaction, name: str, image: discord.Attachment):
+            """Store a new crest for a club"""
+            try:
+                club = self.db.get_club_by_name(name, interaction.guild_id)
+                if not club:
+                    await interaction.response.send_message("❌ Club not found!", ephemeral=True)
+                    return
+                
+                await interaction.response.defer(ephemeral=True)
+                crest_file = await self.save_crest(club['id'], image)
+                if not crest_file:
+                    await interaction.followup.send("❌ Could not read that image. Please upload a PNG or JPEG.", ephemeral=True)
+                    return
+                
+                embed = create_embed(
+                    title="🛡️ Crest Updated",
+                    description=f"**{club['name']}** crest saved and will be shown automatically.",
+                    color=discord.Color.green()
+                )
+                embed.set_thumbnail(url="attachment://crest.png")
+                await interaction.followup.send(embed=embed, file=crest_file, ephemeral=True)
+                
+            except Exception as e:
+                logger.error(f"Set crest command error: {e}")
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error saving crest.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error saving crest.", ephemeral=True)
 
         @self.bot.tree.command(name="delete_club", description="🗑️ Delete a club and its Discord role")
         @is_admin()
@@ -76,6 +124,7 @@ class ClubCommands:
                 success = self.db.delete_club(club['id'])
                 
                 if success:
+                    self.bot.live_boards.mark_dirty(interaction.guild_id)
                     # Delete Discord role
                     if role:
                         try:
@@ -132,6 +181,12 @@ class ClubCommands:
                 if len(clubs) > 10:
                     embed.set_footer(text=f"Showing first 10 of {len(clubs)} clubs")
                 
+                crest_file = await self.bot.crests.strip_file([club['crest_hash'] for club in clubs[:10]])
+                if crest_file:
+                    embed.set_image(url="attachment://crests.png")
+                    await interaction.response.send_message(embed=embed, file=crest_file)
+                    return
+                
                 await interaction.response.send_message(embed=embed)
                 
             except Exception as e:
@@ -139,7 +194,7 @@ class ClubCommands:
                 await interaction.response.send_message("❌ Error listing clubs.", ephemeral=True)
 
         @self.bot.tree.command(name="club_info", description="ℹ️ Get detailed information about a specific club")
-        async def club_info(interaction: discord.Interaction, name: str, image: discord.Attachment = None):
+        async def club_info(interaction: discord.Interaction, name: str, image: discord.Attachment = None, card: bool = False):
             """Get detailed club information"""
             try:
                 club = self.db.get_club_by_name(name, interaction.guild_id)
@@ -165,7 +220,9 @@ class ClubCommands:
                     role = interaction.guild.get_role(club['role_id'])
                     if role:
                         embed.add_field(name="👑 Discord Role", value=role.mention, inline=True)
-                        embed.add_field(name="👤 Role Members", value=str(len(role.members)), inline=True)
+                        member_count = self.bot.members.role_member_count(role)
+                        if member_count is not None:
+                            embed.add_field(name="👤 Role Members", value=str(member_count), inline=True)
                 
                 # Transfer activity
                 if stats:
@@ -183,11 +240,29 @@ class ClubCommands:
                 
                 embed.set_footer(text=f"Club ID: {club['id']} | Created: {club['created_at']}")
                 
-                await interaction.response.send_message(embed=embed)
+                files = []
+                crest_file = await self.bot.crests.file(club['crest_hash'])
+                if crest_file:
+                    embed.set_thumbnail(url="attachment://crest.png")
+                    files.append(crest_file)
+                
+                if card:
+                    # Rendering happens in a worker process; defer so the interaction doesn't time out
+                    await interaction.response.defer()
+                    data = await self.bot.card_renderer.render('club', club_payload(club, stats, players))
+                    embed.set_image(url="attachment://club_card.png")
+                    files.append(discord.File(io.BytesIO(data), filename="club_card.png"))
+                    await interaction.followup.send(embed=embed, files=files)
+                    return
+                
+                await interaction.response.send_message(embed=embed, files=files)
                 
             except Exception as e:
                 logger.error(f"Club info command error: {e}")
-                await interaction.response.send_message("❌ Error getting club information.", ephemeral=True)
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error getting club information.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error getting club information.", ephemeral=True)
 
         @self.bot.tree.command(name="update_budget", description="💰 Update a club's budget")
         @is_admin()
@@ -203,6 +278,7 @@ class ClubCommands:
                 success = self.db.update_club_budget(club['id'], amount)
                 
                 if success:
+                    self.bot.live_boards.mark_dirty(interaction.guild_id)
                     difference = amount - old_budget
                     embed = create_embed(
                         title="💰 Budget Updated",
@@ -244,6 +320,7 @@ class ClubCommands:
                         'UPDATE clubs SET name = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
                         (new_name, club['id'])
                     )
+                self.bot.live_boards.mark_dirty(interaction.guild_id)
                 
                 # Update Discord role name
                 if club['role_id']:
@@ -312,3 +389,14 @@ class ClubCommands:
             except Exception as e:
                 logger.error(f"Compare clubs command error: {e}")
                 await interaction.response.send_message("❌ Error comparing clubs.", ephemeral=True)
+
+    async def save_crest(self, club_id, image):
+        """Persist an uploaded crest for a club and return it as a Discord file"""
+        try:
+            crest_hash = await self.bot.crests.store_attachment(image)
+        except Exception as e:
+            logger.warning(f"Failed to store crest for club {club_id}: {e}")
+            return None
+        
+        self.db.set_club_crest(club_id, crest_hash)
+        return await self.bot.crests.file(crest_hash)
@@ -84,7 +84,12 @@ class MatchCommands:
                 
                 embed.add_field(name="⏰ Reminder", value="5 minutes before kickoff", inline=False)
                 
-                await interaction.response.send_message(embed=embed)
+                crest_file = await self.bot.crests.strip_file([team1_obj['crest_hash'], team2_obj['crest_hash']])
+                if crest_file:
+                    embed.set_image(url="attachment://crests.png")
+                    await interaction.response.send_message(embed=embed, file=crest_file)
+                else:
+                    await interaction.response.send_message(embed=embed)
                 
                 # Send DMs to role members
                 await self.send_match_notifications(interaction.guild, team1_obj, team2_obj, match_datetime, "scheduled")
@@ -207,7 +212,8 @@ class MatchCommands:
                     reminder_time = datetime.now() + timedelta(hours=hours)
                     
                     cursor.execute(
-                        '''SELECT m.*, c1.name as team1_name, c2.name as team2_name 
+                        '''SELECT m.*, c1.name as team1_name, c2.name as team2_name,
+                                  c1.crest_hash as team1_crest, c2.crest_hash as team2_crest
                            FROM matches m
                            JOIN clubs c1 ON m.team1_id = c1.id
                            JOIN clubs c2 ON m.team2_id = c2.id
@@ -256,7 +262,12 @@ class MatchCommands:
                     if channel:
                         try:
                             content = f"📢 Match Reminder! {role_mentions}".strip()
-                            await self.bot.rate_limiter.execute(channel.send, content=content, embed=embed)
+                            crest_file = await self.bot.crests.strip_file([match['team1_crest'], match['team2_crest']])
+                            if crest_file:
+                                embed.set_image(url="attachment://crests.png")
+                                await self.bot.rate_limiter.execute(channel.send, content=content, embed=embed, file=crest_file)
+                            else:
+                                await self.bot.rate_limiter.execute(channel.send, content=content, embed=embed)
                             sent_count += 1
                         except Exception as e:
                             logger.error(f"Failed to send match reminder: {e}")
@@ -292,31 +303,17 @@ class MatchCommands:
                 time_until = match_datetime - datetime.now()
                 embed.add_field(name="⏳ Starting In", value=f"{int(time_until.total_seconds() // 60)} minutes", inline=True)
             
-            # Send to team 1 members
-            if team1_obj['role_id']:
-                role1 = guild.get_role(team1_obj['role_id'])
-                if role1:
-                    for member in role1.members:
-                        try:
-                            await member.send(embed=embed)
-                        except discord.Forbidden:
-                            # User has DMs disabled
-                            pass
-                        except Exception as e:
-                            logger.error(f"Failed to send DM to {member}: {e}")
-            
-            # Send to team 2 members
-            if team2_obj['role_id']:
-                role2 = guild.get_role(team2_obj['role_id'])
-                if role2:
-                    for member in role2.members:
-                        try:
-                            await member.send(embed=embed)
-                        except discord.Forbidden:
-                            # User has DMs disabled
-                            pass
-                        except Exception as e:
-                            logger.error(f"Failed to send DM to {member}: {e}")
+            # Fetch both teams' members in one go; with a lazy member cache this chunks the guild on demand
+            role_members = await self.bot.members.role_members(guild, [team1_obj['role_id'], team2_obj['role_id']])
+            for members in role_members.values():
+                for member in members:
+                    try:
+                        await member.send(embed=embed)
+                    except discord.Forbidden:
+                        # User has DMs disabled
+                        pass
+                    except Exception as e:
+                        logger.error(f"Failed to send DM to {member}: {e}")
                             
         except Exception as e:
             logger.error(f"Error sending match notifications: {e}")
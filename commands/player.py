@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from utils import create_embed, is_admin, format_currency, format_player_info, assign_role_to_user, remove_role_from_user
+from utils import create_embed, is_admin, format_currency, format_player_info, assign_role_to_user, remove_role_from_user, get_or_fetch_member
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,6 +37,7 @@ class PlayerCommands:
                 # Create player
                 discord_user_id = discord_user.id if discord_user else None
                 player_id = self.db.create_player(name, value, interaction.guild_id, club_id, position, age, discord_user_id)
+                self.bot.live_boards.mark_dirty(interaction.guild_id)
                 
                 # Assign Discord role if player has a club and Discord user
                 if club_obj and discord_user and club_obj['role_id']:
@@ -80,21 +81,18 @@ class PlayerCommands:
                 
                 # Remove from Discord role if applicable
                 if player['club_id'] and player['discord_user_id']:
-                    club = self.db.get_club_by_name("", interaction.guild_id)  # Get by ID instead
-                    with self.db.get_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute('SELECT * FROM clubs WHERE id = ?', (player['club_id'],))
-                        club = cursor.fetchone()
+                    club = self.db.get_club_by_id(player['club_id'])
                     
                     if club and club['role_id']:
                         role = interaction.guild.get_role(club['role_id'])
-                        discord_user = interaction.guild.get_member(player['discord_user_id'])
+                        discord_user = await get_or_fetch_member(interaction.guild, player['discord_user_id'])
                         if role and discord_user:
                             await remove_role_from_user(discord_user, role)
                 
                 success = self.db.delete_player(player['id'])
                 
                 if success:
+                    self.bot.live_boards.mark_dirty(interaction.guild_id)
                     embed = create_embed(
                         title="🗑️ Player Removed",
                         description=f"**{name}** has left the league.",
@@ -126,38 +124,37 @@ class PlayerCommands:
                 # Get from club info
                 from_club_obj = None
                 if player['club_id']:
-                    with self.db.get_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute('SELECT * FROM clubs WHERE id = ?', (player['club_id'],))
-                        from_club_obj = cursor.fetchone()
+                    from_club_obj = self.db.get_club_by_id(player['club_id'])
                 
                 # Check if destination club has enough budget
                 if to_club_obj['budget'] < transfer_fee:
                     await interaction.response.send_message("❌ Destination club doesn't have enough budget!", ephemeral=True)
                     return
                 
-                # Handle Discord roles
-                discord_user = None
-                if player['discord_user_id']:
-                    discord_user = interaction.guild.get_member(player['discord_user_id'])
-                
-                if discord_user:
-                    # Remove from old club role
-                    if from_club_obj and from_club_obj['role_id']:
-                        old_role = interaction.guild.get_role(from_club_obj['role_id'])
-                        if old_role:
-                            await remove_role_from_user(discord_user, old_role)
-                    
-                    # Add to new club role
-                    if to_club_obj['role_id']:
-                        new_role = interaction.guild.get_role(to_club_obj['role_id'])
-                        if new_role:
-                            await assign_role_to_user(discord_user, new_role)
-                
-                # Perform transfer
+                # Perform transfer; the budget is checked again atomically in case another transfer got there first
                 success = self.db.transfer_player(player['id'], to_club_obj['id'], transfer_fee, interaction.guild_id)
                 
                 if success:
+                    self.bot.live_boards.mark_dirty(interaction.guild_id)
+                    
+                    # Handle Discord roles once the transfer is committed
+                    discord_user = None
+                    if player['discord_user_id']:
+                        discord_user = await get_or_fetch_member(interaction.guild, player['discord_user_id'])
+                    
+                    if discord_user:
+                        # Remove from old club role
+                        if from_club_obj and from_club_obj['role_id']:
+                            old_role = interaction.guild.get_role(from_club_obj['role_id'])
+                            if old_role:
+                                await remove_role_from_user(discord_user, old_role)
+                        
+                        # Add to new club role
+                        if to_club_obj['role_id']:
+                            new_role = interaction.guild.get_role(to_club_obj['role_id'])
+                            if new_role:
+                                await assign_role_to_user(discord_user, new_role)
+                    
                     embed = create_embed(
                         title="🔄 Transfer Complete!",
                         description=f"**{player_name}** has been transferred!",
@@ -177,7 +174,7 @@ class PlayerCommands:
                     
                     await interaction.response.send_message(embed=embed)
                 else:
-                    await interaction.response.send_message("❌ Error performing transfer.", ephemeral=True)
+                    await interaction.response.send_message("❌ Transfer failed: the destination club can no longer afford it.", ephemeral=True)
                 
             except Exception as e:
                 logger.error(f"Transfer player command error: {e}")
@@ -197,6 +194,7 @@ class PlayerCommands:
                 success = self.db.update_player_value(player['id'], value)
                 
                 if success:
+                    self.bot.live_boards.mark_dirty(interaction.guild_id)
                     difference = value - old_value
                     embed = create_embed(
                         title="💎 Player Value Updated",
@@ -235,10 +233,7 @@ class PlayerCommands:
                 
                 # Club info
                 if player['club_id']:
-                    with self.db.get_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute('SELECT * FROM clubs WHERE id = ?', (player['club_id'],))
-                        club = cursor.fetchone()
+                    club = self.db.get_club_by_id(player['club_id'])
                     
                     if club:
                         embed.add_field(name="🏆 Current Club", value=club['name'], inline=True)
@@ -251,7 +246,7 @@ class PlayerCommands:
                 
                 # Discord user info
                 if player['discord_user_id']:
-                    discord_user = interaction.guild.get_member(player['discord_user_id'])
+                    discord_user = await get_or_fetch_member(interaction.guild, player['discord_user_id'])
                     if discord_user:
                         embed.add_field(name="👤 Discord User", value=discord_user.mention, inline=True)
                 
@@ -296,6 +291,10 @@ class PlayerCommands:
                     players = self.db.get_all_players(interaction.guild_id)
                     title = "👥 All Players"
                 
+                club_names = {}
+                if not club:
+                    club_names = {c['id']: c['name'] for c in self.db.get_all_clubs(interaction.guild_id)}
+                
                 if not players:
                     await interaction.response.send_message("📋 No players found!", ephemeral=True)
                     return
@@ -309,11 +308,8 @@ class PlayerCommands:
                 for i, player in enumerate(players[:15]):  # Limit to 15 players
                     club_name = ""
                     if player['club_id'] and not club:
-                        with self.db.get_connection() as conn:
-                            cursor = conn.cursor()
-                            cursor.execute('SELECT name FROM clubs WHERE id = ?', (player['club_id'],))
-                            club_result = cursor.fetchone()
-                            club_name = f" ({club_result['name']})" if club_result else ""
+                        club_result = club_names.get(player['club_id'])
+                        club_name = f" ({club_result})" if club_result else ""
                     
                     value = f"{format_currency(player['value'])}\n{player['position']} • Age {player['age']}"
                     
@@ -337,7 +333,7 @@ class PlayerCommands:
             """List free agents"""
             try:
                 all_players = self.db.get_all_players(interaction.guild_id)
-                free_agents = [p for p in all_players if not p['club_id']]
+                free_agents = [all_players[i] for i in all_players.free_agent_indices()]
                 
                 if not free_agents:
                     await interaction.response.send_message("🆓 No free agents available!", ephemeral=True)
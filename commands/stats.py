@@ -2,6 +2,8 @@ import discord
 from discord.ext import commands
 from utils import create_embed, format_currency
 import logging
+import io
+from cards import club_rankings_payload, top_players_payload
 
 logger = logging.getLogger(__name__)
 
@@ -15,34 +17,23 @@ class StatsCommands:
         """Setup all statistics slash commands"""
         
         @self.bot.tree.command(name="top_players", description="⭐ Show top players by value")
-        async def top_players(interaction: discord.Interaction, limit: int = 10, image: discord.Attachment = None):
+        async def top_players(interaction: discord.Interaction, limit: int = 10, image: discord.Attachment = None, card: bool = False):
             """Show top players by value"""
             try:
+                if card:
+                    # An image table isn't bound by the 25 field embed limit
+                    await self.send_top_players_card(interaction, min(limit, 100))
+                    return
+                
                 if limit > 25:
                     limit = 25
                     
-                players = self.db.get_top_players_by_value(interaction.guild_id, limit)
+                embed = self.build_top_players_embed(interaction.guild, limit)
                 
-                if not players:
+                if not embed:
                     await interaction.response.send_message("⭐ No players found!", ephemeral=True)
                     return
                 
-                embed = create_embed(
-                    title="⭐ Top Players by Value",
-                    description=f"Top {len(players)} most valuable players",
-                    color=discord.Color.gold()
-                )
-                
-                for i, player in enumerate(players, 1):
-                    medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-                    club_name = player['club_name'] if player['club_name'] else "Free Agent"
-                    
-                    embed.add_field(
-                        name=f"{medal} {player['name']}",
-                        value=f"{format_currency(player['value'])}\n{player['position']} • {club_name}",
-                        inline=True
-                    )
-                
                 if image:
                     embed.set_image(url=image.url)
                 
@@ -50,7 +41,10 @@ class StatsCommands:
                 
             except Exception as e:
                 logger.error(f"Top players command error: {e}")
-                await interaction.response.send_message("❌ Error getting top players.", ephemeral=True)
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error getting top players.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error getting top players.", ephemeral=True)
 
         @self.bot.tree.command(name="richest_clubs", description="💰 Show richest clubs by budget")
         async def richest_clubs(interaction: discord.Interaction, limit: int = 10, image: discord.Attachment = None):
@@ -116,7 +110,7 @@ class StatsCommands:
                 
                 # Financial overview
                 total_budget = sum(club['budget'] for club in clubs)
-                total_player_value = sum(player['value'] for player in players)
+                total_player_value = players.total_value()
                 average_budget = total_budget / len(clubs) if clubs else 0
                 average_player_value = total_player_value / len(players) if players else 0
                 
@@ -128,14 +122,7 @@ class StatsCommands:
                 embed.add_field(name="📊 Average Player Value", value=format_currency(average_player_value), inline=True)
                 
                 # Most active positions
-                with self.db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        '''SELECT position, COUNT(*) as count FROM players 
-                           WHERE guild_id = ? GROUP BY position ORDER BY count DESC LIMIT 3''',
-                        (interaction.guild_id,)
-                    )
-                    positions = cursor.fetchall()
+                positions = self.db.get_position_counts(interaction.guild_id)
                 
                 if positions:
                     position_text = "\n".join([f"{pos['position']}: {pos['count']}" for pos in positions])
@@ -157,20 +144,7 @@ class StatsCommands:
                 if limit > 20:
                     limit = 20
                     
-                with self.db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        '''SELECT t.*, p.name as player_name, 
-                                  cf.name as from_club, ct.name as to_club
-                           FROM transfers t
-                           JOIN players p ON t.player_id = p.id
-                           LEFT JOIN clubs cf ON t.from_club_id = cf.id
-                           LEFT JOIN clubs ct ON t.to_club_id = ct.id
-                           WHERE t.guild_id = ?
-                           ORDER BY t.transfer_date DESC LIMIT ?''',
-                        (interaction.guild_id, limit)
-                    )
-                    transfers = cursor.fetchall()
+                transfers = self.db.get_recent_transfers(interaction.guild_id, limit)
                 
                 if not transfers:
                     await interaction.response.send_message("🔄 No transfer activity found!", ephemeral=True)
@@ -201,58 +175,18 @@ class StatsCommands:
                 await interaction.response.send_message("❌ Error getting transfer activity.", ephemeral=True)
 
         @self.bot.tree.command(name="club_rankings", description="🏆 Show club rankings by squad value")
-        async def club_rankings(interaction: discord.Interaction, image: discord.Attachment = None):
+        async def club_rankings(interaction: discord.Interaction, image: discord.Attachment = None, card: bool = False):
             """Show club rankings by total squad value"""
             try:
-                clubs = self.db.get_all_clubs(interaction.guild_id)
-                
-                if not clubs:
-                    await interaction.response.send_message("🏆 No clubs found!", ephemeral=True)
+                if card:
+                    await self.send_club_rankings_card(interaction)
                     return
                 
-                # Calculate total value for each club (budget + squad value)
-                club_rankings = []
-                for club in clubs:
-                    stats = self.db.get_club_stats(club['id'])
-                    total_value = club['budget']
-                    if stats:
-                        total_value += stats['total_value']
-                    
-                    club_rankings.append({
-                        'name': club['name'],
-                        'budget': club['budget'],
-                        'squad_value': stats['total_value'] if stats else 0,
-                        'total_value': total_value,
-                        'players': stats['player_count'] if stats else 0,
-                        'role_id': club['role_id']
-                    })
-                
-                # Sort by total value
-                club_rankings.sort(key=lambda x: x['total_value'], reverse=True)
+                embed = self.build_club_rankings_embed(interaction.guild)
                 
-                embed = create_embed(
-                    title="🏆 Club Rankings",
-                    description="Clubs ranked by total value (budget + squad value)",
-                    color=discord.Color.gold()
-                )
-                
-                for i, club in enumerate(club_rankings[:15], 1):  # Limit to 15
-                    medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-                    
-                    role_mention = ""
-                    if club['role_id']:
-                        role = interaction.guild.get_role(club['role_id'])
-                        if role:
-                            role_mention = f" {role.mention}"
-                    
-                    value_text = f"Total: {format_currency(club['total_value'])}\n"
-                    value_text += f"Budget: {format_currency(club['budget'])} | Squad: {format_currency(club['squad_value'])}"
-                    
-                    embed.add_field(
-                        name=f"{medal} {club['name']}{role_mention}",
-                        value=value_text,
-                        inline=True
-                    )
+                if not embed:
+                    await interaction.response.send_message("🏆 No clubs found!", ephemeral=True)
+                    return
                 
                 if image:
                     embed.set_image(url=image.url)
@@ -261,40 +195,16 @@ class StatsCommands:
                 
             except Exception as e:
                 logger.error(f"Club rankings command error: {e}")
-                await interaction.response.send_message("❌ Error getting club rankings.", ephemeral=True)
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Error getting club rankings.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Error getting club rankings.", ephemeral=True)
 
         @self.bot.tree.command(name="player_search", description="🔍 Search for players by various criteria")
         async def player_search(interaction: discord.Interaction, position: str = None, min_value: float = None, max_value: float = None, club: str = None):
             """Search for players with filters"""
             try:
-                with self.db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    query = '''SELECT p.*, c.name as club_name FROM players p
-                              LEFT JOIN clubs c ON p.club_id = c.id
-                              WHERE p.guild_id = ?'''
-                    params = [interaction.guild_id]
-                    
-                    if position:
-                        query += ' AND p.position LIKE ?'
-                        params.append(f'%{position}%')
-                    
-                    if min_value is not None:
-                        query += ' AND p.value >= ?'
-                        params.append(min_value)
-                    
-                    if max_value is not None:
-                        query += ' AND p.value <= ?'
-                        params.append(max_value)
-                    
-                    if club:
-                        query += ' AND c.name LIKE ?'
-                        params.append(f'%{club}%')
-                    
-                    query += ' ORDER BY p.value DESC LIMIT 15'
-                    
-                    cursor.execute(query, params)
-                    players = cursor.fetchall()
+                players = self.db.search_players(interaction.guild_id, position, min_value, max_value, club)
                 
                 if not players:
                     await interaction.response.send_message("🔍 No players found matching your criteria!", ephemeral=True)
@@ -339,40 +249,7 @@ class StatsCommands:
         async def age_analysis(interaction: discord.Interaction):
             """Show age analysis of players"""
             try:
-                with self.db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    
-                    # Age statistics
-                    cursor.execute(
-                        '''SELECT AVG(age) as avg_age, MIN(age) as min_age, MAX(age) as max_age,
-                                  COUNT(*) as total_players FROM players WHERE guild_id = ?''',
-                        (interaction.guild_id,)
-                    )
-                    stats = cursor.fetchone()
-                    
-                    # Age distribution
-                    cursor.execute(
-                        '''SELECT 
-                           CASE 
-                               WHEN age < 20 THEN 'Under 20'
-                               WHEN age < 25 THEN '20-24'
-                               WHEN age < 30 THEN '25-29'
-                               WHEN age < 35 THEN '30-34'
-                               ELSE '35+'
-                           END as age_group,
-                           COUNT(*) as count
-                           FROM players WHERE guild_id = ?
-                           GROUP BY age_group ORDER BY 
-                           CASE 
-                               WHEN age < 20 THEN 1
-                               WHEN age < 25 THEN 2
-                               WHEN age < 30 THEN 3
-                               WHEN age < 35 THEN 4
-                               ELSE 5
-                           END''',
-                        (interaction.guild_id,)
-                    )
-                    age_groups = cursor.fetchall()
+                stats, age_groups = self.db.get_age_stats(interaction.guild_id)
                 
                 if not stats or stats['total_players'] == 0:
                     await interaction.response.send_message("📈 No players found for age analysis!", ephemeral=True)
@@ -398,3 +275,96 @@ class StatsCommands:
             except Exception as e:
                 logger.error(f"Age analysis command error: {e}")
                 await interaction.response.send_message("❌ Error performing age analysis.", ephemeral=True)
+
+    def build_club_rankings_embed(self, guild):
+        """Build the club rankings embed, or None if the guild has no clubs"""
+        club_rankings = self.db.get_club_rankings(guild.id)
+        if not club_rankings:
+            return None
+        
+        embed = create_embed(
+            title="🏆 Club Rankings",
+            description="Clubs ranked by total value (budget + squad value)",
+            color=discord.Color.gold()
+        )
+        
+        for i, club in enumerate(club_rankings[:15], 1):  # Limit to 15
+            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+            
+            role_mention = ""
+            if club['role_id']:
+                role = guild.get_role(club['role_id'])
+                if role:
+                    role_mention = f" {role.mention}"
+            
+            value_text = f"Total: {format_currency(club['total_value'])}\n"
+            value_text += f"Budget: {format_currency(club['budget'])} | Squad: {format_currency(club['squad_value'])}"
+            
+            embed.add_field(
+                name=f"{medal} {club['name']}{role_mention}",
+                value=value_text,
+                inline=True
+            )
+        
+        return embed
+
+    def build_top_players_embed(self, guild, limit=10):
+        """Build the top players embed, or None if the guild has no players"""
+        players = self.db.get_top_players_by_value(guild.id, limit)
+        if not players:
+            return None
+        
+        embed = create_embed(
+            title="⭐ Top Players by Value",
+            description=f"Top {len(players)} most valuable players",
+            color=discord.Color.gold()
+        )
+        
+        for i, player in enumerate(players, 1):
+            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+            club_name = player['club_name'] if player['club_name'] else "Free Agent"
+            
+            embed.add_field(
+                name=f"{medal} {player['name']}",
+                value=f"{format_currency(player['value'])}\n{player['position']} • {club_name}",
+                inline=True
+            )
+        
+        return embed
+
+    async def send_club_rankings_card(self, interaction):
+        """Send the full league table as a rendered image"""
+        club_rankings = self.db.get_club_rankings(interaction.guild_id)
+        if not club_rankings:
+            await interaction.response.send_message("🏆 No clubs found!", ephemeral=True)
+            return
+        
+        # Rendering happens in a worker process; defer so the interaction doesn't time out
+        await interaction.response.defer()
+        data = await self.bot.card_renderer.render('table', club_rankings_payload(club_rankings))
+        
+        embed = create_embed(
+            title="🏆 Club Rankings",
+            description=f"All {len(club_rankings)} clubs ranked by total value (budget + squad value)",
+            color=discord.Color.gold()
+        )
+        embed.set_image(url="attachment://club_rankings.png")
+        await interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(data), filename="club_rankings.png"))
+
+    async def send_top_players_card(self, interaction, limit):
+        """Send the top players table as a rendered image"""
+        players = self.db.get_top_players_by_value(interaction.guild_id, limit)
+        if not players:
+            await interaction.response.send_message("⭐ No players found!", ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        data = await self.bot.card_renderer.render('table', top_players_payload(players))
+        
+        embed = create_embed(
+            title="⭐ Top Players by Value",
+            description=f"Top {len(players)} most valuable players",
+            color=discord.Color.gold()
+        )
+        embed.set_image(url="attachment://top_players.png")
+        await interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(data), filename="top_players.png"))
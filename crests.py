@@ -0,0 +1,157 @@
+import discord
+import aiohttp
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+MAX_CREST_BYTES = 8 * 1024 * 1024
+THUMBNAIL_SIZE = (128, 128)
+
+def _process_crest(data, original_path, thumbnail_path):
+    """Validate an uploaded image and write the original and its thumbnail"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.verify()
+
+    with Image.open(io.BytesIO(data)) as image:
+        thumbnail = image.convert("RGBA")
+        thumbnail.thumbnail(THUMBNAIL_SIZE)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format="PNG", optimize=True)
+
+    os.makedirs(os.path.dirname(original_path), exist_ok=True)
+    # Write to temp files and rename so readers never see partial crests
+    for path, content in ((original_path, data), (thumbnail_path, buffer.getvalue())):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return buffer.getvalue()
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _compose_strip(thumbnails):
+    """Place thumbnails side by side in one PNG"""
+    from PIL import Image
+
+    width, height = THUMBNAIL_SIZE
+    gap = 16
+    strip = Image.new("RGBA", (len(thumbnails) * (width + gap) - gap, height), (0, 0, 0, 0))
+    for index, data in enumerate(thumbnails):
+        with Image.open(io.BytesIO(data)) as thumbnail:
+            x = index * (width + gap) + (width - thumbnail.width) // 2
+            y = (height - thumbnail.height) // 2
+            strip.paste(thumbnail, (x, y))
+    buffer = io.BytesIO()
+    strip.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+class CrestStore:
+    """Content-addressed club crest storage on the persistent disk"""
+
+    def __init__(self, root=None, cache_size=64):
+        self.root = os.path.join(root or os.getenv('DATA_DIR', 'data'), 'crests')
+        self.session = None
+        self.thumbnails = LRUCache(cache_size)  # crest hash -> thumbnail PNG bytes
+        self.strips = LRUCache(cache_size // 4 or 1)  # tuple of hashes -> strip PNG bytes
+
+    def _paths(self, crest_hash):
+        directory = os.path.join(self.root, crest_hash[:2])
+        return os.path.join(directory, crest_hash), os.path.join(directory, f"{crest_hash}_thumb.png")
+
+    def _get_session(self):
+        """Shared HTTP session so downloads reuse pooled connections"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=8),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self.session
+
+    async def download(self, url):
+        """Download an image, refusing anything too large"""
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            data = await response.content.read(MAX_CREST_BYTES + 1)
+        if len(data) > MAX_CREST_BYTES:
+            raise ValueError("Crest image is too large")
+        return data
+
+    async def store_attachment(self, attachment: discord.Attachment):
+        """Persist an uploaded crest and return its content hash"""
+        if attachment.size > MAX_CREST_BYTES:
+            raise ValueError("Crest image is too large")
+        if attachment.content_type and not attachment.content_type.startswith('image/'):
+            raise ValueError("Crest must be an image")
+
+        data = await self.download(attachment.url)
+        crest_hash = hashlib.sha256(data).hexdigest()
+        original_path, thumbnail_path = self._paths(crest_hash)
+
+        if not os.path.exists(thumbnail_path):
+            loop = asyncio.get_running_loop()
+            thumbnail = await loop.run_in_executor(None, _process_crest, data, original_path, thumbnail_path)
+            self.thumbnails.put(crest_hash, thumbnail)
+            logger.info(f"Stored new crest {crest_hash[:12]}")
+
+        return crest_hash
+
+    async def thumbnail(self, crest_hash):
+        """Thumbnail PNG bytes for a crest, or None if it is missing"""
+        if not crest_hash:
+            return None
+
+        data = self.thumbnails.get(crest_hash)
+        if data is not None:
+            return data
+
+        _, thumbnail_path = self._paths(crest_hash)
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(None, _read_file, thumbnail_path)
+        except FileNotFoundError:
+            logger.warning(f"Crest {crest_hash[:12]} is missing from disk")
+            return None
+        self.thumbnails.put(crest_hash, data)
+        return data
+
+    async def strip(self, crest_hashes):
+        """PNG with several crests side by side, or None if none exist"""
+        key = tuple(h for h in crest_hashes if h)
+        if not key:
+            return None
+
+        data = self.strips.get(key)
+        if data is not None:
+            return data
+
+        thumbnails = [t for t in await asyncio.gather(*(self.thumbnail(h) for h in key)) if t]
+        if not thumbnails:
+            return None
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, _compose_strip, thumbnails)
+        self.strips.put(key, data)
+        return data
+
+    async def file(self, crest_hash, filename="crest.png"):
+        """Discord file for a crest thumbnail, or None"""
+        data = await self.thumbnail(crest_hash)
+        return discord.File(io.BytesIO(data), filename=filename) if data else None
+
+    async def strip_file(self, crest_hashes, filename="crests.png"):
+        """Discord file for a strip of crests, or None"""
+        data = await self.strip(crest_hashes)
+        return discord.File(io.BytesIO(data), filename=filename) if data else None
+
+    async def close(self):
+        """Close the HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
@@ -3,18 +3,47 @@ import logging
 from datetime import datetime, timedelta
 import json
 import os
+import time
+from models import Club, Player, Match, Transfer, PlayerBatch
+from perf import TimedConnection
+from query_trace import TracedConnection, tracer
 
 logger = logging.getLogger(__name__)
 
 class Database:
-    def __init__(self, db_path="football_bot.db"):
-        self.db_path = db_path
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.getenv('DATABASE_PATH', 'football_bot.db')
         
     def get_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        # Several bot processes can share the file; wait for locks instead of failing
+        factory = TracedConnection if tracer.active else TimedConnection
+        conn = sqlite3.connect(self.db_path, timeout=30, factory=factory)
         conn.row_factory = sqlite3.Row
         return conn
+
+    def ping(self):
+        """Run a trivial query and return its round-trip time in seconds"""
+        start = time.perf_counter()
+        with self.get_connection() as conn:
+            conn.execute('SELECT 1').fetchone()
+        return time.perf_counter() - start
+
+    def _fetch_all(self, record_cls, query, params=()):
+        """Run a query and return typed records"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            return record_cls.from_cursor(cursor)
+
+    def _fetch_one(self, record_cls, query, params=()):
+        """Run a query and return a single typed record or None"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            return record_cls.one_from_cursor(cursor)
     
     def initialize(self):
         """Initialize database tables"""
@@ -22,6 +51,9 @@ class Database:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
+                # WAL lets readers in other processes run alongside a writer
+                cursor.execute('PRAGMA journal_mode=WAL')
+                
                 # Clubs table with Discord role integration
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS clubs (
@@ -100,6 +132,43 @@ class Database:
                     )
                 ''')
                 
+                # Live leaderboard messages edited in place by the bot
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS live_boards (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        guild_id INTEGER NOT NULL,
+                        board TEXT NOT NULL,
+                        channel_id INTEGER NOT NULL,
+                        message_id INTEGER NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE (guild_id, board)
+                    )
+                ''')
+                
+                # Leases for leader election between bot instances
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS leases (
+                        name TEXT PRIMARY KEY,
+                        holder TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                ''')
+                
+                # Small key/value store for bot bookkeeping (e.g. command sync fingerprints)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Columns added after the first release
+                cursor.execute('PRAGMA table_info(clubs)')
+                club_columns = {row['name'] for row in cursor.fetchall()}
+                if 'crest_hash' not in club_columns:
+                    cursor.execute('ALTER TABLE clubs ADD COLUMN crest_hash TEXT')
+                
                 conn.commit()
                 logger.info("Database tables initialized")
                 
@@ -120,38 +189,64 @@ class Database:
 
     def get_club_by_name(self, name, guild_id):
         """Get club by name"""
+        return self._fetch_one(
+            Club,
+            'SELECT * FROM clubs WHERE name = ? AND guild_id = ?',
+            (name, guild_id)
+        )
+
+    def get_club_by_id(self, club_id):
+        """Get club by ID"""
+        return self._fetch_one(Club, 'SELECT * FROM clubs WHERE id = ?', (club_id,))
+
+    def get_all_clubs(self, guild_id):
+        """Get all clubs in a guild"""
+        return self._fetch_all(
+            Club,
+            'SELECT * FROM clubs WHERE guild_id = ? ORDER BY name',
+            (guild_id,)
+        )
+
+    def update_club_budget(self, club_id, budget):
+        """Update club budget"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'SELECT * FROM clubs WHERE name = ? AND guild_id = ?',
-                (name, guild_id)
+                'UPDATE clubs SET budget = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (budget, club_id)
             )
-            return cursor.fetchone()
+            return cursor.rowcount > 0
 
-    def get_all_clubs(self, guild_id):
-        """Get all clubs in a guild"""
+    def set_club_crest(self, club_id, crest_hash):
+        """Point a club at a stored crest"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'SELECT * FROM clubs WHERE guild_id = ? ORDER BY name',
-                (guild_id,)
+                'UPDATE clubs SET crest_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (crest_hash, club_id)
             )
-            return cursor.fetchall()
+            return cursor.rowcount > 0
 
-    def update_club_budget(self, club_id, budget):
-        """Update club budget"""
+    def set_all_club_budgets(self, guild_id, budget):
+        """Set every club in a guild to the same budget in one statement; returns the number updated"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'UPDATE clubs SET budget = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
-                (budget, club_id)
+                'UPDATE clubs SET budget = ?, updated_at = CURRENT_TIMESTAMP WHERE guild_id = ?',
+                (budget, guild_id)
             )
-            return cursor.rowcount > 0
+            return cursor.rowcount
 
     def delete_club(self, club_id):
-        """Delete a club"""
+        """Delete a club, releasing its players as free agents"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Foreign keys aren't enforced, so ON DELETE SET NULL has to be done by hand
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(
+                'UPDATE players SET club_id = NULL, updated_at = CURRENT_TIMESTAMP WHERE club_id = ?',
+                (club_id,)
+            )
             cursor.execute('DELETE FROM clubs WHERE id = ?', (club_id,))
             return cursor.rowcount > 0
 
@@ -169,33 +264,30 @@ class Database:
 
     def get_player_by_name(self, name, guild_id):
         """Get player by name"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                'SELECT * FROM players WHERE name = ? AND guild_id = ?',
-                (name, guild_id)
-            )
-            return cursor.fetchone()
+        return self._fetch_one(
+            Player,
+            'SELECT * FROM players WHERE name = ? AND guild_id = ?',
+            (name, guild_id)
+        )
 
     def get_players_by_club(self, club_id):
         """Get all players in a club"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                'SELECT * FROM players WHERE club_id = ? ORDER BY value DESC',
-                (club_id,)
-            )
-            return cursor.fetchall()
+        return self._fetch_all(
+            Player,
+            'SELECT * FROM players WHERE club_id = ? ORDER BY value DESC',
+            (club_id,)
+        )
 
     def get_all_players(self, guild_id):
-        """Get all players in a guild"""
+        """Get all players in a guild as a columnar batch"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             cursor.execute(
-                'SELECT * FROM players WHERE guild_id = ? ORDER BY value DESC',
+                f'SELECT {", ".join(PlayerBatch.COLUMNS)} FROM players WHERE guild_id = ? ORDER BY value DESC',
                 (guild_id,)
             )
-            return cursor.fetchall()
+            return PlayerBatch.from_cursor(cursor, guild_id)
 
     def update_player_value(self, player_id, value):
         """Update player value"""
@@ -208,14 +300,40 @@ class Database:
             return cursor.rowcount > 0
 
     def transfer_player(self, player_id, to_club_id, transfer_fee, guild_id):
-        """Transfer a player to another club"""
+        """Transfer a player to another club
+
+        Returns False without changing anything if the player isn't in the
+        guild or the destination club can't afford the fee.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Take the write lock before reading, so concurrent transfers of the same player
+            # (or from other processes) can't both act on the same current club
+            cursor.execute('BEGIN IMMEDIATE')
             
             # Get current club
-            cursor.execute('SELECT club_id FROM players WHERE id = ?', (player_id,))
+            cursor.execute('SELECT club_id FROM players WHERE id = ? AND guild_id = ?', (player_id, guild_id))
             result = cursor.fetchone()
-            from_club_id = result['club_id'] if result else None
+            if result is None:
+                conn.rollback()
+                return False
+            from_club_id = result['club_id']
+            
+            # Charge the buyer only if it can still afford the fee
+            if to_club_id:
+                cursor.execute(
+                    'UPDATE clubs SET budget = budget - ? WHERE id = ? AND guild_id = ? AND budget >= ?',
+                    (transfer_fee, to_club_id, guild_id, transfer_fee)
+                )
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return False
+            
+            if from_club_id:
+                cursor.execute(
+                    'UPDATE clubs SET budget = budget + ? WHERE id = ?',
+                    (transfer_fee, from_club_id)
+                )
             
             # Update player club
             cursor.execute(
@@ -230,19 +348,6 @@ class Database:
                 (player_id, from_club_id, to_club_id, transfer_fee, guild_id)
             )
             
-            # Update club budgets
-            if from_club_id:
-                cursor.execute(
-                    'UPDATE clubs SET budget = budget + ? WHERE id = ?',
-                    (transfer_fee, from_club_id)
-                )
-            
-            if to_club_id:
-                cursor.execute(
-                    'UPDATE clubs SET budget = budget - ? WHERE id = ?',
-                    (transfer_fee, to_club_id)
-                )
-            
             return True
 
     def delete_player(self, player_id):
@@ -264,10 +369,11 @@ class Database:
             )
             return cursor.lastrowid
 
-    def get_upcoming_matches(self, guild_id=None, minutes=5):
-        """Get matches that need reminders"""
+    def get_upcoming_matches(self, guild_id=None, minutes=5, shard_ids=None, shard_count=None):
+        """Get matches that need reminders, optionally only for guilds on the given shards"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             reminder_time = datetime.now() + timedelta(minutes=minutes)
             
             if guild_id:
@@ -276,6 +382,15 @@ class Database:
                        WHERE guild_id = ? AND match_date <= ? AND match_date > datetime('now') AND reminded = FALSE''',
                     (guild_id, reminder_time.strftime('%Y-%m-%d %H:%M:%S'))
                 )
+            elif shard_ids is not None:
+                # Discord routes a guild to shard (guild_id >> 22) % shard_count
+                placeholders = ', '.join('?' for _ in shard_ids)
+                cursor.execute(
+                    f'''SELECT * FROM matches 
+                       WHERE match_date <= ? AND match_date > datetime('now') AND reminded = FALSE
+                       AND ((guild_id >> 22) % ?) IN ({placeholders})''',
+                    (reminder_time.strftime('%Y-%m-%d %H:%M:%S'), shard_count, *shard_ids)
+                )
             else:
                 cursor.execute(
                     '''SELECT * FROM matches 
@@ -283,55 +398,64 @@ class Database:
                     (reminder_time.strftime('%Y-%m-%d %H:%M:%S'),)
                 )
             
-            matches = cursor.fetchall()
+            matches = Match.from_cursor(cursor)
             
             # Mark as reminded
             for match in matches:
                 cursor.execute(
                     'UPDATE matches SET reminded = TRUE WHERE id = ?',
-                    (match['id'],)
+                    (match.id,)
                 )
             
             return matches
 
     def get_matches(self, guild_id):
         """Get all matches for a guild"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT m.*, c1.name as team1_name, c2.name as team2_name 
-                   FROM matches m
-                   JOIN clubs c1 ON m.team1_id = c1.id
-                   JOIN clubs c2 ON m.team2_id = c2.id
-                   WHERE m.guild_id = ?
-                   ORDER BY m.match_date DESC''',
-                (guild_id,)
-            )
-            return cursor.fetchall()
+        return self._fetch_all(
+            Match,
+            '''SELECT m.*, c1.name as team1_name, c2.name as team2_name 
+               FROM matches m
+               JOIN clubs c1 ON m.team1_id = c1.id
+               JOIN clubs c2 ON m.team2_id = c2.id
+               WHERE m.guild_id = ?
+               ORDER BY m.match_date DESC''',
+            (guild_id,)
+        )
+
+    def get_recent_transfers(self, guild_id, limit=10):
+        """Get recent transfers with player and club names"""
+        return self._fetch_all(
+            Transfer,
+            '''SELECT t.*, p.name as player_name, 
+                      cf.name as from_club, ct.name as to_club
+               FROM transfers t
+               JOIN players p ON t.player_id = p.id
+               LEFT JOIN clubs cf ON t.from_club_id = cf.id
+               LEFT JOIN clubs ct ON t.to_club_id = ct.id
+               WHERE t.guild_id = ?
+               ORDER BY t.transfer_date DESC LIMIT ?''',
+            (guild_id, limit)
+        )
 
     # Statistics methods
     def get_top_players_by_value(self, guild_id, limit=10):
         """Get top players by value"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                '''SELECT p.*, c.name as club_name FROM players p
-                   LEFT JOIN clubs c ON p.club_id = c.id
-                   WHERE p.guild_id = ?
-                   ORDER BY p.value DESC LIMIT ?''',
-                (guild_id, limit)
-            )
-            return cursor.fetchall()
+        return self._fetch_all(
+            Player,
+            '''SELECT p.*, c.name as club_name FROM players p
+               LEFT JOIN clubs c ON p.club_id = c.id
+               WHERE p.guild_id = ?
+               ORDER BY p.value DESC LIMIT ?''',
+            (guild_id, limit)
+        )
 
     def get_richest_clubs(self, guild_id, limit=10):
         """Get richest clubs"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                'SELECT * FROM clubs WHERE guild_id = ? ORDER BY budget DESC LIMIT ?',
-                (guild_id, limit)
-            )
-            return cursor.fetchall()
+        return self._fetch_all(
+            Club,
+            'SELECT * FROM clubs WHERE guild_id = ? ORDER BY budget DESC LIMIT ?',
+            (guild_id, limit)
+        )
 
     def get_club_stats(self, club_id):
         """Get comprehensive club statistics"""
@@ -339,8 +463,7 @@ class Database:
             cursor = conn.cursor()
             
             # Basic club info
-            cursor.execute('SELECT * FROM clubs WHERE id = ?', (club_id,))
-            club = cursor.fetchone()
+            club = self.get_club_by_id(club_id)
             
             if not club:
                 return None
@@ -366,13 +489,195 @@ class Database:
             transfers_out = cursor.fetchone()['transfers_out']
             
             return {
-                'club': dict(club),
+                'club': club,
                 'player_count': stats['player_count'],
                 'total_value': stats['total_value'],
                 'transfers_in': transfers_in,
                 'transfers_out': transfers_out
             }
 
+    def get_club_rankings(self, guild_id):
+        """Rank clubs by total value (budget + squad value) in a single query"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT c.name, c.budget, c.role_id,
+                          COALESCE(SUM(p.value), 0) as squad_value,
+                          COUNT(p.id) as players
+                   FROM clubs c
+                   LEFT JOIN players p ON p.club_id = c.id
+                   WHERE c.guild_id = ?
+                   GROUP BY c.id
+                   ORDER BY c.budget + COALESCE(SUM(p.value), 0) DESC, c.name''',
+                (guild_id,)
+            )
+            return [
+                {
+                    'name': row['name'],
+                    'budget': row['budget'],
+                    'squad_value': row['squad_value'],
+                    'total_value': row['budget'] + row['squad_value'],
+                    'players': row['players'],
+                    'role_id': row['role_id']
+                }
+                for row in cursor.fetchall()
+            ]
+
+    def get_position_counts(self, guild_id, limit=3):
+        """Most common player positions with their counts"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT position, COUNT(*) as count FROM players
+                   WHERE guild_id = ? GROUP BY position ORDER BY count DESC LIMIT ?''',
+                (guild_id, limit)
+            )
+            return cursor.fetchall()
+
+    def search_players(self, guild_id, position=None, min_value=None, max_value=None, club=None, limit=15):
+        """Players matching optional position, value range and club name filters, most valuable first"""
+        query = '''SELECT p.*, c.name as club_name FROM players p
+                   LEFT JOIN clubs c ON p.club_id = c.id
+                   WHERE p.guild_id = ?'''
+        params = [guild_id]
+
+        if position:
+            query += ' AND p.position LIKE ?'
+            params.append(f'%{position}%')
+
+        if min_value is not None:
+            query += ' AND p.value >= ?'
+            params.append(min_value)
+
+        if max_value is not None:
+            query += ' AND p.value <= ?'
+            params.append(max_value)
+
+        if club:
+            query += ' AND c.name LIKE ?'
+            params.append(f'%{club}%')
+
+        query += ' ORDER BY p.value DESC LIMIT ?'
+        params.append(limit)
+        return self._fetch_all(Player, query, params)
+
+    def get_age_stats(self, guild_id):
+        """Age summary and age-group distribution of a guild's players; returns (stats, age_groups)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                '''SELECT AVG(age) as avg_age, MIN(age) as min_age, MAX(age) as max_age,
+                          COUNT(*) as total_players FROM players WHERE guild_id = ?''',
+                (guild_id,)
+            )
+            stats = cursor.fetchone()
+
+            cursor.execute(
+                '''SELECT
+                   CASE
+                       WHEN age < 20 THEN 'Under 20'
+                       WHEN age < 25 THEN '20-24'
+                       WHEN age < 30 THEN '25-29'
+                       WHEN age < 35 THEN '30-34'
+                       ELSE '35+'
+                   END as age_group,
+                   COUNT(*) as count
+                   FROM players WHERE guild_id = ?
+                   GROUP BY age_group ORDER BY
+                   CASE
+                       WHEN age < 20 THEN 1
+                       WHEN age < 25 THEN 2
+                       WHEN age < 30 THEN 3
+                       WHEN age < 35 THEN 4
+                       ELSE 5
+                   END''',
+                (guild_id,)
+            )
+            return stats, cursor.fetchall()
+
+    # Live board methods
+    def set_live_board(self, guild_id, board, channel_id, message_id):
+        """Register (or replace) the live message for a board"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''INSERT INTO live_boards (guild_id, board, channel_id, message_id) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (guild_id, board) DO UPDATE SET
+                       channel_id = excluded.channel_id, message_id = excluded.message_id''',
+                (guild_id, board, channel_id, message_id)
+            )
+            return True
+
+    def delete_live_board(self, guild_id, board):
+        """Unregister the live message for a board"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM live_boards WHERE guild_id = ? AND board = ?', (guild_id, board))
+            return cursor.rowcount > 0
+
+    def get_all_live_boards(self):
+        """Get every registered live board"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT guild_id, board, channel_id, message_id FROM live_boards')
+            return cursor.fetchall()
+
+    # Lease methods
+    def acquire_lease(self, name, holder, ttl):
+        """Take or renew a lease; returns True if holder now owns it"""
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT (name) DO UPDATE SET
+                       holder = excluded.holder, expires_at = excluded.expires_at
+                   WHERE leases.holder = excluded.holder OR leases.expires_at < ?''',
+                (name, holder, now + ttl, now)
+            )
+            return cursor.rowcount > 0
+
+    def release_lease(self, name, holder):
+        """Give up a lease so a standby can take over immediately"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM leases WHERE name = ? AND holder = ?', (name, holder))
+            return cursor.rowcount > 0
+
+    def get_lease(self, name):
+        """Get the current holder and expiry of a lease"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT name, holder, expires_at FROM leases WHERE name = ?', (name,))
+            return cursor.fetchone()
+
+    # Meta methods
+    def get_meta(self, key):
+        """Get a bookkeeping value, or None if it isn't set"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM meta WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, key, value):
+        """Set a bookkeeping value"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''INSERT INTO meta (key, value) VALUES (?, ?)
+                   ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP''',
+                (key, value)
+            )
+
+    def delete_meta(self, key):
+        """Remove a bookkeeping value"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM meta WHERE key = ?', (key,))
+            return cursor.rowcount > 0
+
     # Utility methods
     def reset_all_data(self, guild_id):
         """Reset all data for a guild"""
@@ -383,6 +688,7 @@ class Database:
             cursor.execute('DELETE FROM players WHERE guild_id = ?', (guild_id,))
             cursor.execute('DELETE FROM clubs WHERE guild_id = ?', (guild_id,))
             cursor.execute('DELETE FROM settings WHERE guild_id = ?', (guild_id,))
+            cursor.execute('DELETE FROM live_boards WHERE guild_id = ?', (guild_id,))
             return True
 
     def backup_data(self, guild_id):
@@ -399,20 +705,11 @@ class Database:
                 'matches': []
             }
             
-            # Backup clubs
-            cursor.execute('SELECT * FROM clubs WHERE guild_id = ?', (guild_id,))
-            backup['clubs'] = [dict(row) for row in cursor.fetchall()]
-            
-            # Backup players
-            cursor.execute('SELECT * FROM players WHERE guild_id = ?', (guild_id,))
-            backup['players'] = [dict(row) for row in cursor.fetchall()]
-            
-            # Backup transfers
-            cursor.execute('SELECT * FROM transfers WHERE guild_id = ?', (guild_id,))
-            backup['transfers'] = [dict(row) for row in cursor.fetchall()]
-            
-            # Backup matches
-            cursor.execute('SELECT * FROM matches WHERE guild_id = ?', (guild_id,))
-            backup['matches'] = [dict(row) for row in cursor.fetchall()]
+            # Rows go straight from tuples to dicts, skipping sqlite3.Row
+            cursor.row_factory = None
+            for table in ('clubs', 'players', 'transfers', 'matches'):
+                cursor.execute(f'SELECT * FROM {table} WHERE guild_id = ?', (guild_id,))
+                columns = [column[0] for column in cursor.description]
+                backup[table] = [dict(zip(columns, row)) for row in cursor]
             
             return backup
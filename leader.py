@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class LeaderElector:
+    """Lease-based leader election stored in the bot database
+
+    Only the lease holder should run background work such as match
+    reminders. The holder renews its lease every `ttl / 3` seconds; if it
+    dies, a standby takes over once the lease expires, or immediately if
+    the leader shut down cleanly and released it.
+    """
+
+    def __init__(self, db, name='background-tasks', ttl=None):
+        self.db = db
+        self.name = name
+        self.ttl = ttl or float(os.getenv('LEADER_LEASE_TTL', 15))
+        self.interval = min(self.ttl / 3, 2)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_deadline = 0.0  # Monotonic time our current lease runs out
+        self.became_leader_at = None
+        self.task = None
+
+    @property
+    def is_leader(self):
+        """True while we hold an unexpired lease"""
+        return time.monotonic() < self.lease_deadline
+
+    def start(self):
+        """Start campaigning in the background"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run(), name=f"leader-election:{self.name}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            was_leader = self.is_leader
+            attempt_started = time.monotonic()
+            try:
+                acquired = await loop.run_in_executor(None, self.db.acquire_lease, self.name, self.holder, self.ttl)
+            except Exception as e:
+                # Keep the current deadline: we stay leader only until the lease we already hold expires
+                logger.error(f"Lease renewal error: {e}")
+                acquired = False
+            else:
+                # Measure from before the write so we never outlive the lease other instances see
+                self.lease_deadline = attempt_started + self.ttl if acquired else 0.0
+
+            if acquired and not was_leader:
+                self.became_leader_at = time.time()
+                logger.warning(f"Became leader for {self.name} ({self.holder})")
+            elif was_leader and not self.is_leader:
+                self.became_leader_at = None
+                logger.warning(f"Lost leadership for {self.name}")
+
+            await asyncio.sleep(self.interval)
+
+    def status(self):
+        """Leader election state for the health endpoint"""
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'is_leader': self.is_leader,
+            'leader_since': self.became_leader_at,
+        }
+
+    async def stop(self):
+        """Stop campaigning and release the lease if we hold it"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        if self.is_leader:
+            self.lease_deadline = 0.0
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.db.release_lease, self.name, self.holder)
+            except Exception as e:
+                logger.error(f"Lease release error: {e}")
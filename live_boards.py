@@ -0,0 +1,127 @@
+import discord
+import asyncio
+import logging
+import time
+from utils import create_embed
+
+logger = logging.getLogger(__name__)
+
+class LiveBoardManager:
+    """Keeps registered leaderboard messages up to date with debounced edits"""
+
+    BOARDS = ('top_players', 'club_rankings')
+    TITLES = {'top_players': "⭐ Top Players by Value", 'club_rankings': "🏆 Club Rankings"}
+    FOOTER = "🔴 Live board • updates automatically"
+
+    def __init__(self, bot, interval=30, settle_delay=2):
+        self.bot = bot
+        self.db = bot.db
+        self.interval = interval  # Minimum seconds between edits of one board
+        self.settle_delay = settle_delay  # Wait for a burst of changes to finish
+        self.boards = {}  # guild_id -> {board: (channel_id, message_id)}
+        self.pending = {}  # (guild_id, board) -> scheduled edit task
+        self.last_edit = {}  # (guild_id, board) -> monotonic time of last edit
+        self.edits = 0
+        self.coalesced = 0
+
+    def load(self):
+        """Load board registrations from the database"""
+        self.boards.clear()
+        for row in self.db.get_all_live_boards():
+            self.boards.setdefault(row['guild_id'], {})[row['board']] = (row['channel_id'], row['message_id'])
+        logger.info(f"Loaded {sum(len(b) for b in self.boards.values())} live boards")
+
+    def register(self, guild_id, board, channel_id, message_id):
+        """Register a message as the live view of a board"""
+        self.db.set_live_board(guild_id, board, channel_id, message_id)
+        self.boards.setdefault(guild_id, {})[board] = (channel_id, message_id)
+
+    def unregister(self, guild_id, board):
+        """Stop updating a board"""
+        self.boards.get(guild_id, {}).pop(board, None)
+        task = self.pending.pop((guild_id, board), None)
+        if task:
+            task.cancel()
+        return self.db.delete_live_board(guild_id, board)
+
+    def mark_dirty(self, guild_id):
+        """Schedule an edit for every board in a guild after its data changed"""
+        for board in self.boards.get(guild_id, ()):
+            key = (guild_id, board)
+            if key in self.pending:
+                # An edit is already scheduled and will pick up this change
+                self.coalesced += 1
+                continue
+
+            since_last = time.monotonic() - self.last_edit.get(key, 0)
+            delay = max(self.settle_delay, self.interval - since_last)
+            self.pending[key] = asyncio.create_task(self._edit_later(key, delay))
+
+    def render(self, guild, board):
+        """Build the embed for a board"""
+        stats = self.bot.stats_commands
+        if board == 'top_players':
+            embed = stats.build_top_players_embed(guild, 25)
+        else:
+            embed = stats.build_club_rankings_embed(guild)
+
+        if not embed:
+            # Say so explicitly; skipping the edit would leave the old standings up
+            return create_embed(self.TITLES[board], "No data yet. This board will update automatically.", footer=self.FOOTER)
+        embed.set_footer(text=self.FOOTER)
+        return embed
+
+    async def clear_guild(self, guild):
+        """Forget a guild's boards after a reset, leaving each message showing that the data is gone"""
+        boards = self.boards.pop(guild.id, {})
+        for board, (channel_id, message_id) in boards.items():
+            task = self.pending.pop((guild.id, board), None)
+            if task:
+                task.cancel()
+            self.last_edit.pop((guild.id, board), None)
+
+            channel = guild.get_channel(channel_id)
+            if not channel:
+                continue
+            embed = create_embed(self.TITLES[board], "League data was reset. This board is no longer updated.")
+            try:
+                await self.bot.rate_limiter.execute(channel.get_partial_message(message_id).edit, embed=embed)
+                self.edits += 1
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to clear live board {board}: {e}")
+
+    async def _edit_later(self, key, delay):
+        """Wait out the debounce window, then edit the board message"""
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.pending.pop(key, None)
+
+        guild_id, board = key
+        target = self.boards.get(guild_id, {}).get(board)
+        guild = self.bot.get_guild(guild_id)
+        if not target or not guild:
+            return
+
+        channel_id, message_id = target
+        channel = guild.get_channel(channel_id)
+        if not channel:
+            return
+
+        self.last_edit[key] = time.monotonic()
+        try:
+            embed = self.render(guild, board)
+            message = channel.get_partial_message(message_id)
+            await self.bot.rate_limiter.execute(message.edit, embed=embed)
+            self.edits += 1
+        except discord.NotFound:
+            logger.warning(f"Live board message {message_id} was deleted, unregistering {board}")
+            self.unregister(guild_id, board)
+        except Exception as e:
+            logger.error(f"Failed to update live board {board}: {e}")
+
+    def close(self):
+        """Cancel scheduled edits"""
+        for task in self.pending.values():
+            task.cancel()
+        self.pending.clear()
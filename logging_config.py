@@ -0,0 +1,183 @@
+import os
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import contextvars
+import multiprocessing
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# Per-interaction context, set by the command tree and attached to every record logged while handling it
+guild_id_var = contextvars.ContextVar('guild_id', default=None)
+command_var = contextvars.ContextVar('command', default=None)
+started_var = contextvars.ContextVar('interaction_started', default=None)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def bind_interaction(interaction):
+    """Attach an interaction's guild and command to logs from the current task"""
+    guild_id_var.set(interaction.guild_id)
+    command_var.set(interaction.command.qualified_name if interaction.command else None)
+    started_var.set(time.perf_counter())
+
+class ContextFilter(logging.Filter):
+    """Copies the interaction context onto records; runs in the thread that logs"""
+
+    def filter(self, record):
+        record.guild_id = guild_id_var.get()
+        record.command = command_var.get()
+        started = started_var.get()
+        record.latency_ms = round((time.perf_counter() - started) * 1000, 1) if started is not None else None
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Rate-limits repeated warnings and errors from the same call site
+
+    Each call site may log `burst` records per `window` seconds; the rest are
+    dropped and counted, and the next record let through reports how many
+    were suppressed.
+    """
+
+    def __init__(self, burst=5, window=60, level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.level = level
+        self.sites = {}  # (logger, level, path, line) -> [window_start, count, suppressed]
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+
+        key = (record.name, record.levelno, record.pathname, record.lineno)
+        now = time.monotonic()
+        site = self.sites.get(key)
+        if site is None or now - site[0] >= self.window:
+            suppressed = site[2] if site else 0
+            self.sites[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+
+        if site[1] < self.burst:
+            site[1] += 1
+            return True
+        site[2] += 1
+        return False
+
+class ContextQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message"""
+
+    def prepare(self, record):
+        # Render everything that can't cross to the listener thread, but leave formatting to its handlers
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the interaction context fields"""
+
+    FIELDS = ('guild_id', 'command', 'latency_ms', 'suppressed')
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.processName,
+            'message': record.getMessage(),
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Rotates on a schedule and also whenever the file grows past max_bytes"""
+
+    def __init__(self, filename, max_bytes=0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            self.stream.seek(0, 2)
+            return self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes
+        return False
+
+def process_file(path):
+    """`path` for this process; child processes get their own file so rotation never races"""
+    if path and multiprocessing.parent_process() is not None:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.{multiprocessing.current_process().name}{ext}"
+    return path
+
+def _log_file():
+    return process_file(os.getenv('LOG_FILE', 'bot.log'))
+
+def setup_logging():
+    """Route all logging through a queue to a background writer thread
+
+    Handlers that touch the disk or console run on the listener thread, so a
+    stalled volume never blocks the event loop. Returns the listener.
+    """
+    level = getattr(logging, os.getenv('LOG_LEVEL', 'WARNING').upper(), logging.WARNING)
+
+    console = logging.StreamHandler()
+    console.setFormatter(JsonFormatter() if os.getenv('LOG_FORMAT') == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    log_file = SizedTimedRotatingFileHandler(
+        _log_file(),
+        max_bytes=int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024)),
+        when=os.getenv('LOG_ROTATE_WHEN', 'midnight'),
+        backupCount=int(os.getenv('LOG_BACKUP_COUNT', 5)),
+        encoding='utf-8',
+        delay=True,
+    )
+    log_file.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(
+        burst=int(os.getenv('LOG_SAMPLE_BURST', 5)),
+        window=float(os.getenv('LOG_SAMPLE_WINDOW', 60)),
+    ))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, console, log_file, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+def pipeline_stats():
+    """Records waiting for the listener thread and call sites tracked by sampling"""
+    queued = 0
+    sites = 0
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueHandler):
+            queued += handler.queue.qsize()
+        for log_filter in handler.filters:
+            if isinstance(log_filter, SamplingFilter):
+                sites += len(log_filter.sites)
+    return {'queued_records': queued, 'sampled_sites': sites}
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class LoopMonitor:
+    """Measures event-loop scheduling lag and reports what blocked the loop
+
+    A heartbeat coroutine sleeps for `interval` and records how late it woke
+    up. A watchdog thread notices when the heartbeat stops beating for longer
+    than `threshold`, captures the loop thread's stack and the running task's
+    name while the stall is still happening, and logs it once the loop
+    recovers.
+    """
+
+    def __init__(self, interval=0.25, threshold=None, history=2400):
+        self.interval = interval
+        self.threshold = threshold or float(os.getenv('LOOP_LAG_THRESHOLD_MS', 250)) / 1000
+        self.lags = deque(maxlen=history)  # Recent lag samples in seconds (10 minutes at the default interval)
+        self.stalls = deque(maxlen=20)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self.last_beat = None
+        self.loop = None
+        self.loop_thread_id = None
+        self.task = None
+        self.watchdog = None
+        self.stopping = threading.Event()
+        self.pending_stall = None  # Captured while the loop is blocked, logged when it recovers
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        if self.task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self.stopping.clear()
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self.last_beat = now
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            stall = self.pending_stall
+            if stall is not None:
+                self.pending_stall = None
+                stall['duration_ms'] = round(lag * 1000, 1)
+                self.stalls.append(stall)
+                logger.warning(
+                    f"Event loop blocked for {lag * 1000:.0f}ms in task {stall['task']!r}\n{stall['stack']}"
+                )
+
+    def _watch(self):
+        """Watchdog thread: catch the loop while it is stuck"""
+        while not self.stopping.wait(self.threshold / 2):
+            blocked_for = time.monotonic() - self.last_beat - self.interval
+            if blocked_for < self.threshold or self.pending_stall is not None:
+                continue
+            self.stall_count += 1
+            self.pending_stall = {
+                'at': time.time(),
+                'task': self._current_task_name(),
+                'stack': self._loop_stack(),
+            }
+
+    def _current_task_name(self):
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        return task.get_name() if task else '(callback)'
+
+    def _loop_stack(self):
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return ''
+        return ''.join(traceback.format_stack(frame, limit=15))
+
+    def stats(self):
+        """Lag percentiles over recent samples and the latest stalls"""
+        samples = sorted(self.lags)
+
+        def percentile(p):
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+        return {
+            'samples': len(samples),
+            'p50_ms': percentile(50),
+            'p90_ms': percentile(90),
+            'p99_ms': percentile(99),
+            'max_ms': round(self.max_lag * 1000, 2),
+            'threshold_ms': round(self.threshold * 1000),
+            'stalls': self.stall_count,
+            'recent_stalls': [
+                {'at': stall['at'], 'task': stall['task'], 'duration_ms': stall.get('duration_ms'),
+                 'stack': stall['stack'].strip().splitlines()[-4:]}
+                for stall in list(self.stalls)[-5:]
+            ],
+        }
+
+    def stop(self):
+        self.stopping.set()
+        if self.task:
+            self.task.cancel()
+            self.task = None
@@ -1,67 +1,64 @@
+from startup import timeline
 import os
 import asyncio
 import logging
-import threading
-from bot_manager import bot_manager
-from web_server import create_app
-
-# Configure logging with rate limiting protection
-logging.basicConfig(
-    level=logging.WARNING,  # Reduced to WARNING to avoid spam
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('bot.log')
-    ]
-)
+import importlib
+from logging_config import setup_logging
 
 logger = logging.getLogger(__name__)
 
-# Start bot in background when app starts
-bot_started = False
-bot_thread = None
-
-def start_bot_background():
-    """Start bot in background thread"""
-    global bot_started, bot_thread
-    if not bot_started:
-        bot_started = True
-        bot_thread = threading.Thread(target=run_bot_sync, daemon=True)
-        bot_thread.start()
-        logger.info("Bot started in background thread")
-
-# Bot management is now handled by bot_manager.py
-
-def run_bot_sync():
-    """Synchronous wrapper for bot manager"""
-    asyncio.run(bot_manager.start_bot())
+async def run():
+    """Run the web server and the bot on one event loop"""
+    # Answer health checks while discord.py and the command modules are still importing
+    from web_server import create_app, start_web_server
+    manager = None
 
-# Create Flask app for gunicorn
-app = create_app()
+    async def status_source():
+        if manager is None:
+            return {'status': 'starting', 'startup': timeline.as_dict()}
+        return await manager.get_status()
 
-# Start bot when app is created
-start_bot_background()
+    async def metrics_source():
+        from metrics import registry
+        return registry.collect()
 
-def run_web_server():
-    """Run the Flask web server in a separate thread"""
+    with timeline.phase('web_server'):
+        runner = await start_web_server(create_app(status_source, metrics_source))
     try:
-        logger.info("Web server started on port 5000")
-        app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
-    except Exception as e:
-        logger.error(f"Web server error: {e}")
+        # Import discord.py and the command modules off the loop so the web server stays responsive
+        with timeline.phase('import_bot'):
+            await asyncio.get_running_loop().run_in_executor(None, importlib.import_module, 'bot')
+        from bot_manager import bot_manager as manager
+        await manager.start_bot()
+    finally:
+        if manager is not None:
+            await manager.stop_bot()
+        await runner.cleanup()
 
 def main():
     """Main function to start both web server and bot"""
-    # Start web server in a separate thread
-    web_thread = threading.Thread(target=run_web_server, daemon=True)
-    web_thread.start()
+    # Log through a background writer thread so disk stalls never block the event loop.
+    # Here rather than at import: spawned processes re-import this module, and card render
+    # workers must not start their own writer thread on the log file.
+    setup_logging()
+    # WEB_WORKERS > 0 splits HTTP across processes while one process keeps the gateway session
+    web_workers = int(os.getenv('WEB_WORKERS', '0'))
+    # CLUSTER_COUNT > 1 spreads SHARD_COUNT shards across that many bot processes
+    cluster_count = int(os.getenv('CLUSTER_COUNT', '0'))
+    if cluster_count > 1:
+        from supervisor import Supervisor, plan_clusters
+        shard_count = int(os.getenv('SHARD_COUNT', cluster_count))
+        Supervisor(max(web_workers, 1), plan_clusters(cluster_count, shard_count), shard_count).run()
+        return
+    if web_workers > 0:
+        from supervisor import Supervisor
+        Supervisor(web_workers).run()
+        return
     
-    # Start bot manager
     try:
-        asyncio.run(bot_manager.start_bot())
+        asyncio.run(run())
     except KeyboardInterrupt:
         logger.info("Bot shutting down...")
-        asyncio.run(bot_manager.stop_bot())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+import os
+import asyncio
+import logging
+import discord
+from utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# MEMBER_CACHE policies:
+#   all  - cache every member and chunk every guild at startup (discord.py default)
+#   lazy - cache nothing up front; chunk a guild on demand when role members are needed
+#   none - no members intent at all; role member lookups return nothing
+POLICIES = ('all', 'lazy', 'none')
+
+def member_cache_policy():
+    """Configured member cache policy, defaulting to lazy"""
+    policy = os.getenv('MEMBER_CACHE', 'lazy').lower()
+    if policy not in POLICIES:
+        logger.warning(f"Unknown MEMBER_CACHE policy {policy!r}, using 'lazy'")
+        policy = 'lazy'
+    return policy
+
+def client_options(policy):
+    """Intents and cache options to pass to the bot for a policy"""
+    intents = discord.Intents.default()
+    intents.guilds = True
+    intents.members = policy != 'none'
+
+    if policy == 'all':
+        return {'intents': intents, 'member_cache_flags': discord.MemberCacheFlags.from_intents(intents)}
+    return {
+        'intents': intents,
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+        'chunk_guilds_at_startup': False,
+    }
+
+class MemberDirectory:
+    """On-demand access to the members the bot actually needs
+
+    With the lazy policy nothing is kept in the member cache: role members
+    are fetched by chunking the guild without caching the result, and only
+    per-role member counts are remembered for display.
+    """
+
+    def __init__(self, bot, policy=None):
+        self.bot = bot
+        self.policy = policy or member_cache_policy()
+        self.role_counts = LRUCache(1024)
+        self.pending = {}  # guild_id -> in-flight chunk task
+        self.chunk_requests = 0
+        self.chunked_members = 0
+
+    async def role_members(self, guild, role_ids):
+        """Members holding each of `role_ids`, as a dict of role id -> list of members"""
+        role_ids = [role_id for role_id in role_ids if role_id]
+        if not role_ids:
+            return {}
+
+        if self.policy == 'all' or guild.chunked:
+            roles = {role_id: guild.get_role(role_id) for role_id in role_ids}
+            result = {role_id: list(role.members) if role else [] for role_id, role in roles.items()}
+        elif self.policy == 'none':
+            return {role_id: [] for role_id in role_ids}
+        else:
+            members = await self._chunk(guild)
+            result = {role_id: [] for role_id in role_ids}
+            for member in members:
+                for role_id in role_ids:
+                    if member.get_role(role_id):
+                        result[role_id].append(member)
+
+        for role_id, members in result.items():
+            self.role_counts.put(role_id, len(members))
+        return result
+
+    def role_member_count(self, role):
+        """Number of members with a role, or None if it hasn't been looked up yet"""
+        if self.policy == 'all' or role.guild.chunked:
+            return len(role.members)
+        return self.role_counts.get(role.id)
+
+    async def _chunk(self, guild):
+        """Chunk a guild without caching it; concurrent callers share one request"""
+        task = self.pending.get(guild.id)
+        if task is None:
+            self.chunk_requests += 1
+            task = asyncio.ensure_future(guild.chunk(cache=False))
+            self.pending[guild.id] = task
+            task.add_done_callback(lambda _: self.pending.pop(guild.id, None))
+        try:
+            members = await asyncio.shield(task)
+        except Exception as e:
+            logger.error(f"Member chunk failed for guild {guild.id}: {e}")
+            return []
+        self.chunked_members += len(members)
+        return members
+
+    def stats(self):
+        """Cache sizes for status and diagnostics"""
+        guilds = self.bot.guilds
+        return {
+            'policy': self.policy,
+            'cached_members': sum(len(guild.members) for guild in guilds),
+            'cached_users': len(self.bot.users),
+            'chunked_guilds': sum(1 for guild in guilds if guild.chunked),
+            'role_counts': len(self.role_counts),
+            'chunk_requests': self.chunk_requests,
+            'chunked_members': self.chunked_members,
+        }
@@ -0,0 +1,208 @@
+import os
+import gc
+import sys
+import time
+import asyncio
+import logging
+import resource
+import linecache
+import tracemalloc
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+# Allocation frames that only describe the profiler or the import system
+_NOISE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+def rss_bytes():
+    """Current and peak resident set size; falls back to getrusage's peak where /proc is missing"""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]) * 1024, int(fields['VmHWM'].split()[0]) * 1024
+    except (OSError, KeyError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+        return None, peak
+
+def cache_stats(cache):
+    """Entries, payload bytes and hit ratio of an LRUCache holding bytes"""
+    return {
+        'entries': len(cache),
+        'max_entries': cache.max_items,
+        'bytes': sum(len(value) for value in cache.items.values() if isinstance(value, (bytes, bytearray))),
+        'hit_ratio': round(cache.hit_ratio(), 3),
+    }
+
+def _mb(value):
+    return round(value / 1048576, 2) if value is not None else None
+
+def _site(statistic):
+    frame = statistic.traceback[0]
+    return f"{os.path.relpath(frame.filename) if not frame.filename.startswith('<') else frame.filename}:{frame.lineno}"
+
+class MemoryDiagnostics:
+    """On-demand memory diagnostics for a running bot
+
+    Samples RSS periodically so slow growth shows up as a trend. On request
+    it starts tracemalloc, keeps a baseline snapshot, and reports the top
+    allocation sites or what grew since the baseline. Components register
+    callables that describe their in-process structures, so caches can be
+    compared with what tracemalloc sees.
+    """
+
+    def __init__(self, interval=300, history=288, frames=None):
+        self.interval = interval
+        self.history = deque(maxlen=history)  # (unix time, rss bytes); a day at the default interval
+        self.frames = frames or int(os.getenv('MEMORY_TRACE_FRAMES', 1))
+        self.structures = {}
+        self.baseline = None
+        self.latest = None
+        self.task = None
+        if os.getenv('MEMORY_TRACE', '').lower() in ('1', 'true', 'yes'):
+            self.start_tracing()
+
+    def register(self, name, describe):
+        """Add a structure to the size report; `describe` returns a dict of counts or bytes"""
+        self.structures[name] = describe
+
+    def start_sampling(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._sample_forever(), name="memory-sampler")
+
+    async def _sample_forever(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def sample(self):
+        rss, _ = rss_bytes()
+        if rss is not None:
+            self.history.append((time.time(), rss))
+
+    def trend(self):
+        """RSS growth over the sampled window, in MB per hour"""
+        if len(self.history) < 2:
+            return None
+        (first_at, first), (last_at, last) = self.history[0], self.history[-1]
+        hours = (last_at - first_at) / 3600
+        return {
+            'window_hours': round(hours, 2),
+            'first_mb': _mb(first),
+            'last_mb': _mb(last),
+            'min_mb': _mb(min(rss for _, rss in self.history)),
+            'max_mb': _mb(max(rss for _, rss in self.history)),
+            'growth_mb_per_hour': round((last - first) / 1048576 / hours, 3) if hours else None,
+        }
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, frames=None):
+        """Start tracemalloc and take a baseline; returns False if it was already running"""
+        if tracemalloc.is_tracing():
+            if self.baseline is None:
+                self.baseline = self._take()
+            return False
+        tracemalloc.start(frames or self.frames)
+        self.baseline = self._take()
+        self.latest = None
+        logger.warning(f"tracemalloc started with {frames or self.frames} frame(s); allocations are now slower")
+        return True
+
+    def stop_tracing(self):
+        self.baseline = None
+        self.latest = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.warning("tracemalloc stopped")
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces(_NOISE)
+
+    def snapshot(self):
+        """Take a new snapshot to compare with the baseline"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        self.latest = self._take()
+        return self.latest
+
+    def reset_baseline(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        self.baseline = self._take()
+        self.latest = None
+
+    def top(self, limit=10, key_type='lineno'):
+        """Largest allocation sites in a fresh snapshot"""
+        statistics = self.snapshot().statistics(key_type)
+        return [
+            {'site': _site(statistic), 'size_kb': round(statistic.size / 1024, 1), 'count': statistic.count}
+            for statistic in statistics[:limit]
+        ]
+
+    def diff(self, limit=10, key_type='lineno'):
+        """Allocation sites that grew the most since the baseline"""
+        if self.baseline is None:
+            # tracemalloc was started elsewhere; start comparing from now
+            self.reset_baseline()
+            return []
+        statistics = self.snapshot().compare_to(self.baseline, key_type)
+        statistics.sort(key=lambda statistic: statistic.size_diff, reverse=True)
+        return [
+            {'site': _site(statistic), 'size_kb': round(statistic.size / 1024, 1),
+             'growth_kb': round(statistic.size_diff / 1024, 1), 'count_growth': statistic.count_diff}
+            for statistic in statistics[:limit]
+            if statistic.size_diff > 0
+        ]
+
+    @staticmethod
+    def object_types(limit=15):
+        """Most common live object types tracked by the garbage collector"""
+        counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+        return counts.most_common(limit)
+
+    def structure_sizes(self):
+        sizes = {}
+        for name, describe in self.structures.items():
+            try:
+                sizes[name] = describe()
+            except Exception as e:
+                sizes[name] = {'error': str(e)}
+        return sizes
+
+    def summary(self):
+        """Cheap overview for the status endpoint"""
+        rss, peak = rss_bytes()
+        result = {
+            'rss_mb': _mb(rss),
+            'peak_rss_mb': _mb(peak),
+            'trend': self.trend(),
+            'gc_counts': gc.get_count(),
+            'tracemalloc': None,
+            'structures': self.structure_sizes(),
+        }
+        if tracemalloc.is_tracing():
+            current, traced_peak = tracemalloc.get_traced_memory()
+            result['tracemalloc'] = {
+                'frames': tracemalloc.get_traceback_limit(),
+                'traced_mb': _mb(current),
+                'traced_peak_mb': _mb(traced_peak),
+                'overhead_mb': _mb(tracemalloc.get_tracemalloc_memory()),
+            }
+        return result
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+# Process-wide, like the SQL tracer; bots recreated on reconnect share it
+diagnostics = MemoryDiagnostics()
@@ -0,0 +1,276 @@
+import os
+import gc
+import time
+import math
+import bisect
+import resource
+import threading
+from memory import rss_bytes
+
+# Latency buckets in seconds shared by every histogram unless one says otherwise
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metric:
+    """A counter, gauge or histogram family
+
+    Hot paths hold on to a child (`metric.labels(...)`, or the metric
+    itself when it has no labels) and update it with a single attribute
+    add. Nothing is formatted until a scrape.
+    """
+
+    def __init__(self, name, help, kind, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            with self.lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = _Histogram(self.buckets) if self.kind == 'histogram' else _Value()
+                    self.children[values] = child
+        return child
+
+    # Shortcuts for metrics without labels
+
+    def inc(self, amount=1.0):
+        self._default.value += amount
+
+    def set(self, value):
+        self._default.value = value
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def collect(self):
+        family = Family(self.name, self.kind, self.help)
+        for values, child in list(self.children.items()):
+            labels = dict(zip(self.labelnames, values))
+            if self.kind == 'histogram':
+                family.histogram(labels, child.bounds, child.counts, child.sum, child.count)
+            else:
+                family.add(labels, child.value)
+        return family
+
+class Family:
+    """Samples of one metric as gathered at scrape time; plain data so it can cross processes as JSON"""
+
+    def __init__(self, name, kind, help):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.samples = []  # (suffix, labels, value)
+
+    def add(self, labels, value, suffix=''):
+        if self.kind == 'counter' and not suffix:
+            suffix = '_total'
+        self.samples.append((suffix, labels, value))
+        return self
+
+    def histogram(self, labels, bounds, counts, total, count):
+        """Cumulative buckets from per-bucket counts; `counts` has one extra slot for +Inf"""
+        cumulative = 0
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            self.samples.append(('_bucket', {**labels, 'le': _number(bound)}, cumulative))
+        self.samples.append(('_bucket', {**labels, 'le': '+Inf'}, count))
+        self.samples.append(('_count', labels, count))
+        self.samples.append(('_sum', labels, total))
+        return self
+
+    def as_dict(self):
+        return {'name': self.name, 'type': self.kind, 'help': self.help, 'samples': self.samples}
+
+    @classmethod
+    def from_dict(cls, data):
+        family = cls(data['name'], data['type'], data['help'])
+        family.samples = [tuple(sample) for sample in data['samples']]
+        return family
+
+def _number(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'NaN'
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return f"{value:.1f}"
+    return repr(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def render(families, openmetrics=True):
+    """Exposition text for families; the Prometheus 0.0.4 text format when `openmetrics` is False"""
+    lines = []
+    for family in families:
+        kind = family.kind
+        name = family.name
+        if not openmetrics and kind == 'counter':
+            name += '_total'  # The old text format names counter families after their samples
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {_escape(family.help)}")
+        for suffix, labels, value in family.samples:
+            label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+            lines.append(f"{family.name}{suffix}{{{label_text}}} {_number(value)}" if label_text
+                         else f"{family.name}{suffix} {_number(value)}")
+    if openmetrics:
+        lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+def merge(sources):
+    """Combine family lists from several processes, labelling each sample with its source
+
+    `sources` is a list of (labels, family dicts) pairs, e.g.
+    `({'cluster': '0'}, families)`. Families with the same name are joined.
+    """
+    merged = {}
+    for labels, families in sources:
+        for data in families:
+            family = merged.get(data['name'])
+            if family is None:
+                family = merged[data['name']] = Family(data['name'], data['type'], data['help'])
+            for suffix, sample_labels, value in data['samples']:
+                family.samples.append((suffix, {**labels, **sample_labels}, value))
+    return list(merged.values())
+
+def log_histogram(histogram, bounds=LATENCY_BUCKETS, scale=0.001):
+    """Re-bucket a perf.Histogram (log-scale buckets in ms) onto fixed bounds in seconds
+
+    Each log bucket is counted under the first bound at or above its upper
+    edge, so an observation up to ~19% below a bound can land one bucket
+    higher. Sum and count are exact.
+    """
+    counts = [0] * (len(bounds) + 1)
+    for bucket, count in histogram.buckets.items():
+        upper = 2 ** (bucket / histogram.STEPS_PER_DOUBLING) * scale
+        counts[bisect.bisect_left(bounds, upper * (1 - 1e-9))] += count
+    return counts, histogram.total * scale, histogram.count
+
+class MetricsRegistry:
+    """Metrics updated on hot paths plus collectors that read existing structures at scrape time"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = {}
+
+    def _register(self, name, help, kind, labelnames, buckets=LATENCY_BUCKETS):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = Metric(name, help, kind, labelnames, buckets)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(name, help, 'counter', labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(name, help, 'gauge', labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(name, help, 'histogram', labelnames, buckets)
+
+    def collector(self, name, collect):
+        """Register (or replace) a callable returning Family objects, called on every scrape"""
+        self.collectors[name] = collect
+
+    def collect(self):
+        """Every family as plain dicts, ready for render() or JSON"""
+        families = [metric.collect() for metric in list(self.metrics.values())]
+        for name, collect in list(self.collectors.items()):
+            try:
+                families.extend(collect())
+            except Exception as e:
+                families.append(Family('football_collector_errors', 'gauge', 'Collectors that failed on this scrape')
+                                .add({'collector': name, 'error': type(e).__name__}, 1))
+        return [family.as_dict() for family in families if family.samples]
+
+def process_families():
+    """CPU, memory, file descriptors and GC of the current process, as standard process_* metrics"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    families = [
+        Family('process_cpu_seconds', 'counter', 'User and system CPU time').add({}, usage.ru_utime + usage.ru_stime),
+        Family('process_start_time_seconds', 'gauge', 'Start time of the process since the epoch').add({}, _START_TIME),
+        Family('process_threads', 'gauge', 'Threads in the process').add({}, threading.active_count()),
+    ]
+    rss, peak = rss_bytes()
+    memory = Family('process_resident_memory_bytes', 'gauge', 'Resident set size')
+    if rss is not None:
+        memory.add({}, rss)
+    families.append(memory)
+    families.append(Family('process_max_resident_memory_bytes', 'gauge', 'Peak resident set size').add({}, peak))
+    try:
+        families.append(Family('process_open_fds', 'gauge', 'Open file descriptors').add({}, len(os.listdir('/proc/self/fd'))))
+    except OSError:
+        pass
+    collections = Family('python_gc_collections', 'counter', 'Garbage collections by generation')
+    for generation, stats in enumerate(gc.get_stats()):
+        collections.add({'generation': str(generation)}, stats['collections'])
+    families.append(collections)
+    return families
+
+def _process_start_time():
+    """Process start from /proc, falling back to when this module was imported"""
+    try:
+        with open('/proc/self/stat') as f:
+            ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            boot = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+        return boot + ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+_START_TIME = _process_start_time()
+
+registry = MetricsRegistry()
+registry.collector('process', process_families)
+
+# Hot-path metrics
+
+db_connection_seconds = registry.histogram(
+    'football_db_connection_seconds', 'Time database connections were held, from opening to leaving their with block')
+rate_limit_wait_seconds = registry.histogram(
+    'football_rate_limit_wait_seconds', 'Time spent waiting on rate limits before retrying a Discord call', ('reason',))
+reminder_run_seconds = registry.histogram(
+    'football_reminder_run_seconds', 'Duration of each match reminder pass')
+reminder_lag_seconds = registry.gauge(
+    'football_reminder_lag_seconds', 'How late the last match reminder pass started relative to its schedule')
+reminders_sent = registry.counter(
+    'football_reminders_sent', 'Match reminders posted')
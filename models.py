@@ -0,0 +1,179 @@
+from array import array
+
+class Record:
+    """Base class for slotted database records with mapping-style access"""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        """Get a field value, falling back to default"""
+        return getattr(self, key, default)
+
+    def keys(self):
+        """Field names, so dict(record) works like dict(sqlite3.Row)"""
+        return self.__slots__
+
+    def as_dict(self):
+        """Convert record to a plain dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:3])
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        """Build records from an executed cursor returning raw tuples"""
+        return cls.from_rows(cursor.description, cursor)
+
+    @classmethod
+    def one_from_cursor(cls, cursor):
+        """Build a single record from an executed cursor, or None"""
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return cls.from_rows(cursor.description, (row,))[0]
+
+    @classmethod
+    def from_rows(cls, description, rows):
+        """Build records from raw tuples and a cursor description"""
+        columns = [column[0] for column in description]
+        positions = [columns.index(name) if name in columns else None for name in cls.__slots__]
+        new = object.__new__
+        set_field = object.__setattr__
+        records = []
+        for row in rows:
+            record = new(cls)
+            for name, position in zip(cls.__slots__, positions):
+                set_field(record, name, row[position] if position is not None else None)
+            records.append(record)
+        return records
+
+
+class Club(Record):
+    __slots__ = ('id', 'name', 'budget', 'guild_id', 'role_id', 'created_at', 'updated_at', 'crest_hash')
+
+
+class Player(Record):
+    __slots__ = ('id', 'name', 'value', 'club_id', 'position', 'age', 'contract_end',
+                 'discord_user_id', 'guild_id', 'created_at', 'updated_at', 'club_name')
+
+
+class Match(Record):
+    __slots__ = ('id', 'team1_id', 'team2_id', 'team1_role_id', 'team2_role_id', 'match_date',
+                 'guild_id', 'created_by', 'reminded', 'created_at', 'team1_name', 'team2_name')
+
+
+class Transfer(Record):
+    __slots__ = ('id', 'player_id', 'from_club_id', 'to_club_id', 'transfer_fee',
+                 'transfer_date', 'guild_id', 'player_name', 'from_club', 'to_club')
+
+
+class PlayerBatch:
+    """Columnar batch of players for whole-guild reads
+
+    Numeric columns live in typed arrays and strings are interned, so a large
+    guild costs a handful of arrays instead of one object per row. Arrays
+    can't hold NULL, so each nullable numeric column has a bytearray of null
+    flags and reads give None back. Indexing or iterating materialises
+    `Player` records on demand; `club_name` is not selected and stays None.
+    """
+    __slots__ = ('ids', 'values', 'club_ids', 'ages', 'discord_user_ids',
+                 'value_nulls', 'club_id_nulls', 'age_nulls', 'discord_user_id_nulls',
+                 'names', 'positions', 'contract_ends', 'created_ats', 'updated_ats', 'guild_id')
+
+    # Columns fetched by Database.get_all_players, in order
+    COLUMNS = ('id', 'name', 'value', 'club_id', 'position', 'age', 'discord_user_id',
+               'contract_end', 'created_at', 'updated_at')
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.ids = array('q')
+        self.values = array('d')
+        self.club_ids = array('q')
+        self.ages = array('i')
+        self.discord_user_ids = array('q')
+        self.value_nulls = bytearray()  # 1 where the column is NULL; the array holds 0
+        self.club_id_nulls = bytearray()  # NULL club means free agent
+        self.age_nulls = bytearray()
+        self.discord_user_id_nulls = bytearray()  # NULL means not linked
+        self.names = []
+        self.positions = []
+        self.contract_ends = []
+        self.created_ats = []
+        self.updated_ats = []
+
+    @classmethod
+    def from_cursor(cls, cursor, guild_id):
+        """Fill a batch from a cursor selecting PlayerBatch.COLUMNS"""
+        batch = cls(guild_id)
+        intern_position = {}.setdefault
+        # Rows created or updated together share timestamps, so keep one copy of each
+        intern_time = {}.setdefault
+        for (player_id, name, value, club_id, position, age, discord_user_id,
+             contract_end, created_at, updated_at) in cursor:
+            batch.ids.append(player_id)
+            batch.names.append(name)
+            batch.values.append(value or 0.0)
+            batch.value_nulls.append(value is None)
+            batch.club_ids.append(club_id or 0)
+            batch.club_id_nulls.append(club_id is None)
+            batch.positions.append(intern_position(position, position))
+            batch.ages.append(age or 0)
+            batch.age_nulls.append(age is None)
+            batch.discord_user_ids.append(discord_user_id or 0)
+            batch.discord_user_id_nulls.append(discord_user_id is None)
+            batch.contract_ends.append(contract_end)
+            batch.created_ats.append(intern_time(created_at, created_at))
+            batch.updated_ats.append(intern_time(updated_at, updated_at))
+        return batch
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._player(i) for i in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("player index out of range")
+        return self._player(index)
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield self._player(i)
+
+    def _player(self, i):
+        """Materialise row i as a Player record"""
+        player = object.__new__(Player)
+        set_field = object.__setattr__
+        set_field(player, 'id', self.ids[i])
+        set_field(player, 'name', self.names[i])
+        set_field(player, 'value', None if self.value_nulls[i] else self.values[i])
+        set_field(player, 'club_id', None if self.club_id_nulls[i] else self.club_ids[i])
+        set_field(player, 'position', self.positions[i])
+        set_field(player, 'age', None if self.age_nulls[i] else self.ages[i])
+        set_field(player, 'contract_end', self.contract_ends[i])
+        set_field(player, 'discord_user_id', None if self.discord_user_id_nulls[i] else self.discord_user_ids[i])
+        set_field(player, 'guild_id', self.guild_id)
+        set_field(player, 'created_at', self.created_ats[i])
+        set_field(player, 'updated_at', self.updated_ats[i])
+        set_field(player, 'club_name', None)
+        return player
+
+    def total_value(self):
+        """Sum of all player values"""
+        return sum(self.values)
+
+    def free_agent_indices(self):
+        """Row indices of players without a club"""
+        return [i for i, null in enumerate(self.club_id_nulls) if null]
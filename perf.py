@@ -0,0 +1,190 @@
+import math
+import time
+import logging
+import sqlite3
+import functools
+import contextvars
+from tracing import spans
+from metrics import db_connection_seconds
+
+logger = logging.getLogger(__name__)
+
+# Timing of the slash command being handled by the current task
+current_timing = contextvars.ContextVar('command_timing', default=None)
+
+class CommandTiming:
+    """Time one interaction spends in the database, in Discord REST calls, and in total"""
+
+    __slots__ = ('command', 'started', 'db', 'rest', 'error')
+
+    def __init__(self, command):
+        self.command = command
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.rest = 0.0
+        self.error = False
+
+class Histogram:
+    """Log-scale latency histogram in milliseconds (4 buckets per doubling, ~19% wide)"""
+
+    STEPS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        bucket = math.ceil(math.log2(max(ms, 0.01)) * self.STEPS_PER_DOUBLING)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return round(min(2 ** (bucket / self.STEPS_PER_DOUBLING), self.max), 2)
+        return round(self.max, 2)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 2),
+        }
+
+class CommandStats:
+    """Latency histograms for one command"""
+
+    PARTS = ('total', 'db', 'rest', 'compute')
+
+    def __init__(self):
+        self.histograms = {part: Histogram() for part in self.PARTS}
+        self.errors = 0
+
+    def summary(self):
+        result = {part: histogram.summary() for part, histogram in self.histograms.items()}
+        result['errors'] = self.errors
+        return result
+
+class PerfRegistry:
+    """Per-command latency histograms split into DB, REST and local compute time"""
+
+    def __init__(self):
+        self.commands = {}
+
+    def start(self, interaction):
+        """Begin timing an interaction; the timing follows the interaction's task"""
+        name = interaction.command.qualified_name if interaction.command else 'unknown'
+        timing = CommandTiming(name)
+        current_timing.set(timing)
+        interaction.extras['timing'] = timing
+        return timing
+
+    def finish(self, interaction, error=False):
+        """Record a finished interaction"""
+        timing = interaction.extras.pop('timing', None)
+        if timing is None:
+            return
+        total = (time.perf_counter() - timing.started) * 1000
+        db = timing.db * 1000
+        rest = timing.rest * 1000
+
+        stats = self.commands.get(timing.command)
+        if stats is None:
+            stats = self.commands[timing.command] = CommandStats()
+        stats.histograms['total'].add(total)
+        stats.histograms['db'].add(db)
+        stats.histograms['rest'].add(rest)
+        stats.histograms['compute'].add(max(total - db - rest, 0.0))
+        if error or timing.error:
+            stats.errors += 1
+
+    def snapshot(self):
+        """Summaries for every command, slowest p99 first"""
+        summaries = {name: stats.summary() for name, stats in self.commands.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1]['total']['p99_ms'] or 0, reverse=True))
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that charges the time between opening and leaving its `with` block to the current command"""
+
+    span = None
+
+    def __init__(self, *args, **kwargs):
+        self.opened_at = time.perf_counter()
+        self.span = spans.open_connection()
+        super().__init__(*args, **kwargs)
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            held = time.perf_counter() - self.opened_at
+            db_connection_seconds.observe(held)
+            timing = current_timing.get()
+            if timing is not None:
+                timing.db += held
+            spans.close(self.span, error=exc_info[0] is not None)
+
+def _route_name(route):
+    """`METHOD /path/{template}` for discord.py routes; the harness passes that string directly"""
+    method = getattr(route, 'method', None)
+    return f"{method} {route.path}" if method else str(route)
+
+def timed_rest(request):
+    """Wrap a coroutine REST request method so its time is charged to the current command"""
+    @functools.wraps(request)
+    async def wrapper(*args, **kwargs):
+        timing = current_timing.get()
+        if timing is None:
+            return await request(*args, **kwargs)
+        span = spans.open(_route_name(args[0]) if args else 'request', 'rest')
+        start = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        except BaseException:
+            if span is not None:
+                span.error = True
+            raise
+        finally:
+            timing.rest += time.perf_counter() - start
+            spans.close(span)
+    wrapper.timed = True
+    return wrapper
+
+def instrument_rest(http):
+    """Time the bot's REST client and the adapter used for interaction responses"""
+    from discord.webhook.async_ import async_context
+
+    http.request = timed_rest(http.request)
+    adapter = async_context.get()
+    if not getattr(adapter.request, 'timed', False):
+        adapter.request = timed_rest(adapter.request)
+
+class ErrorMarker(logging.Filter):
+    """Counts a command as failed if it logs an error, since most commands catch their own exceptions"""
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            timing = current_timing.get()
+            if timing is not None:
+                timing.error = True
+        return True
+
+def install_error_marker():
+    """Attach the marker ahead of any sampling on the root handlers"""
+    marker = ErrorMarker()
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, ErrorMarker) for f in handler.filters):
+            handler.filters.insert(0, marker)
@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 64
+
+def _frame_label(code):
+    filename = code.co_filename
+    if not filename.startswith('<'):
+        filename = os.path.relpath(filename) if filename.startswith(os.getcwd()) else os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """Statistical profiler that can be switched on in a running bot
+
+    A daemon thread wakes `hz` times a second, reads every thread's stack
+    through `sys._current_frames`, and counts collapsed stacks. Samples from
+    the event loop thread are attributed to the task that was running:
+    slash commands appear as `command:<name>`, background tasks by their
+    task name, and an empty loop as `(idle)`. Other threads are attributed
+    by their thread name. The output is flamegraph.pl / speedscope
+    collapsed-stack format.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(os.getenv('DATA_DIR', 'data'), 'profiles')
+        self.stacks = Counter()
+        self.lock = threading.Lock()  # The sampler thread counts while commands read
+        self.thread = None
+        self.stopping = threading.Event()
+        self.loop = None
+        self.loop_thread_id = None
+        self.hz = 0
+        self.started = None
+        self.stopped = None
+        self.deadline = None
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.last_path = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, seconds=60, hz=100):
+        """Profile for `seconds` (or until stopped); call from the event loop thread"""
+        if self.running:
+            return False
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.hz = hz
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.started = time.monotonic()
+        self.stopped = None
+        self.deadline = self.started + seconds if seconds else None
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        logger.info(f"Sampling profiler started at {hz} Hz for {seconds or 'unlimited'} seconds")
+        return True
+
+    def stop(self):
+        """Stop sampling and write the profile; returns its path, or None if nothing was sampled"""
+        if self.thread is None:
+            return None
+        self.stopping.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+        return self._finish()
+
+    def _finish(self):
+        self.stopped = time.monotonic()
+        if not self.stacks:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"profile-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.collapsed")
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+        self.last_path = path
+        logger.info(f"Sampling profiler wrote {self.samples} samples to {path}")
+        return path
+
+    def _run(self):
+        interval = 1 / self.hz
+        own_id = threading.get_ident()
+        while not self.stopping.wait(interval):
+            start = time.perf_counter()
+            self._sample(own_id)
+            self.sampling_time += time.perf_counter() - start
+            if self.deadline and time.monotonic() >= self.deadline:
+                self.thread = None
+                self._finish()
+                return
+
+    def _sample(self, own_id):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            label = self._attribute(thread_id, stack, names)
+            key = ';'.join([label, *map(_frame_label, stack)])
+            with self.lock:
+                self.stacks[key] += 1
+        self.samples += 1
+
+    def _attribute(self, thread_id, stack, names):
+        if thread_id != self.loop_thread_id:
+            return f"thread:{names.get(thread_id, thread_id)}"
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return task.get_name()
+        # Between tasks the loop is either waiting in select() or running plain callbacks
+        if stack and stack[-1].co_name in ('select', 'poll', 'control') and 'selectors' in stack[-1].co_filename:
+            return '(idle)'
+        return '(callback)'
+
+    def _snapshot(self):
+        with self.lock:
+            return self.stacks.copy()
+
+    def collapsed(self):
+        """Collapsed stacks, one `frame;frame;frame count` line each"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self._snapshot().most_common())
+
+    def by_label(self, limit=10):
+        """Sample counts per command, task or thread"""
+        labels = Counter()
+        for stack, count in self._snapshot().items():
+            labels[stack.split(';', 1)[0]] += count
+        return labels.most_common(limit)
+
+    def hot_functions(self, limit=10, include_idle=False):
+        """Functions most often on top of the stack (self time)"""
+        leaves = Counter()
+        for stack, count in self._snapshot().items():
+            label, _, frames = stack.partition(';')
+            if not include_idle and (label == '(idle)' or label.startswith('thread:')):
+                continue
+            leaves[frames.rsplit(';', 1)[-1] or label] += count
+        return leaves.most_common(limit)
+
+    def status(self):
+        end = self.stopped if self.stopped is not None and not self.running else time.monotonic()
+        elapsed = end - self.started if self.started is not None else 0
+        return {
+            'running': self.running,
+            'hz': self.hz,
+            'samples': self.samples,
+            'elapsed_seconds': round(elapsed, 1),
+            'overhead_pct': round(self.sampling_time / elapsed * 100, 2) if elapsed else None,
+            'remaining_seconds': round(max(self.deadline - time.monotonic(), 0), 1) if self.running and self.deadline else None,
+            'last_profile': self.last_path,
+        }
@@ -0,0 +1,235 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from perf import TimedConnection
+
+logger = logging.getLogger(__name__)
+slow_log = logging.getLogger('slow_queries')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+def normalize(sql):
+    """Collapse a statement to its shape: literals become ?, IN lists become IN (...)"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+def params_shape(params):
+    """Types of the bound parameters, without their values"""
+    if not params:
+        return ''
+    if isinstance(params, dict):
+        return ', '.join(f"{key}:{type(value).__name__}" for key, value in params.items())
+    return ', '.join(type(value).__name__ for value in params)
+
+class StatementStats:
+    """Aggregate for one normalized statement"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'rows', 'slow', 'params', 'plan')
+
+    def __init__(self, params):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.params = params
+        self.plan = None
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'max_ms': round(self.max_ms, 2),
+            'rows': self.rows,
+            'slow': self.slow,
+            'params': self.params,
+            'plan': self.plan,
+        }
+
+class QueryTracer:
+    """Opt-in SQL profiler aggregating statements by their normalized text
+
+    Statements slower than `slow_ms` are written to the `slow_queries`
+    logger, and the first time a statement is slow its
+    `EXPLAIN QUERY PLAN` is captured alongside it.
+    """
+
+    def __init__(self, enabled=None, slow_ms=None):
+        self.enabled = os.getenv('SQL_TRACE', '').lower() in ('1', 'true', 'yes') if enabled is None else enabled
+        self.slow_ms = float(os.getenv('SQL_SLOW_MS', 50)) if slow_ms is None else slow_ms
+        self.statements = {}
+        self.listeners = []  # Callables that also want every statement, e.g. the traffic recorder
+        self.lock = threading.Lock()  # Database methods also run in executor threads
+
+    @property
+    def active(self):
+        """Whether connections need to be traced at all"""
+        return self.enabled or bool(self.listeners)
+
+    def record(self, connection, sql, params, elapsed_ms, rows):
+        for listener in tuple(self.listeners):
+            listener(connection, sql, params, elapsed_ms, rows)
+        if not self.enabled:
+            return
+
+        key = normalize(sql)
+        with self.lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats(params_shape(params))
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += max(rows, 0)
+            slow = elapsed_ms >= self.slow_ms
+            if slow:
+                stats.slow += 1
+            capture_plan = slow and stats.plan is None
+            if capture_plan:
+                stats.plan = []  # Claim it so concurrent slow runs don't explain twice
+
+        if not slow:
+            return
+        if capture_plan:
+            stats.plan = self._explain(connection, sql, params)
+        slow_log.warning(
+            f"Slow query ({elapsed_ms:.1f}ms, {rows} rows): {key} [{stats.params}]"
+            + (f" plan: {' | '.join(stats.plan)}" if capture_plan and stats.plan else "")
+        )
+
+    def _explain(self, connection, sql, params):
+        try:
+            # A plain cursor so the EXPLAIN itself isn't traced
+            cursor = sqlite3.Cursor(connection)
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+            return [row[-1] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f"unavailable: {e}"]
+
+    def snapshot(self, limit=None, slow_only=False):
+        """Statements by total time spent, most expensive first"""
+        with self.lock:
+            items = [(key, stats.as_dict()) for key, stats in self.statements.items() if stats.slow or not slow_only]
+        items.sort(key=lambda item: item[1]['total_ms'], reverse=True)
+        return dict(items[:limit] if limit else items)
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that measures each statement from execute until its rows are consumed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statement = None  # (sql, params, elapsed, rows) of the statement in flight
+
+    def _begin(self, sql, params):
+        self._finish()
+        self.statement = [sql, params, 0.0, 0]
+
+    def _charge(self, start, rows=0):
+        if self.statement is not None:
+            self.statement[2] += time.perf_counter() - start
+            self.statement[3] += rows
+
+    def _finish(self):
+        if self.statement is None:
+            return
+        sql, params, elapsed, rows = self.statement
+        self.statement = None
+        if rows == 0 and self.rowcount > 0:
+            rows = self.rowcount  # Writes report affected rows
+        tracer.record(self.connection, sql, params, elapsed * 1000, rows)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(start)
+            if self.description is None:
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, None)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(start)
+            self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._charge(start, 1 if row is not None else 0)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._charge(start, len(rows))
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._charge(start, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._charge(start)
+            self._finish()
+            raise
+        self._charge(start, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+class TracedConnection(TimedConnection):
+    """Connection whose cursors report to the query tracer"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.traced_cursors = []
+
+    def cursor(self, factory=None):
+        cursor = super().cursor(factory or TracedCursor)
+        if isinstance(cursor, TracedCursor):
+            self.traced_cursors.append(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def __exit__(self, *exc_info):
+        # Statements whose rows were only partly read still get recorded
+        for cursor in self.traced_cursors:
+            cursor._finish()
+        self.traced_cursors.clear()
+        return super().__exit__(*exc_info)
+
+# Process-wide tracer; enable with SQL_TRACE=1 or /query_stats
+tracer = QueryTracer()
@@ -0,0 +1,55 @@
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Captured when the entry point first imports this module, as close to process start as we get
+PROCESS_START = time.perf_counter()
+
+class StartupTimeline:
+    """Records how long each startup phase takes, relative to process start"""
+
+    def __init__(self, origin=PROCESS_START):
+        self.origin = origin
+        self.phases = []  # (name, started_at, duration) in seconds since origin
+        self.completed_at = None
+
+    def mark(self, name):
+        """Record a point in time (a phase with no duration)"""
+        now = time.perf_counter() - self.origin
+        self.phases.append((name, now, 0.0))
+        logger.info(f"Startup: {name} at {now:.3f}s")
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, start - self.origin, end - start))
+            logger.info(f"Startup: {name} took {end - start:.3f}s")
+
+    def complete(self, name='ready'):
+        """Mark the end of startup; later calls are ignored"""
+        if self.completed_at is None:
+            self.mark(name)
+            self.completed_at = time.perf_counter() - self.origin
+            logger.warning(f"Startup complete in {self.completed_at:.2f}s: " + ", ".join(
+                f"{phase}={duration:.2f}s" for phase, _, duration in self.phases if duration
+            ))
+
+    def as_dict(self):
+        """Timeline for the status snapshot"""
+        return {
+            'total_seconds': round(self.completed_at, 3) if self.completed_at is not None else None,
+            'phases': [
+                {'name': name, 'at': round(at, 3), 'seconds': round(duration, 3)}
+                for name, at, duration in self.phases
+            ],
+        }
+
+# Process-wide timeline
+timeline = StartupTimeline()
@@ -0,0 +1,89 @@
+import json
+import struct
+import time
+from multiprocessing import shared_memory
+
+# Block layout: sequence number (u64), payload length (u32), JSON payload
+HEADER = struct.Struct('<QI')
+DEFAULT_SIZE = 1024 * 1024
+
+def create_status_block(name, size=DEFAULT_SIZE):
+    """Create the shared block; the creating process owns and unlinks it"""
+    return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+
+class StatusPublisher:
+    """Writes status snapshots into a shared-memory block (single writer)"""
+
+    def __init__(self, name):
+        self.shm = _attach_untracked(name)
+        # Resume after the previous bot process, even if it died mid-write
+        self.sequence = HEADER.unpack_from(self.shm.buf, 0)[0] & ~1
+
+    def publish(self, status):
+        """Publish a snapshot; readers never observe a half-written one"""
+        status = dict(status, published_at=time.time())
+        payload = json.dumps(status, default=str, separators=(',', ':')).encode()
+        if HEADER.size + len(payload) > self.shm.size:
+            payload = json.dumps({'status': status.get('status'), 'error': 'status snapshot too large',
+                                  'published_at': status['published_at']}).encode()
+
+        # Seqlock: an odd sequence marks a write in progress
+        self.sequence += 1
+        HEADER.pack_into(self.shm.buf, 0, self.sequence, 0)
+        self.shm.buf[HEADER.size:HEADER.size + len(payload)] = payload
+        self.sequence += 1
+        HEADER.pack_into(self.shm.buf, 0, self.sequence, len(payload))
+
+    def close(self):
+        self.shm.close()
+
+
+class StatusReader:
+    """Reads the latest snapshot published by a StatusPublisher"""
+
+    def __init__(self, name):
+        self.name = name
+        self.shm = None
+
+    def _attach(self):
+        if self.shm is None:
+            self.shm = _attach_untracked(self.name)
+        return self.shm
+
+    def read(self, max_age=None):
+        """Latest snapshot, or None if nothing (recent) has been published"""
+        try:
+            shm = self._attach()
+        except FileNotFoundError:
+            return None
+
+        for _ in range(100):
+            sequence, length = HEADER.unpack_from(shm.buf, 0)
+            if sequence == 0:
+                return None
+            if sequence & 1:
+                time.sleep(0.0005)
+                continue
+            payload = bytes(shm.buf[HEADER.size:HEADER.size + length])
+            if HEADER.unpack_from(shm.buf, 0)[0] == sequence:
+                status = json.loads(payload)
+                if max_age is not None and time.time() - status.get('published_at', 0) > max_age:
+                    return dict(status, status='stale')
+                return status
+        return None
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+def _attach_untracked(name):
+    """Attach to an existing block without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers with the resource tracker, but spawned
+        # children share the creator's tracker so the registration is a no-op
+        return shared_memory.SharedMemory(name=name)
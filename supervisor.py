@@ -0,0 +1,235 @@
+import os
+import sys
+import time
+import signal
+import socket
+import asyncio
+import logging
+import multiprocessing
+from status_channel import StatusPublisher, StatusReader, create_status_block
+
+logger = logging.getLogger(__name__)
+
+STATUS_INTERVAL = 2  # Seconds between status snapshots from each bot process
+STATUS_MAX_AGE = 15  # Snapshots older than this are reported as stale
+MAX_RESTART_DELAY = 300
+
+def plan_clusters(cluster_count, shard_count):
+    """Split shard IDs into contiguous ranges, one per cluster process"""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    clusters = []
+    start = 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        clusters.append(list(range(start, start + size)))
+        start += size
+    return clusters
+
+def run_bot_process(status_name, cluster_id=None, shard_ids=None, shard_count=None):
+    """Entry point of a process that owns gateway connections (all shards, or one cluster's)"""
+    from logging_config import setup_logging
+    setup_logging()  # Spawned, so nothing is configured yet; the log file is named after this process
+    started = asyncio.run(_bot_main(status_name, cluster_id, shard_ids, shard_count))
+    sys.exit(0 if started else 1)
+
+async def _bot_main(status_name, cluster_id, shard_ids, shard_count):
+    from bot_manager import BotManager
+    from metrics import registry
+
+    manager = BotManager(shard_ids, shard_count, cluster_id)
+    publisher = StatusPublisher(status_name)
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(manager.stop_bot()))
+
+    async def publish_status():
+        while True:
+            try:
+                # Web workers serve /metrics from this snapshot too
+                publisher.publish({**await manager.get_status(), 'metrics': registry.collect()})
+            except Exception as e:
+                logger.error(f"Status publish error: {e}")
+            await asyncio.sleep(STATUS_INTERVAL)
+
+    publish_task = asyncio.create_task(publish_status())
+    try:
+        return await manager.start_bot()
+    finally:
+        publish_task.cancel()
+        await manager.stop_bot()
+        publisher.publish({'status': 'stopped', 'cluster_id': cluster_id})
+        publisher.close()
+
+def merge_statuses(statuses):
+    """Combine per-cluster snapshots into one status for the health endpoint"""
+    if len(statuses) == 1:
+        return statuses[0]
+
+    states = [s.get('status') for s in statuses]
+    merged = {
+        'status': 'ready' if all(state == 'ready' for state in states) else 'degraded',
+        'clusters': statuses,
+        'gateway': {'guilds': 0, 'shards': {}},
+    }
+    latencies = []
+    for status in statuses:
+        gateway = status.get('gateway') or {}
+        merged['gateway']['guilds'] += gateway.get('guilds', 0)
+        merged['gateway']['shards'].update(gateway.get('shards', {}))
+        if gateway.get('latency_ms') is not None:
+            latencies.append(gateway['latency_ms'])
+    merged['gateway']['latency_ms'] = max(latencies) if latencies else None
+    return merged
+
+def run_web_worker(sock, status_names):
+    """Entry point of a stateless web worker"""
+    from logging_config import setup_logging
+    setup_logging()
+    try:
+        asyncio.run(_web_main(sock, status_names))
+    except KeyboardInterrupt:
+        pass
+
+async def _web_main(sock, status_names):
+    from aiohttp import web
+    from web_server import create_app
+
+    readers = [StatusReader(name) for name in status_names]
+
+    async def status_source():
+        statuses = [reader.read(max_age=STATUS_MAX_AGE) or {'status': 'starting'} for reader in readers]
+        return merge_statuses([{key: value for key, value in status.items() if key != 'metrics'} for status in statuses])
+
+    async def metrics_source():
+        from metrics import merge
+
+        sources = []
+        for reader in readers:
+            status = reader.read(max_age=STATUS_MAX_AGE)
+            if status and status.get('status') != 'stale' and status.get('metrics'):
+                cluster_id = status.get('cluster_id')
+                sources.append(({} if cluster_id is None else {'cluster': str(cluster_id)}, status['metrics']))
+        return [family.as_dict() for family in merge(sources)]
+
+    runner = web.AppRunner(create_app(status_source, metrics_source), access_log=None)
+    await runner.setup()
+    await web.SockSite(runner, sock).start()
+
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    await stop.wait()
+    await runner.cleanup()
+    for reader in readers:
+        reader.close()
+
+class BotProcess:
+    """Supervisor bookkeeping for one bot process"""
+
+    def __init__(self, status_name, cluster_id=None, shard_ids=None, shard_count=None):
+        self.status_name = status_name
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.started_at = 0
+        self.restarts = 0
+        self.next_start = 0
+
+    @property
+    def label(self):
+        return "Bot process" if self.cluster_id is None else f"Cluster {self.cluster_id} (shards {self.shard_ids})"
+
+class Supervisor:
+    """Runs the bot process(es) and N web workers sharing one listening socket
+
+    Without `clusters` there is exactly one bot process holding every
+    shard. With `clusters` (a list of shard ID lists) each cluster gets its
+    own process and status block.
+    """
+
+    def __init__(self, web_workers, clusters=None, shard_count=None, host='0.0.0.0', port=None):
+        self.web_workers = web_workers
+        self.host = host
+        self.port = port or int(os.getenv('PORT', 5000))
+        self.context = multiprocessing.get_context('spawn')
+        self.stopping = False
+        self.workers = []
+
+        prefix = f"football_bot_status_{os.getpid()}"
+        if clusters:
+            self.bots = [
+                BotProcess(f"{prefix}_{cluster_id}", cluster_id, shard_ids, shard_count)
+                for cluster_id, shard_ids in enumerate(clusters)
+            ]
+        else:
+            self.bots = [BotProcess(prefix)]
+
+    def _start_bot(self, bot):
+        bot.process = self.context.Process(
+            target=run_bot_process,
+            args=(bot.status_name, bot.cluster_id, bot.shard_ids, bot.shard_count),
+            name="football-bot" if bot.cluster_id is None else f"football-bot-{bot.cluster_id}"
+        )
+        bot.process.start()
+        bot.started_at = time.monotonic()
+        logger.info(f"{bot.label} started (pid {bot.process.pid})")
+
+    def _start_worker(self, sock, index):
+        process = self.context.Process(
+            target=run_web_worker, args=(sock, [bot.status_name for bot in self.bots]),
+            name=f"football-web-{index}", daemon=True
+        )
+        process.start()
+        return process
+
+    def _check_bot(self, bot):
+        """Restart a bot process that exited, backing off if it keeps crashing"""
+        if bot.process and not bot.process.is_alive():
+            uptime = time.monotonic() - bot.started_at
+            bot.restarts = 0 if uptime > MAX_RESTART_DELAY else bot.restarts + 1
+            delay = min(MAX_RESTART_DELAY, 2 ** bot.restarts) if bot.restarts else 0
+            logger.warning(f"{bot.label} exited ({bot.process.exitcode}), restarting in {delay}s")
+            bot.process = None
+            bot.next_start = time.monotonic() + delay
+
+        if bot.process is None and time.monotonic() >= bot.next_start:
+            self._start_bot(bot)
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self):
+        """Start all processes and keep them running until signalled"""
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        sock = socket.create_server((self.host, self.port), backlog=512)
+        blocks = [create_status_block(bot.status_name) for bot in self.bots]
+        logger.info(f"Supervisor listening on port {self.port} with {len(self.bots)} bot process(es) "
+                    f"and {self.web_workers} web workers")
+
+        try:
+            self.workers = [self._start_worker(sock, i) for i in range(self.web_workers)]
+
+            while not self.stopping:
+                for bot in self.bots:
+                    self._check_bot(bot)
+
+                for index, worker in enumerate(self.workers):
+                    if not worker.is_alive():
+                        logger.warning(f"Web worker {index} exited ({worker.exitcode}), restarting")
+                        self.workers[index] = self._start_worker(sock, index)
+
+                time.sleep(0.5)
+        finally:
+            logger.info("Supervisor shutting down...")
+            processes = [bot.process for bot in self.bots if bot.process] + self.workers
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join(timeout=30)
+            sock.close()
+            for block in blocks:
+                block.close()
+                block.unlink()
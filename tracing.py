@@ -0,0 +1,326 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import functools
+import contextvars
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+
+logger = logging.getLogger(__name__)
+
+# Innermost open span of the interaction handled by the current task
+current_span = contextvars.ContextVar('current_span', default=None)
+
+# Database helpers that open connections on behalf of the method worth naming
+_DB_HELPERS = frozenset(('__init__', 'get_connection', '_fetch_all', '_fetch_one'))
+
+class Span:
+    __slots__ = ('trace', 'parent', 'name', 'kind', 'start', 'end', 'attrs', 'error')
+
+    def __init__(self, trace, parent, name, kind, start=None, attrs=None):
+        self.trace = trace
+        self.parent = parent
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter() if start is None else start
+        self.end = None
+        self.attrs = attrs
+        self.error = False
+
+    @property
+    def duration_ms(self):
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    @property
+    def depth(self):
+        depth = 0
+        parent = self.parent
+        while parent is not None:
+            depth += 1
+            parent = parent.parent
+        return depth
+
+class Trace:
+    """One interaction: a root span and every span opened beneath it"""
+
+    __slots__ = ('id', 'command', 'guild_id', 'user_id', 'started_at', 'spans', 'dropped', 'error', 'max_spans')
+
+    def __init__(self, command, guild_id, user_id, max_spans):
+        self.id = os.urandom(8).hex()
+        self.command = command
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.started_at = datetime.now(timezone.utc)
+        self.spans = []
+        self.dropped = 0
+        self.error = False
+        self.max_spans = max_spans
+
+    @property
+    def root(self):
+        return self.spans[0]
+
+    @property
+    def duration_ms(self):
+        return self.root.duration_ms
+
+    def add(self, parent, name, kind, start=None, attrs=None):
+        if self.spans and self.spans[0].end is not None:
+            return None  # Tasks the command left behind outlived its trace
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return None
+        span = Span(self, parent, name, kind, start, attrs)
+        self.spans.append(span)
+        return span
+
+    def as_dict(self):
+        origin = self.root.start
+        index = {id(span): n for n, span in enumerate(self.spans)}
+        return {
+            'trace_id': self.id,
+            'command': self.command,
+            'guild_id': self.guild_id,
+            'user_id': self.user_id,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round(self.duration_ms, 3),
+            'error': self.error,
+            'dropped_spans': self.dropped,
+            'spans': [
+                {
+                    'id': n,
+                    'parent': index.get(id(span.parent)),
+                    'name': span.name,
+                    'kind': span.kind,
+                    'offset_ms': round((span.start - origin) * 1000, 3),
+                    'duration_ms': round(span.duration_ms, 3),
+                    **({'error': True} if span.error else {}),
+                    **({'attrs': span.attrs} if span.attrs else {}),
+                }
+                for n, span in enumerate(self.spans)
+            ],
+        }
+
+    def totals(self):
+        """Milliseconds spent in database connections and REST calls"""
+        totals = {'db': 0.0, 'rest': 0.0}
+        for span in self.spans:
+            if span.kind in totals:
+                totals[span.kind] += span.duration_ms
+        return {kind: round(ms, 2) for kind, ms in totals.items()}
+
+def waterfall(trace, width=24, limit=40):
+    """Plain-text waterfall of a trace, one line per span"""
+    total = max(trace.duration_ms, 0.001)
+    origin = trace.root.start
+    lines = []
+    for span in trace.spans[:limit]:
+        offset = (span.start - origin) * 1000
+        start = min(int(offset / total * width), width - 1)
+        length = max(1, round(span.duration_ms / total * width))
+        bar = ' ' * start + '█' * min(length, width - start)
+        label = '  ' * span.depth + (f"{span.kind} {span.name}" if span.kind != 'command' else span.name)
+        lines.append(f"{bar:<{width}} {offset:8.1f} {span.duration_ms:8.1f}ms {'!' if span.error else ' '}{label}")
+    hidden = len(trace.spans) - limit + trace.dropped
+    if hidden > 0:
+        lines.append(f"... {hidden} more spans")
+    return '\n'.join(lines)
+
+def _caller(frame):
+    """Name of the first function up the stack that isn't a database connection helper"""
+    for _ in range(6):
+        if frame is None:
+            break
+        if frame.f_code.co_name not in _DB_HELPERS:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return 'connection'
+
+def _trace_file():
+    """Trace export file; each cluster process writes its own, like the log file"""
+    from logging_config import process_file
+    return process_file(os.getenv('TRACE_FILE', os.path.join(os.getenv('DATA_DIR', 'data'), 'traces', 'traces.jsonl')))
+
+class _TraceFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.trace.as_dict(), default=str)
+
+class SpanTracer:
+    """Per-interaction spans with child spans for database work and REST calls
+
+    The command tree opens a root span for every interaction and keeps it in
+    a context variable, so database connections, SQL statements and Discord
+    REST calls made by that interaction's task attach themselves beneath
+    it; individual SQL statements only when the SQL tracer is on as well.
+    Finished traces go to an in-memory ring buffer for `/traces`, and slow
+    ones, off the event loop, to a size-rotated JSON lines file.
+    """
+
+    def __init__(self, enabled=None, buffer=None, path=None, min_ms=None, max_spans=None):
+        self.enabled = os.getenv('TRACING', '1').lower() not in ('0', 'false', 'no') if enabled is None else enabled
+        self.traces = deque(maxlen=buffer or int(os.getenv('TRACE_BUFFER', 500)))
+        self.path = _trace_file() if path is None else path
+        self.min_ms = float(os.getenv('TRACE_MIN_MS', 250)) if min_ms is None else min_ms
+        self.max_spans = max_spans or int(os.getenv('TRACE_MAX_SPANS', 256))
+        self.finished = 0
+        self.exported = 0
+        self.export_queue = None
+        self.listener = None
+
+    # Interaction lifecycle, called by the command tree and the bot
+
+    def begin(self, interaction):
+        if not self.enabled:
+            return None
+        trace = Trace(
+            interaction.command.qualified_name if interaction.command else 'unknown',
+            interaction.guild_id,
+            interaction.user.id if interaction.user else None,
+            self.max_spans,
+        )
+        root = trace.add(None, trace.command, 'command')
+        current_span.set(root)
+        interaction.extras['trace'] = trace
+        return trace
+
+    def finish(self, interaction, error=False):
+        """Close an interaction's trace; call before perf.finish, which owns the timing"""
+        trace = interaction.extras.pop('trace', None)
+        if trace is None:
+            return
+        now = time.perf_counter()
+        timing = interaction.extras.get('timing')
+        trace.error = error or bool(timing and timing.error)
+        trace.root.error = trace.error
+        for span in trace.spans:
+            if span.end is None:
+                span.end = now
+        self.traces.append(trace)
+        self.finished += 1
+        if self.path and trace.duration_ms >= self.min_ms:
+            self._export(trace)
+
+    # Child spans
+
+    def open(self, name, kind='internal', attrs=None, parent=None):
+        """Start a child span of the current one; returns None outside a traced interaction"""
+        parent = parent or current_span.get()
+        if parent is None:
+            return None
+        return parent.trace.add(parent, name, kind, attrs=attrs)
+
+    @staticmethod
+    def close(span, error=False):
+        if span is not None:
+            span.end = time.perf_counter()
+            span.error = span.error or error
+
+    def traced(self, function=None, *, name=None, kind='internal'):
+        """Decorator giving each call of a coroutine function its own span, parent of what it does"""
+        def decorate(function):
+            span_name = name or function.__name__
+
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                span = self.open(span_name, kind)
+                if span is None:
+                    return await function(*args, **kwargs)
+                token = current_span.set(span)
+                try:
+                    return await function(*args, **kwargs)
+                except BaseException:
+                    span.error = True
+                    raise
+                finally:
+                    current_span.reset(token)
+                    self.close(span)
+            return wrapper
+        return decorate(function) if function else decorate
+
+    def open_connection(self):
+        """Span for a database connection, named after the Database method that opened it"""
+        parent = current_span.get()
+        if parent is None:
+            return None
+        return parent.trace.add(parent, _caller(sys._getframe(2)), 'db')
+
+    def record_query(self, connection, sql, params, elapsed_ms, rows):
+        """Query tracer listener adding a span for each finished statement"""
+        parent = getattr(connection, 'span', None) or current_span.get()
+        if parent is None or parent.end is not None:
+            return
+        end = time.perf_counter()
+        span = parent.trace.add(parent, ' '.join(sql.split())[:200], 'sql', start=end - elapsed_ms / 1000,
+                                attrs={'rows': rows} if rows > 0 else None)
+        if span is not None:
+            span.end = end
+
+    # Querying
+
+    def recent(self, limit=10, command=None):
+        traces = [trace for trace in reversed(self.traces) if command is None or trace.command == command]
+        return traces[:limit]
+
+    def slowest(self, limit=10, command=None):
+        traces = [trace for trace in self.traces if command is None or trace.command == command]
+        traces.sort(key=lambda trace: trace.duration_ms, reverse=True)
+        return traces[:limit]
+
+    def get(self, trace_id):
+        for trace in reversed(self.traces):
+            if trace.id.startswith(trace_id):
+                return trace
+        return None
+
+    # Export
+
+    def _export(self, trace):
+        if self.listener is None:
+            self._start_exporter()
+        record = logging.makeLogRecord({'msg': 'trace', 'trace': trace})
+        self.export_queue.put_nowait(record)
+        self.exported += 1
+
+    def _start_exporter(self):
+        from logging_config import SizedTimedRotatingFileHandler
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        handler = SizedTimedRotatingFileHandler(
+            self.path,
+            max_bytes=int(os.getenv('TRACE_MAX_BYTES', 20 * 1024 * 1024)),
+            when='midnight',
+            backupCount=int(os.getenv('TRACE_BACKUP_COUNT', 3)),
+            encoding='utf-8',
+            delay=True,
+        )
+        handler.setFormatter(_TraceFormatter())
+        self.export_queue = queue.SimpleQueue()
+        # Serialising and writing happen on the listener thread, never on the event loop
+        self.listener = QueueListener(self.export_queue, handler)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'buffered': len(self.traces),
+            'buffer_size': self.traces.maxlen,
+            'finished': self.finished,
+            'exported': self.exported,
+            'export_queue': self.export_queue.qsize() if self.export_queue is not None else 0,
+            'file': self.path or None,
+        }
+
+spans = SpanTracer()
@@ -1,8 +1,11 @@
 import discord
 import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Callable, Any
+from tracing import spans
+from metrics import rate_limit_wait_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +29,25 @@ def create_embed(title: str, description: str = "", color: discord.Color = disco
 def is_admin():
     """Decorator to check if user has administrator permissions"""
     def predicate(interaction: discord.Interaction) -> bool:
-        if not interaction.guild:
+        # Guild interactions carry the invoking member, so no member cache lookup is needed
+        if not interaction.guild or not isinstance(interaction.user, discord.Member):
             return False
-        member = interaction.guild.get_member(interaction.user.id)
-        return member is not None and member.guild_permissions.administrator
+        return interaction.user.guild_permissions.administrator
     return discord.app_commands.check(predicate)
 
+async def get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Get a member from the cache, falling back to the API when it isn't cached"""
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
+    except discord.HTTPException as e:
+        logger.error(f"Failed to fetch member {user_id}: {e}")
+        return None
+
 def format_currency(amount: float) -> str:
     """Format amount as Euro currency"""
     return f"€{amount:,.2f}"
@@ -70,6 +86,7 @@ class RateLimitHandler:
             time_since_last = (now - self.last_request[func_name]).total_seconds()
             if time_since_last < self.min_delay:
                 wait_time = self.min_delay - time_since_last
+                rate_limit_wait_seconds.labels('throttle').observe(wait_time)
                 await asyncio.sleep(wait_time)
         
         # Update last request time
@@ -84,6 +101,7 @@ class RateLimitHandler:
                 if e.status == 429:  # Rate limited
                     retry_after = float(e.response.headers.get('Retry-After', 1))
                     logger.warning(f"Rate limited, waiting {retry_after} seconds")
+                    rate_limit_wait_seconds.labels('retry_after').observe(retry_after)
                     await asyncio.sleep(retry_after)
                     if attempt == max_retries - 1:
                         raise
@@ -94,6 +112,43 @@ class RateLimitHandler:
                     raise
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
 
+class LRUCache:
+    """Small least-recently-used cache with hit/miss accounting"""
+    def __init__(self, max_items: int = 128):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, default=None):
+        """Get a cached value and mark it as recently used"""
+        try:
+            value = self.items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry if full"""
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+    
+    def __contains__(self, key):
+        return key in self.items
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
 async def create_or_get_role(guild: discord.Guild, role_name: str, color: discord.Color = discord.Color.blue()) -> Optional[discord.Role]:
     """Create a role or get existing one"""
     try:
@@ -118,6 +173,7 @@ async def create_or_get_role(guild: discord.Guild, role_name: str, color: discor
         logger.error(f"Failed to create role {role_name}: {e}")
         return None
 
+@spans.traced
 async def assign_role_to_user(member: discord.Member, role: discord.Role) -> bool:
     """Assign a role to a user"""
     try:
@@ -133,6 +189,7 @@ async def assign_role_to_user(member: discord.Member, role: discord.Role) -> boo
         logger.error(f"Failed to assign role: {e}")
         return False
 
+@spans.traced
 async def remove_role_from_user(member: discord.Member, role: discord.Role) -> bool:
     """Remove a role from a user"""
     try:
@@ -1,31 +1,242 @@
 import os
-from flask import Flask, render_template
+import json
+import asyncio
+import hmac
+import hashlib
 import logging
+from aiohttp import web
 
 logger = logging.getLogger(__name__)
 
-def create_app():
-    """Create and configure the Flask app"""
-    app = Flask(__name__)
-    app.secret_key = os.environ.get("SESSION_SECRET", "football-bot-secret-key")
-    
-    @app.route('/')
-    def index():
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+KEEP_ALIVE_BODY = b"Bot is alive!"
+KEEP_ALIVE_ETAG = f'"{hashlib.sha1(KEEP_ALIVE_BODY).hexdigest()[:16]}"'
+
+def public_status(status):
+    """The part of the status the public page shows"""
+    gateway = status.get('gateway') or {}
+    connection = status.get('connection') or {}
+    return {
+        'status': status.get('status'),
+        'latency_ms': gateway.get('latency_ms'),
+        'guilds': gateway.get('guilds'),
+        'shards': len(gateway.get('shards') or {}) or None,
+        'last_reminder_run': status.get('last_reminder_run'),
+        'reconnects': connection.get('restarts'),
+        'uptime_seconds': status.get('uptime_seconds'),
+    }
+
+def health_summary(status):
+    """Readiness and a shard summary; the rest of the status is only served with the admin token"""
+    gateway = status.get('gateway') or {}
+    shards = gateway.get('shards') or {}
+    summary = {
+        'status': status.get('status'),
+        'ready': status.get('status') == 'ready',
+        'timestamp': status.get('timestamp'),
+        'uptime_seconds': status.get('uptime_seconds'),
+        'gateway': {
+            'latency_ms': gateway.get('latency_ms'),
+            'guilds': gateway.get('guilds'),
+            'shards': len(shards),
+            'shards_closed': sum(1 for shard in shards.values() if shard.get('closed')),
+        },
+    }
+    if 'clusters' in status:
+        summary['clusters'] = [
+            {'cluster_id': cluster.get('cluster_id'), 'status': cluster.get('status')} for cluster in status['clusters']
+        ]
+    return summary
+
+class StatusStream:
+    """Polls the status source while anyone is listening and pushes changes to every subscriber
+
+    One poll serves every open page, so page views don't multiply status
+    work. Each subscriber holds at most the latest snapshot; a slow reader
+    skips intermediate ones instead of growing a backlog.
+    """
+
+    def __init__(self, status_source, interval=None, max_clients=None):
+        self.status_source = status_source
+        self.interval = interval or float(os.getenv('STATUS_STREAM_INTERVAL', 2))
+        self.max_clients = max_clients or int(os.getenv('STATUS_STREAM_MAX_CLIENTS', 100))
+        self.subscribers = set()
+        self.latest = None
+        self.sequence = 0
+        self.task = None
+
+    def subscribe(self):
+        """A queue of (sequence, snapshot) updates, or None when the stream is full"""
+        if len(self.subscribers) >= self.max_clients:
+            return None
+        queue = asyncio.Queue(maxsize=1)
+        if self.task is None:
+            # Nobody was listening, so the last snapshot is old; the first poll pushes a fresh one
+            self.latest = None
+            self.task = asyncio.create_task(self._poll(), name="status-stream")
+        elif self.latest is not None:
+            queue.put_nowait((self.sequence, self.latest))
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _poll(self):
+        while True:
+            try:
+                snapshot = public_status(await self.status_source())
+            except Exception as e:
+                logger.error(f"Status stream error: {e}")
+                snapshot = {'status': 'error'}
+            # Uptime always moves, so it alone doesn't push; open pages keep counting it locally
+            changed = self.latest is None or {**snapshot, 'uptime_seconds': None} != {**self.latest, 'uptime_seconds': None}
+            # Always keep the newest snapshot so pages that connect later start from the current uptime
+            self.latest = snapshot
+            if changed:
+                self.sequence += 1
+                for queue in self.subscribers:
+                    if queue.full():
+                        queue.get_nowait()
+                    queue.put_nowait((self.sequence, snapshot))
+            await asyncio.sleep(self.interval)
+
+    def close(self):
+        """Stop polling and tell every open stream to finish"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+def create_app(status_source, metrics_source=None):
+    """Create the status web app
+
+    `status_source` is an async callable returning the bot status dict.
+    `metrics_source` is an async callable returning metric families (see
+    metrics.MetricsRegistry.collect); without it `/metrics` is not served.
+    """
+    app = web.Application()
+    app['status_source'] = status_source
+    app['metrics_source'] = metrics_source
+    app['status_stream'] = StatusStream(status_source)
+    app['status_token'] = os.getenv('STATUS_TOKEN', '')
+
+    async def index(request):
         """Main page showing bot status"""
-        return render_template('index.html')
-    
-    @app.route('/health')
-    def health():
-        """Health check endpoint for monitoring"""
-        return {'status': 'Bot is running', 'timestamp': '2025-08-15'}
-    
-    @app.route('/keep-alive')
-    def keep_alive():
-        """Keep alive endpoint"""
-        return "Bot is alive!"
-    
+        return web.FileResponse(os.path.join(TEMPLATES_DIR, 'index.html'))
+
+    async def health(request):
+        """Health check endpoint for monitoring; public, so only readiness and shards"""
+        try:
+            status = await request.app['status_source']()
+        except Exception as e:
+            logger.error(f"Health check error: {e}")
+            return web.json_response({'status': 'error'}, status=503)
+
+        # Uptime monitors only see the HTTP status, so report 503 until the gateway is ready
+        http_status = 200 if status.get('status') == 'ready' else 503
+        return web.json_response(health_summary(status), status=http_status)
+
+    async def full_status(request):
+        """The complete status (memory, SQL, leases, profiler...) for holders of STATUS_TOKEN"""
+        token = request.app['status_token']
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return web.Response(status=401, text="Unauthorized", headers={'WWW-Authenticate': 'Bearer'})
+        try:
+            status = await request.app['status_source']()
+        except Exception as e:
+            logger.error(f"Status error: {e}")
+            return web.json_response({'status': 'error', 'error': str(e)}, status=503)
+        return web.json_response(status)
+
+    async def keep_alive(request):
+        """Keep alive endpoint; constant, so pingers and proxies may cache it briefly"""
+        headers = {'Cache-Control': 'public, max-age=60', 'ETag': KEEP_ALIVE_ETAG}
+        if request.headers.get('If-None-Match') == KEEP_ALIVE_ETAG:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=KEEP_ALIVE_BODY, content_type='text/plain', headers=headers)
+
+    async def events(request):
+        """Server-sent events: the public status on connect and whenever it changes"""
+        stream = request.app['status_stream']
+        queue = stream.subscribe()
+        if queue is None:
+            return web.Response(status=503, text="Too many status listeners", headers={'Retry-After': '30'})
+
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Stop reverse proxies from buffering the stream
+        })
+        try:
+            await response.prepare(request)
+            await response.write(b"retry: 5000\n\n")
+            while True:
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # A comment line keeps idle proxies from closing the connection
+                    await response.write(b": ping\n\n")
+                    continue
+                if update is None:
+                    break  # Server shutting down
+                sequence, snapshot = update
+                await response.write(f"id: {sequence}\nevent: status\ndata: {json.dumps(snapshot)}\n\n".encode())
+        except ConnectionResetError:
+            pass  # The page was closed
+        finally:
+            stream.unsubscribe(queue)
+        return response
+
+    async def metrics(request):
+        """Prometheus scrape endpoint; OpenMetrics when the scraper asks for it"""
+        from metrics import Family, render, OPENMETRICS_TYPE, PROMETHEUS_TYPE
+
+        try:
+            families = [Family.from_dict(family) for family in await request.app['metrics_source']()]
+        except Exception as e:
+            logger.error(f"Metrics error: {e}")
+            return web.Response(status=503, text=f"metrics unavailable: {e}")
+
+        openmetrics = 'application/openmetrics-text' in request.headers.get('Accept', '')
+        body = render(families, openmetrics)
+        response = web.Response(body=body.encode())
+        response.headers['Content-Type'] = OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE
+        return response
+
+    app.router.add_get('/', index)
+    app.router.add_get('/health', health)
+    if app['status_token']:
+        app.router.add_get('/status', full_status)
+    app.router.add_get('/keep-alive', keep_alive)
+    app.router.add_get('/events', events)
+    if metrics_source is not None:
+        app.router.add_get('/metrics', metrics)
+    app.router.add_static('/static', STATIC_DIR)
+
+    async def close_stream(app):
+        app['status_stream'].close()
+
+    app.on_shutdown.append(close_stream)
+
     return app
 
-if __name__ == '__main__':
-    app = create_app()
-    app.run(host='0.0.0.0', port=5000, debug=True)
+async def start_web_server(app, host='0.0.0.0', port=None):
+    """Serve the app on the running event loop and return its runner"""
+    port = port or int(os.getenv('PORT', 5000))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"Web server started on port {port}")
+    return runner